@@ -1,24 +1,11 @@
 import os
 import json
-import urllib.request
-import urllib.parse
 from openai import OpenAI
+from bink_telegram import stuur_telegram
 
 # Haal de geheime sleutels op
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 API_KEY = os.environ.get("OPENAI_API_KEY")
 
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode({"chat_id": TG_CHAT_ID, "text": bericht, "parse_mode": "Markdown"}).encode("utf-8")
-    try:
-        req = urllib.request.Request(url, data=data)
-        urllib.request.urlopen(req)
-    except Exception as e:
-        print(f"Telegram error: {e}")
-
 def main():
     print("Post-workout analyse gestart!")
     
@@ -103,7 +90,7 @@ def main():
         f"❤️ *Gem. Hartslag:* {avg_hr} bpm\n\n"
         f"🗣️ *Coach Analyse:*\n{ai_bericht}"
     )
-    stuur_telegram(telegram_bericht)
+    stuur_telegram(telegram_bericht, parse_mode="Markdown")
 
 if __name__ == "__main__":
     main()
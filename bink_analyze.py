@@ -1,28 +1,42 @@
+"""Post-workout analyse: stats + AI-coach naar Telegram en workout.json.
+
+Niets wacht meer op de traagste stap: het stats-bericht gaat meteen weg, het
+coach-advies komt er als stream achteraan en vult dat bericht aan
+(editMessageText). Is het advies niet binnen COACH_DEADLINE seconden klaar, dan
+komt het standaardbericht erin; arriveert het daarna alsnog (tot
+COACH_LIMIET), dan volgt het als los bericht. De duur van elke fase gaat als
+span naar bink_metrics en komt in het latentie-rapport, zodat zichtbaar is
+waar het trage pad zit."""
+import asyncio
 import os
 import json
-import urllib.request
-import urllib.parse
-from openai import OpenAI
-
-# Haal de geheime sleutels op
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
-API_KEY = os.environ.get("OPENAI_API_KEY")
-
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode({"chat_id": TG_CHAT_ID, "text": bericht, "parse_mode": "Markdown"}).encode("utf-8")
-    try:
-        req = urllib.request.Request(url, data=data)
-        urllib.request.urlopen(req)
-    except Exception as e:
-        print(f"Telegram error: {e}")
-
-def main():
-    print("Post-workout analyse gestart!")
-    
-    # 1. Lees de payload data
+import threading
+import time
+
+from bink_coach import (STANDAARD, CoachCache, cache_sleutel, maak_client, stream_coach,
+                        uit_cache)
+from bink_telegram import bewerk_telegram, stuur_direct, stuur_telegram
+from bink_workout import lees_workout, schrijf_workout
+import bink_metrics as metrics
+
+COACH_DEADLINE = float(os.environ.get("BINK_COACH_DEADLINE", "20"))
+COACH_LIMIET = 90          # daarna geven we het stream-antwoord op
+BEWERK_INTERVAL = 2.0      # tussentijdse stream-updates in Telegram, max. 1 per zoveel s
+
+
+def latentie_rapport():
+    """Duur per fase (de spans van deze run, in volgorde) + totaal."""
+    delen = [f"{naam} {ms}ms" for naam, ms, _ in metrics.SPANS]
+    return f"⏱️ Latentie: {', '.join(delen)} | totaal {metrics.totaal_ms()}ms"
+
+
+def rond_af(ok=True):
+    print(latentie_rapport())
+    metrics.schrijf_run("bink_analyze", ok)
+
+
+def lees_stats():
+    """(duration, calories, avg_hr, max_hr) uit de repository_dispatch-payload."""
     event_path = os.environ.get("GITHUB_EVENT_PATH")
     calories, avg_hr, max_hr, duration = 0, 0, 0, 0
     
@@ -43,70 +57,163 @@ def main():
             try: duration = round(float(payload.get("duration", 0))) 
             except: pass
 
+    return duration, calories, avg_hr, max_hr
+
+
+def stats_tekst(duration, calories, avg_hr, max_hr, coach):
+    return (
+        f"✅ *Workout Voltooid!*\n\n"
+        f"⏱️ *Duur:* {duration} min\n"
+        f"🔥 *Calorieën:* {calories} kcal\n"
+        f"❤️ *Gem. HR:* {avg_hr} bpm | 🚀 *Max HR:* {max_hr} bpm\n\n"
+        f"🗣️ *Coach Analyse:*\n{coach}"
+    )
+
+
+def schrijf_post_workout(stats, coach):
+    # Steeds opnieuw lezen: zo overschrijven we nooit een nieuwere workout.json.
+    data = lees_workout()
+    data["post_workout"] = {"completed": True, **stats, "post_coach": coach}
+    schrijf_workout(data, aankomend_pad=None)
+
+
+def start_stream(client, workout, stats, delen):
+    """Leest de coach-stream in een daemon-thread (blokkeert het afsluiten niet)
+    en zet de tekstdelen in 'delen'. Geeft een future die klaar is met de hele
+    tekst (of de fout), plus een future met het tijdstip (perf_counter) van het
+    eerste stukje."""
+    loop = asyncio.get_running_loop()
+    klaar, eerste = loop.create_future(), loop.create_future()
+
+    def zet(fut, waarde=None, fout=None):
+        if fut.done():
+            return
+        if fout is not None:
+            fut.set_exception(fout)
+        else:
+            fut.set_result(waarde)
+
+    def meld(*args):
+        try:
+            loop.call_soon_threadsafe(zet, *args)
+        except RuntimeError:
+            pass  # loop al gesloten (script klaar na de limiet)
+
+    def lees():
+        eind = time.monotonic() + COACH_LIMIET
+        try:
+            for stuk in stream_coach(client, workout, stats, timeout=COACH_LIMIET):
+                if not delen:
+                    meld(eerste, time.perf_counter())
+                delen.append(stuk)
+                if time.monotonic() > eind:
+                    raise TimeoutError(f"coach-stream na {COACH_LIMIET}s afgebroken")
+            meld(klaar, "".join(delen).strip())
+        except Exception as e:
+            meld(klaar, None, e)
+        meld(eerste, None)
+
+    threading.Thread(target=lees, name="coach-stream", daemon=True).start()
+    return klaar, eerste
+
+
+async def main():
+    print("Post-workout analyse gestart!")
+    metrics.reset()
+
+    with metrics.span("event"):
+        duration, calories, avg_hr, max_hr = lees_stats()
     if duration < 20:
         print(f"Workout was {duration} minuten. Korter dan 20 minuten. Script stopt.")
-        return 
+        return
+    stats = {"duration": duration, "calories": calories, "avg_hr": avg_hr, "max_hr": max_hr}
 
     # 2. Lees de WOD van vandaag op
-    workout_text = "Onbekende workout"
-    workout_data = {}
-    try:
-        if os.path.exists("workout.json"):
-            with open("workout.json", "r") as f:
-                workout_data = json.load(f)
-                workout_text = workout_data.get("workout", "Geen WOD gevonden")
-    except:
-        pass
-
-    # 3. Vraag de AI Coach (nu mét max_hr!)
-    ai_bericht = "Lekker gewerkt! 💪 Zorg voor een goede recovery."
-    if API_KEY:
+    with metrics.span("workout.json"):
+        workout_text = lees_workout().get("workout") or "Onbekende workout"
+
+    # 3. Coach-advies uit de cache? Dan is er niets om op te wachten.
+    cache = CoachCache().laad()
+    sleutel = cache_sleutel(workout_text, stats)
+    with metrics.span("cache"):
+        advies = uit_cache(cache, sleutel)
+    client = None
+    if not advies:
         try:
-            client = OpenAI(api_key=API_KEY)
-            prompt = (
-                f"Ik heb zojuist deze CrossFit WOD afgerond:\n{workout_text}\n\n"
-                f"Mijn stats van mijn Apple Watch:\n"
-                f"⏱️ Duur: {duration} minuten\n"
-                f"🔥 Calorieën: {calories} kcal\n"
-                f"❤️ Gemiddelde hartslag: {avg_hr} bpm\n"
-                f"🚀 Maximale hartslag: {max_hr} bpm\n\n"
-                "Je bent mijn no-nonsense CrossFit coach. Schrijf een kort, motiverend bericht "
-                "als recap van mijn training. Geef me één specifieke tip voor herstel op basis van "
-                "de bewegingen in de WOD of mijn hartslag-piek. Spreek me aan met 'je'."
-            )
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[
-                    {"role": "system", "content": "Je bent een ervaren en motiverende CrossFit coach."},
-                    {"role": "user", "content": prompt}
-                ]
-            )
-            ai_bericht = response.choices[0].message.content
+            client = maak_client()
         except Exception as e:
             print(f"AI Error: {e}")
+    if not advies and client is None:
+        advies = STANDAARD
 
-    # 4. Sla de post-workout data op
-    workout_data["post_workout"] = {
-        "completed": True,
-        "duration": duration,
-        "calories": calories,
-        "avg_hr": avg_hr,
-        "max_hr": max_hr, # <-- NIEUW
-        "post_coach": ai_bericht
-    }
-    
-    with open("workout.json", "w", encoding="utf-8") as f:
-        json.dump(workout_data, f, indent=4)
+    # 4. Stats-bericht meteen versturen (met het advies als dat er al is).
+    with metrics.span("telegram_stats"):
+        bericht_id = await asyncio.to_thread(
+            stuur_direct, stats_tekst(duration, calories, avg_hr, max_hr, advies or "_denkt na…_"), "Markdown")
+    with metrics.span("json_stats"):
+        schrijf_post_workout(stats, advies or STANDAARD)
 
-    # 5. Telegram bericht (Nu ook met max HR)
-    telegram_bericht = (
-        f"✅ *Workout Voltooid!*\n\n"
-        f"⏱️ *Duur:* {duration} min\n"
-        f"🔥 *Calorieën:* {calories} kcal\n"
-        f"❤️ *Gem. HR:* {avg_hr} bpm | 🚀 *Max HR:* {max_hr} bpm\n\n"
-        f"🗣️ *Coach Analyse:*\n{ai_bericht}"
-    )
-    stuur_telegram(telegram_bericht)
+    if advies:
+        if bericht_id is None:
+            stuur_telegram(stats_tekst(duration, calories, avg_hr, max_hr, advies), parse_mode="Markdown")
+        cache.bewaar()
+        rond_af()
+        return
+
+    # 5. Coach streamen, met een harde deadline.
+    delen = []
+    t_stream = time.perf_counter()
+    klaar, eerste = start_stream(client, workout_text, stats, delen)
+    eind = time.monotonic() + COACH_DEADLINE
+    vorige_stand = ""
+    while not klaar.done() and time.monotonic() < eind:
+        await asyncio.wait([klaar], timeout=min(BEWERK_INTERVAL, max(0.0, eind - time.monotonic())))
+        stand = "".join(delen).strip()
+        if not klaar.done() and stand and stand != vorige_stand:
+            # Tussenstand laten zien terwijl de coach nog typt.
+            await asyncio.to_thread(bewerk_telegram, bericht_id,
+                                    stats_tekst(duration, calories, avg_hr, max_hr, stand + " …"), "Markdown")
+            vorige_stand = stand
+
+    def noteer_stream():
+        # Liep buiten de hoofdflow (thread): als span achteraf vastleggen.
+        if eerste.done() and eerste.result():
+            metrics.registreer("coach_eerste_token", (eerste.result() - t_stream) * 1000)
+        metrics.registreer("coach_stream", (time.perf_counter() - t_stream) * 1000)
+
+    advies = None
+    if klaar.done():
+        noteer_stream()
+        try:
+            advies = klaar.result()
+        except Exception as e:
+            print(f"AI Error: {e}")
+    else:
+        print(f"⌛ Coach niet binnen {COACH_DEADLINE:.0f}s klaar; standaardbericht.")
+
+    with metrics.span("telegram_bewerk"):
+        tekst = stats_tekst(duration, calories, avg_hr, max_hr, advies or STANDAARD)
+        if not await asyncio.to_thread(bewerk_telegram, bericht_id, tekst, "Markdown"):
+            stuur_telegram(tekst, parse_mode="Markdown")
+
+    if not advies and not klaar.done():
+        # Na de deadline: wacht nog tot COACH_LIMIET en stuur het dan als los bericht.
+        try:
+            advies = await asyncio.wait_for(asyncio.shield(klaar), timeout=COACH_LIMIET - COACH_DEADLINE)
+            noteer_stream()
+            if advies:
+                stuur_telegram(f"🗣️ *Coach Analyse (alsnog):*\n{advies}", parse_mode="Markdown")
+        except asyncio.TimeoutError:
+            print(f"⌛ Coach ook na {COACH_LIMIET}s niet klaar; opgegeven.")
+        except Exception as e:
+            print(f"AI Error: {e}")
+
+    if advies:
+        cache.zet(sleutel, advies)
+        with metrics.span("json_coach"):
+            schrijf_post_workout(stats, advies)
+    cache.bewaar()
+    rond_af(advies is not None)
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -1,49 +1,88 @@
 import asyncio
+import hashlib
 import json
 import os
+import signal
+import sys
 import time
-import urllib.request
-import urllib.parse
-import csv
-import difflib
 from playwright.async_api import async_playwright
 from datetime import datetime, timedelta
 
+from bink_bezetting import registreer as registreer_bezetting
+from bink_dejavu import deja_vu, laad_index, normaliseer_wod
+from bink_herinnering import herinner_lus
+from bink_historie import exporteer_csv, open_db, upsert
+from bink_http import HTTP_VERKEER, ParseFout, scrape_http
+from bink_browser import VERKEER, maak_context, nieuwe_pagina, start_browser, verkeer_rapport
+from bink_sessie import http_sessie, zorg_voor_login
+from bink_telegram import stuur_telegram, verstuur_spool
+from bink_vulling import lees_hints, pas_hints_toe
+from bink_workout import lees_workout, schrijf_workout
+from bink_model import rooster_uit_snapshots, rooster_uit_workout
+import bink_metrics as metrics
+import bink_wacht as wacht
+from bink_rooster import (
+    DAGEN_EN, DAGEN_NL, LOGIN_URL, WEKEN, WOD_URL, ZALEN, dagen_deze_week,
+    dagen_volgende_week, kies_eigen_les, lege_status, lessen_per_dag,
+    rooster_url, status_uit_class, vul_status_aan,
+)
+
 os.environ['TZ'] = 'Europe/Amsterdam'
 try: time.tzset()
 except: pass
 
 EMAIL = os.environ.get("BINK_EMAIL")
 PASSWORD = os.environ.get("BINK_PASSWORD")
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
 # Hoeveel keer proberen we de hele scrape voordat we opgeven?
 MAX_POGINGEN = 3
 # Minimaal aantal uur tussen twee "het blijft falen"-alerts (throttle).
 ALERT_THROTTLE_UUR = 3
-
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID:
-        print("⚠️ Geen Telegram gegevens, bericht niet verstuurd.")
-        return
-    print(f"📨 Telegram: {bericht}")
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode({"chat_id": TG_CHAT_ID, "text": bericht}).encode("utf-8")
-    try:
-        req = urllib.request.Request(url, data=data)
-        urllib.request.urlopen(req, timeout=15)
-    except Exception as e:
-        print(f"❌ Telegram fout: {e}")
+# Max. aantal roosterpagina's dat we tegelijk laden (netjes blijven voor de site).
+try: MAX_PARALLEL = max(1, int(os.environ.get("BINK_PARALLEL", "3")))
+except ValueError: MAX_PARALLEL = 3
+# Scrape-engine: 'auto' (HTTP, bij leesproblemen terugval op Playwright),
+# 'http' (alleen HTTP) of 'playwright' (altijd de browser).
+ENGINE = os.environ.get("BINK_ENGINE", "auto").lower()
+# Klein bestand dat elke run bijwerkt; workout.json alleen als er iets veranderd is.
+HEARTBEAT_FILE = "heartbeat.json"
 
 def lees_workout_json():
+    return lees_workout()
+
+def lees_heartbeat():
     try:
-        if os.path.exists("workout.json"):
-            with open("workout.json", "r", encoding="utf-8") as f:
-                return json.load(f)
+        with open(HEARTBEAT_FILE, encoding="utf-8") as f:
+            return json.load(f)
     except Exception:
-        pass
-    return {}
+        return {}
+
+def schrijf_heartbeat(now, hashes, gewijzigd):
+    """last_run = elke geslaagde run, last_change = laatste run met nieuwe inhoud."""
+    oud = lees_heartbeat()
+    tijd = now.isoformat(timespec="seconds")
+    data = {
+        "last_run": tijd,
+        "last_change": tijd if gewijzigd else oud.get("last_change", tijd),
+        "hashes": hashes,
+    }
+    with open(HEARTBEAT_FILE, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+
+def _hash(tekst):
+    return hashlib.sha256(tekst.encode("utf-8")).hexdigest()[:16]
+
+def inhoud_hashes(datum, full_text, snapshots):
+    """Hash van de WOD (genormaliseerd) en van elke (zaal, week)-snapshot.
+    De datum telt mee: de views (vandaag/morgen) hangen ervan af."""
+    return {
+        "datum": datum,
+        "wod": _hash(normaliseer_wod(full_text)),
+        "rooster": {
+            f"{zaal}|{week}": _hash(json.dumps(snap, sort_keys=True, ensure_ascii=False))
+            for (zaal, week), snap in sorted(snapshots.items())
+        },
+    }
 
 def schoon_wod_tekst(tekst):
     """Maakt de ruwe kaart-tekst netjes: verwijdert de 'Share'-knop, de losse
@@ -66,75 +105,34 @@ def schoon_wod_tekst(tekst):
         resultaat.pop()
     return "\n".join(resultaat)
 
-def _normaliseer_wod(tekst):
-    """Maakt een WOD-tekst vergelijkbaar: kleine letters, leestekens weg,
-    scheidingstekens ('|', nieuwe regels) naar spaties, dubbele spaties inklappen."""
-    if not tekst:
-        return ""
-    t = tekst.lower().replace("|", " ").replace("\n", " ")
-    t = "".join(ch if (ch.isalnum() or ch.isspace()) else " " for ch in t)
-    return " ".join(t.split())
-
-def _parse_dmy(datum):
+def bereken_deja_vu(vandaag_workout, datum_vandaag):
+    """Zoekt de meest gelijkende WOD van een EERDERE datum via de déjà-vu-index
+    (bink_dejavu; bijgewerkt met wat er sinds de vorige run in de historie kwam).
+    Retourneert {'datum','gelijkenis','soort'} of None."""
     try:
-        return datetime.strptime(datum, "%d-%m-%Y")
-    except Exception:
-        return None
-
-def bereken_deja_vu(vandaag_workout, datum_vandaag, history_file="history.csv"):
-    """Zoekt in history.csv de meest gelijkende WOD van een EERDERE datum.
-    Retourneert {'datum','gelijkenis','soort'} of None. Groepeert per datum
-    (history bevat dezelfde WOD meerdere keren door de uurlijkse runs)."""
-    doel = _normaliseer_wod(vandaag_workout)
-    if len(doel) < 15:
+        return deja_vu(vandaag_workout, datum_vandaag)
+    except Exception as e:
+        print(f"Déjà-vu-check mislukt: {e}")
         return None
 
-    per_datum = {}
+def update_history(datum, dag, workout, coach=""):
+    """Upsert van de WOD van vandaag in history.db (1 rij per datum). Alleen bij
+    een wijziging worden history.csv (export) en de déjà-vu-index bijgewerkt."""
+    conn = open_db()
     try:
-        with open(history_file, newline="", encoding="utf-8") as f:
-            reader = csv.reader(f)
-            next(reader, None)  # header overslaan
-            for rij in reader:
-                if len(rij) < 3:
-                    continue
-                datum, workout = rij[0], rij[2]
-                if not datum or datum == datum_vandaag:
-                    continue
-                n = _normaliseer_wod(workout)
-                if len(n) >= 15:
-                    per_datum[datum] = n  # zelfde datum = zelfde WOD, laatste wint
-    except FileNotFoundError:
-        return None
-
-    beste_datum, beste_ratio = None, 0.0
-    for datum, n in per_datum.items():
-        ratio = difflib.SequenceMatcher(None, doel, n).ratio()
-        if ratio > beste_ratio:
-            beste_datum, beste_ratio = datum, ratio
-        elif ratio == beste_ratio and beste_datum:
-            # Gelijke score: kies de meest recente datum.
-            d_new, d_old = _parse_dmy(datum), _parse_dmy(beste_datum)
-            if d_new and d_old and d_new > d_old:
-                beste_datum = datum
-
-    if not beste_datum or beste_ratio < 0.55:
-        return None
-    return {
-        "datum": beste_datum,
-        "gelijkenis": round(beste_ratio * 100),
-        "soort": "identiek" if beste_ratio >= 0.9 else "lijkt op",
-    }
-
-def update_history_csv(datum, dag, workout, coach=""):
-    file_name = "history.csv"
-    file_exists = os.path.isfile(file_name)
-    with open(file_name, mode='a', newline='', encoding='utf-8') as file:
-        writer = csv.writer(file)
-        if not file_exists: writer.writerow(["Datum", "Dag", "Workout", "AI Coach Advies"])
-        writer.writerow([datum, dag, workout.replace("\n", " | "), (coach or "").replace("\n", " ")])
+        if not upsert(conn, datum, dag, workout, coach):
+            return
+        exporteer_csv(conn)
+    finally:
+        conn.close()
+    try:
+        laad_index().bewaar()
+    except Exception as e:
+        print(f"Déjà-vu-index niet bijgewerkt: {e}")
 
 async def extract_les(les, zaal_naam):
-    """Leest 1 les-blokje uit tot een dict, of None bij een fout."""
+    """Leest 1 les-blokje uit tot een dict, of None bij een fout.
+    (Per-element pad: 4+ round trips per les; zie lees_les_records voor bulk.)"""
     try:
         les_tijd = (await les.locator(".event-date").first.inner_text()).strip()
         les_type = (await les.locator(".event-name").first.inner_text()).strip()
@@ -144,325 +142,318 @@ async def extract_les(les, zaal_naam):
         except: pass
 
         les_class = await les.get_attribute("class") or ""
-        les_status = "Open"
-        if "full" in les_class: les_status = "Vol (Wachtlijst)"
-        if "signedup" in les_class or "booked" in les_class: les_status = "Jij bent Ingeschreven"
-        if "on-waiting-list" in les_class: les_status = "Jij staat op Wachtlijst"
 
         return {
             "tijd": les_tijd,
             "type": les_type,
             "zaal": zaal_naam,
             "deelnemers": les_deelnemers,
-            "status": les_status,
+            "status": status_uit_class(les_class),
         }
     except:
         return None
 
-# Zalen + roosterpagina's (1 pagina toont een hele week per zaal).
-ZALEN = {
-    "Zaal 1": "https://www.crossfitbink36.nl/rooster",
-    "Zaal 2": "https://www.crossfitbink36.nl/rooster?hall=Zaal%202",
-    "Buiten": "https://www.crossfitbink36.nl/rooster?hall=Buiten",
-}
-
-DAGEN_NL = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
-DAGEN_EN = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
-
-async def scrape_rooster_dagen(page, doel_dagen, week_param):
-    """Scrapet de lessen voor een set dagen op één roosterweek.
-    - doel_dagen: lijst van (datum_obj, dag_nl, dag_en)
-    - week_param: None voor de huidige week, 'next' voor volgende week.
-    Elke dag krijgt dag/dag_en/datum/week + lessen mee zodat de widget er direct
-    voor kan in-/uitschrijven."""
-    week_label = "next" if week_param == "next" else "current"
-    dag_objs = {}
-    volgorde = []
-    for datum_obj, nl, en in doel_dagen:
-        dag_objs[en] = {
-            "dag": nl,
-            "dag_en": en,
-            "datum": datum_obj.strftime("%d-%m-%Y"),
-            "week": week_label,
-            "lessen": [],
-        }
-        volgorde.append(en)
-
-    if not volgorde:
-        return []
-
-    for zaal_naam, zaal_url in ZALEN.items():
-        if week_param == "next":
-            url = f"{zaal_url}&week=next" if "?" in zaal_url else f"{zaal_url}?week=next"
-        else:
-            url = zaal_url
-        await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-        try:
-            await page.wait_for_selector("li[data-remodal-target]", timeout=8000)
-        except:
-            pass
-
-        for en in volgorde:
-            elementen = await page.locator(f"li[data-remodal-target*='{en}']").all()
-            for les in elementen:
-                d = await extract_les(les, zaal_naam)
-                if d:
-                    dag_objs[en]["lessen"].append(d)
-
-    for en in volgorde:
-        dag_objs[en]["lessen"] = sorted(dag_objs[en]["lessen"], key=lambda x: x["tijd"])
-
-    return [dag_objs[en] for en in volgorde]
-
-async def scrape_deze_week_rooster(page):
-    """Resterende dagen van de HUIDIGE week: vanaf overmorgen t/m zondag.
-    (Vandaag en morgen hebben al hun eigen status/rooster.)"""
-    now = datetime.now()
-    dagen = []
-    for offset in range(2, 7 - now.weekday()):  # overmorgen .. zondag deze week
-        datum_obj = now + timedelta(days=offset)
-        wd = datum_obj.weekday()
-        dagen.append((datum_obj, DAGEN_NL[wd], DAGEN_EN[wd]))
-    return await scrape_rooster_dagen(page, dagen, week_param=None)
-
-async def scrape_week_rooster(page):
-    """Volledige AANKOMENDE week (week=next), alle 7 dagen."""
-    now = datetime.now()
-    maandag_deze_week = now - timedelta(days=now.weekday())
-    maandag_volgende = maandag_deze_week + timedelta(days=7)
-    dagen = []
-    for i in range(7):
-        datum_obj = maandag_volgende + timedelta(days=i)
-        dagen.append((datum_obj, DAGEN_NL[i], DAGEN_EN[i]))
-    return await scrape_rooster_dagen(page, dagen, week_param="next")
-
-async def check_dag_status_en_rooster(page, dag_en, is_volgende_week=False):
-    status = {
-        "ingeschreven": False,
-        "tijd": "",
-        "type": "",
-        "deelnemers": "",
-        "wachtlijst": False,
-        "wachtlijst_plek": "?",
-        "wachtlijst_totaal": "?"
-    }
-
-    volledig_rooster = [] # <-- Hier slaan we alle lessen van de dag in op
-
-    zalen = {
-        "Zaal 1": "https://www.crossfitbink36.nl/rooster",
-        "Zaal 2": "https://www.crossfitbink36.nl/rooster?hall=Zaal%202",
-        "Buiten": "https://www.crossfitbink36.nl/rooster?hall=Buiten"
+# Leest ALLE les-blokjes van de pagina in 1 evaluate (1 round trip i.p.v. 4+ per les).
+# Volgorde = documentvolgorde, dus index i hoort bij locator(...).nth(i).
+LES_RECORDS_JS = '''() => Array.from(document.querySelectorAll('li[data-remodal-target]')).map(li => {
+    const tekst = (sel) => { const el = li.querySelector(sel); return el ? el.innerText.trim() : null; };
+    const cls = li.getAttribute('class') || '';
+    return {
+        target: li.getAttribute('data-remodal-target') || '',
+        tijd: tekst('.event-date'),
+        type: tekst('.event-name'),
+        deelnemers: tekst('.event-registrations') || '',
+        class: cls,
+        vol: cls.includes('full'),
+        ingeschreven: cls.includes('signedup') || cls.includes('booked'),
+        wachtlijst: cls.includes('on-waiting-list'),
+    };
+})'''
+
+async def lees_les_records(page):
+    """Alle lessen op de geladen roosterpagina als records (target, tijd, type,
+    deelnemers, class + vlaggen), in 1 page.evaluate."""
+    return await page.evaluate(LES_RECORDS_JS)
+
+# Leest de "Aanmeldingen"/wachtlijst-regels uit de geopende les-modal.
+MODAL_JS = '''() => {
+    let res = {};
+    let cols = Array.from(document.querySelectorAll('.remodal-is-opened .grid .col'));
+    for (let i = 0; i < cols.length; i++) {
+        let text = cols[i].innerText.trim();
+        if (text.includes('Aanmeldingen')) res.deelnemers = cols[i+1] ? cols[i+1].innerText.trim() : '';
+        else if (text.includes('Positie op wachtlijst')) res.wachtlijst_plek = cols[i+1] ? cols[i+1].innerText.trim() : '';
+        else if (text === 'Wachtlijst:' || text === 'Wachtlijst') res.wachtlijst_totaal = cols[i+1] ? cols[i+1].innerText.trim() : '';
     }
-
-    for zaal_naam, zaal_url in zalen.items():
-        if is_volgende_week:
-            url = f"{zaal_url}&week=next" if "?" in zaal_url else f"{zaal_url}?week=next"
-        else:
-            url = zaal_url
-
+    return res;
+}'''
+
+async def lees_persoonlijke_status(page, dag_en, records):
+    """Leest op de GELADEN roosterpagina jouw inschrijving voor dag_en (wachtlijst
+    gaat voor normaal). Tijd/type komen uit de records; alleen voor deelnemers/
+    wachtlijstpositie openen we de modal van die ene les."""
+    status = lege_status()
+    gevonden = kies_eigen_les(records, dag_en)
+    if not gevonden:
+        return status
+
+    index, record, status["wachtlijst"] = gevonden
+    status["ingeschreven"] = True
+    status["tijd"] = record.get("tijd") or ""
+    status["type"] = record.get("type") or ""
+
+    with metrics.span("modal"):
+        await page.locator("li[data-remodal-target]").nth(index).click()
+        try:
+            await wacht.modal_open(page)
+            vul_status_aan(status, await page.evaluate(MODAL_JS))
+        except: pass
+        await wacht.sluit_modal(page)
+    return status
+
+async def laad_rooster_snapshot(page, zaal_naam, week, status_dagen=()):
+    """Laadt de roosterpagina van (zaal, week) precies 1 keer en leest ALLE lessen
+    van die week in 1 evaluate uit, gegroepeerd per dag. Voor de dagen in
+    status_dagen wordt meteen ook je persoonlijke status gelezen (zolang de
+    pagina toch open staat)."""
+    with metrics.span(f"rooster:{zaal_naam}/{week}"):
+        metrics.tel("navigaties")
         # domcontentloaded i.p.v. networkidle (networkidle timeout't vaak in Actions).
-        await page.goto(url, wait_until="domcontentloaded", timeout=45000)
-        # Wacht kort op het rooster; ontbreken mag (lege dag/zaal), dan gaan we door.
+        await page.goto(rooster_url(zaal_naam, week), wait_until="domcontentloaded", timeout=45000)
+        # Wacht kort op het rooster; ontbreken mag (lege zaal/week), dan gaan we door.
         try:
             await page.wait_for_selector("li[data-remodal-target]", timeout=8000)
         except:
             pass
 
-        # --- ALLE LESSEN VAN DEZE DAG IN DEZE ZAAL SCRAPEN ---
-        selector_alle_lessen = f"li[data-remodal-target*='{dag_en}']"
-        alle_lessen_elementen = await page.locator(selector_alle_lessen).all()
-
-        for les in alle_lessen_elementen:
-            try:
-                les_tijd = (await les.locator(".event-date").first.inner_text()).strip()
-                les_type = (await les.locator(".event-name").first.inner_text()).strip()
-
-                # Probeer het aantal deelnemers (bijv. 14/16) direct van het blokje te lezen
-                les_deelnemers = ""
-                try: les_deelnemers = (await les.locator(".event-registrations").first.inner_text()).strip()
-                except: pass
-
-                # Bepaal of de les vol is
-                les_class = await les.get_attribute("class") or ""
-                les_status = "Open"
-                if "full" in les_class: les_status = "Vol (Wachtlijst)"
-                if "signedup" in les_class or "booked" in les_class: les_status = "Jij bent Ingeschreven"
-                if "on-waiting-list" in les_class: les_status = "Jij staat op Wachtlijst"
-
-                volledig_rooster.append({
-                    "tijd": les_tijd,
-                    "type": les_type,
-                    "zaal": zaal_naam,
-                    "deelnemers": les_deelnemers,
-                    "status": les_status
-                })
-            except: pass
-
-        # --- JOUW PERSOONLIJKE INSCHRIJVING CHECK (Wachtlijst) ---
-        selector_wachtlijst = f"li.on-waiting-list[data-remodal-target*='{dag_en}']"
-        les_wachtlijst = page.locator(selector_wachtlijst).first
-
-        if not status["ingeschreven"] and await les_wachtlijst.count() > 0:
-            status["ingeschreven"] = True
-            status["wachtlijst"] = True
-            try: status["tijd"] = (await les_wachtlijst.locator(".event-date").first.inner_text()).strip()
-            except: pass
-            try: status["type"] = (await les_wachtlijst.locator(".event-name").first.inner_text()).strip()
-            except: pass
-
-            await les_wachtlijst.click()
-            try:
-                await page.wait_for_selector(".remodal-is-opened", timeout=5000)
-                await page.wait_for_timeout(1500)
-                modal_data = await page.evaluate('''() => {
-                    let res = {};
-                    let cols = Array.from(document.querySelectorAll('.remodal-is-opened .grid .col'));
-                    for (let i = 0; i < cols.length; i++) {
-                        let text = cols[i].innerText.trim();
-                        if (text.includes('Aanmeldingen')) res.deelnemers = cols[i+1] ? cols[i+1].innerText.trim() : '';
-                        else if (text.includes('Positie op wachtlijst')) res.wachtlijst_plek = cols[i+1] ? cols[i+1].innerText.trim() : '';
-                        else if (text === 'Wachtlijst:' || text === 'Wachtlijst') res.wachtlijst_totaal = cols[i+1] ? cols[i+1].innerText.trim() : '';
-                    }
-                    return res;
-                }''')
-                if modal_data.get("deelnemers"): status["deelnemers"] = modal_data["deelnemers"]
-                if modal_data.get("wachtlijst_plek"): status["wachtlijst_plek"] = modal_data["wachtlijst_plek"]
-                if modal_data.get("wachtlijst_totaal"): status["wachtlijst_totaal"] = modal_data["wachtlijst_totaal"]
-            except: pass
-            await page.keyboard.press("Escape")
-            await page.wait_for_timeout(1000)
-
-        # --- JOUW PERSOONLIJKE INSCHRIJVING CHECK (Normaal) ---
-        selector_ingeschreven = f"li.workout-signedup[data-remodal-target*='{dag_en}'], li[class*='signed'][data-remodal-target*='{dag_en}'], li[class*='booked'][data-remodal-target*='{dag_en}']"
-        les_ingeschreven = page.locator(selector_ingeschreven).first
-
-        if not status["ingeschreven"] and await les_ingeschreven.count() > 0:
-            status["ingeschreven"] = True
-            try: status["tijd"] = (await les_ingeschreven.locator(".event-date").first.inner_text()).strip()
-            except: pass
-            try: status["type"] = (await les_ingeschreven.locator(".event-name").first.inner_text()).strip()
-            except: pass
+        records = await lees_les_records(page)
+    statussen = {}
+    for dag_en in status_dagen:
+        statussen[dag_en] = await lees_persoonlijke_status(page, dag_en, records)
+
+    return {"zaal": zaal_naam, "week": week, "lessen": lessen_per_dag(records, zaal_naam), "status": statussen}
+
+async def laad_rooster_snapshots(context, status_dagen, max_parallel=None):
+    """Laadt elke (zaal, week)-pagina 1 keer per run (max. 6 pagina's), parallel
+    over een begrensde pool van pagina's in dezelfde (ingelogde) context.
+    - status_dagen: {'current': [dag_en, ...], 'next': [...]} waarvoor ook je
+      persoonlijke status nodig is.
+    - max_parallel: max. aantal pagina's tegelijk (default BINK_PARALLEL; 1 =
+      sequentieel, zoals vroeger).
+    Retourneert {(zaal, week): snapshot}; alle views worden hieruit opgebouwd.
+    Een trage zaal houdt zo de andere niet meer op."""
+    taken = [(zaal_naam, week) for week in WEKEN for zaal_naam in ZALEN]
+    limiet = max(1, min(max_parallel or MAX_PARALLEL, len(taken)))
+
+    pool = asyncio.Queue()
+    paginas = []
+    for _ in range(limiet):
+        pagina = await nieuwe_pagina(context)
+        paginas.append(pagina)
+        pool.put_nowait(pagina)
+
+    async def laad(zaal_naam, week):
+        pagina = await pool.get()
+        try:
+            return await laad_rooster_snapshot(pagina, zaal_naam, week, status_dagen.get(week, ()))
+        finally:
+            pool.put_nowait(pagina)
 
-            await les_ingeschreven.click()
-            try:
-                await page.wait_for_selector(".remodal-is-opened", timeout=5000)
-                await page.wait_for_timeout(1500)
-                modal_data = await page.evaluate('''() => {
-                    let res = {};
-                    let cols = Array.from(document.querySelectorAll('.remodal-is-opened .grid .col'));
-                    for (let i = 0; i < cols.length; i++) {
-                        if (cols[i].innerText.includes('Aanmeldingen')) res.deelnemers = cols[i+1] ? cols[i+1].innerText.trim() : '';
-                    }
-                    return res;
-                }''')
-                if modal_data.get("deelnemers"): status["deelnemers"] = modal_data["deelnemers"]
+    try:
+        # return_exceptions: eerst alles laten afronden, dan pas de fout opgooien
+        # (anders sluiten we pagina's onder lopende taken weg).
+        resultaten = await asyncio.gather(*(laad(z, w) for z, w in taken), return_exceptions=True)
+    finally:
+        for pagina in paginas:
+            try: await pagina.close()
             except: pass
-            await page.keyboard.press("Escape")
-            await page.wait_for_timeout(1000)
 
-    # Sorteer het rooster netjes op tijdstip
-    volledig_rooster = sorted(volledig_rooster, key=lambda x: x['tijd'])
-
-    return status, volledig_rooster
+    for (zaal_naam, week), res in zip(taken, resultaten):
+        if isinstance(res, BaseException):
+            raise Exception(f"Rooster {zaal_naam} ({week}) laden mislukt: {res}")
+    return dict(zip(taken, resultaten))
+
+async def haal_wod_tekst(page):
+    """Leest de WOD van vandaag (de hele les-kaart), opgeschoond."""
+    print("WOD checken...")
+    with metrics.span("wod"):
+        metrics.tel("navigaties")
+        await page.goto(WOD_URL, wait_until="domcontentloaded", timeout=45000)
+        try:
+            await page.wait_for_selector(".wod-card, .wod-list", timeout=8000)
+            # De hele les-kaart (.wod-card) bevat naast het metcon-blok (.wod-list)
+            # ook Strength/Techniek/Accessory, die BUITEN .wod-list staan.
+            # Daarom pakken we de hele kaart i.p.v. alleen het eerste .wod-list.
+            if await page.locator(".wod-card").count() > 0:
+                ruwe_tekst = await page.locator(".wod-card").first.inner_text()
+            else:
+                ruwe_tekst = await page.locator(".wod-list").first.locator("xpath=..").inner_text()
+            full_text = schoon_wod_tekst(ruwe_tekst)
+            if not full_text:
+                full_text = "Geen WOD tekst gevonden."
+        except: full_text = "Geen WOD tekst gevonden."
+    return full_text
+
+async def login(page):
+    """Vult het ledenloginformulier in en verstuurt het."""
+    print("Inloggen...")
+    metrics.tel("navigaties")
+    await page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=45000)
+    await page.wait_for_selector("input[name*='user'], input[name*='email']", timeout=25000)
+
+    await page.locator("input[name*='user'], input[name*='email']").first.fill(EMAIL)
+    await page.locator("input[name*='pass']").first.fill(PASSWORD)
+    # Wacht op de navigatie na het posten i.p.v. vast 4 s.
+    await wacht.na_klik(page, page.locator("button[type='submit'], input[type='submit']").first.click, "login")
+
+async def scrape_in_context(context, page, status_dagen):
+    """(Bewaarde) login in een bestaande context, dan WOD + alle roosters."""
+    await zorg_voor_login(context, page, login)
+
+    # De WOD-pagina en de roosters laden tegelijk (zelfde login-context).
+    print(f"WOD + roosters laden (elke zaal/week 1 keer, max {MAX_PARALLEL} tegelijk)...")
+    return await asyncio.gather(
+        haal_wod_tekst(page),
+        laad_rooster_snapshots(context, status_dagen),
+    )
 
-async def scrape_once():
-    """Doet 1 volledige scrape. Schrijft bij succes workout.json + history.csv.
-    Gooit een exception als er iets misgaat (zodat de retry-lus opnieuw kan proberen)."""
+async def scrape_playwright(status_dagen):
+    """Browser-pad: (bewaarde) login, dan WOD + alle roosters. Retourneert (wod, snapshots)."""
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
-        page.set_default_timeout(20000)
+        browser = await start_browser(p)
+        context = await maak_context(browser)
+        page = await nieuwe_pagina(context)
+
+        try:
+            return await scrape_in_context(context, page, status_dagen)
+        finally:
+            print(verkeer_rapport())
+            await browser.close()
 
+async def haal_wod_en_roosters(status_dagen, warm=None):
+    """Kiest de engine (BINK_ENGINE). Standaard eerst HTTP zonder browser; alleen
+    als dat pad de pagina's niet kan lezen (ParseFout) valt hij terug op Playwright.
+    Met warm (WarmeSessie, daemon-modus) worden sessie en browser hergebruikt."""
+    if ENGINE != "playwright":
         try:
-            days_nl = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
-            days_en = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+            print("Inloggen + WOD + roosters via HTTP (zonder browser)...")
+
+            def via_http():
+                if not warm:
+                    return scrape_http(http_sessie(EMAIL, PASSWORD), status_dagen, MAX_PARALLEL)
+                sessie = warm.http_sessie()
+                try:
+                    return scrape_http(sessie, status_dagen, MAX_PARALLEL)
+                except ParseFout:
+                    # Lege pagina's door een verlopen sessie? Dan 1x opnieuw inloggen.
+                    if sessie.is_ingelogd():
+                        raise
+                    print("🔑 Sessie verlopen; opnieuw inloggen.")
+                    return scrape_http(warm.http_sessie(opnieuw=True), status_dagen, MAX_PARALLEL)
+
+            ruwe_wod, snapshots = await asyncio.to_thread(via_http)
+            print(f"📦 HTTP-verkeer: {HTTP_VERKEER['requests']} requests, "
+                  f"{HTTP_VERKEER['bytes'] / (1024 * 1024):.2f} MB")
+            full_text = schoon_wod_tekst(ruwe_wod or "") or "Geen WOD tekst gevonden."
+            return full_text, snapshots
+        except ParseFout as e:
+            if ENGINE == "http":
+                raise
+            print(f"⚠️ HTTP-pad kan de pagina niet lezen ({e}); terugval op Playwright.")
+    if warm:
+        return await warm.scrape_playwright(status_dagen)
+    return await scrape_playwright(status_dagen)
+
+async def scrape_once(warm=None):
+    """Doet 1 volledige scrape. Schrijft bij succes workout.json + history.db/.csv.
+    Gooit een exception als er iets misgaat (zodat de retry-lus opnieuw kan proberen)."""
+    now = datetime.now()
+    tomorrow = now + timedelta(days=1)
+
+    dag_nl_vandaag = DAGEN_NL[now.weekday()]
+    dag_en_vandaag = DAGEN_EN[now.weekday()]
+    datum_vandaag_str = now.strftime("%d-%m-%Y")
+
+    dag_nl_morgen = DAGEN_NL[tomorrow.weekday()]
+    dag_en_morgen = DAGEN_EN[tomorrow.weekday()]
+
+    week_morgen = "next" if now.weekday() == 6 else "current"
+
+    # Elke (zaal, week)-pagina precies 1 keer laden; vandaag, morgen, de rest
+    # van deze week en volgende week komen allemaal uit die snapshots.
+    status_dagen = {"current": [dag_en_vandaag], "next": []}
+    status_dagen[week_morgen].append(dag_en_morgen)
+    full_text, snapshots = await haal_wod_en_roosters(status_dagen, warm)
+
+    # Niets veranderd sinds de vorige run? Dan alleen de heartbeat bijwerken:
+    # geen history-update en geen nieuwe workout.json (= geen grote commit).
+    hashes = inhoud_hashes(datum_vandaag_str, full_text, snapshots)
+    oud_data = lees_workout_json()
+    if (hashes == lees_heartbeat().get("hashes") and oud_data.get("datum") == datum_vandaag_str
+            and "last_alert" not in oud_data):
+        schrijf_heartbeat(now, hashes, gewijzigd=False)
+        print("💤 WOD en roosters ongewijzigd; alleen heartbeat bijgewerkt.")
+        return
 
-            now = datetime.now()
-            tomorrow = now + timedelta(days=1)
+    # 1 keer parsen (bink_model); bezetting en alle views komen hieruit.
+    with metrics.span("parsen"):
+        rooster = rooster_uit_snapshots(snapshots, now)
 
-            dag_nl_vandaag = days_nl[now.weekday()]
-            dag_en_vandaag = days_en[now.weekday()]
-            datum_vandaag_str = now.strftime("%d-%m-%Y")
+    # Bezetting door de tijd (bink_bezetting); mag de scrape nooit laten falen.
+    try:
+        with metrics.span("schrijven:bezetting"):
+            print(f"📈 Bezetting: {registreer_bezetting(rooster, now)} nieuwe meting(en).")
+    except Exception as e:
+        print(f"⚠️ Bezetting niet opgeslagen: {e}")
+
+    status_vandaag = rooster.status(now).naar_dict()
+    rooster_vandaag = [les.naar_dict() for les in rooster.dag(now).lessen]
+    status_morgen = rooster.status(tomorrow).naar_dict()
+    rooster_morgen = [les.naar_dict() for les in rooster.dag(tomorrow).lessen]
+    rooster_deze_week = [rooster.dag(d).naar_dict() for d, _, _ in dagen_deze_week(now)]
+    rooster_week = [rooster.dag(d).naar_dict() for d, _, _ in dagen_volgende_week(now)]
+
+    bestaande_post_workout = None
+    if oud_data.get("datum") == datum_vandaag_str:
+        bestaande_post_workout = oud_data.get("post_workout")
+
+    data = {
+        "datum": datum_vandaag_str,
+        "dag": dag_nl_vandaag,
+        "workout": full_text.strip(),
+        "status_vandaag": status_vandaag,
+        "rooster_vandaag": rooster_vandaag,
+        "dag_morgen": dag_nl_morgen,
+        "status_morgen": status_morgen,
+        "rooster_morgen": rooster_morgen,
+        "rooster_deze_week": rooster_deze_week,
+        "rooster_week": rooster_week,
+        "last_success": now.isoformat(timespec="seconds"),
+    }
+    if bestaande_post_workout: data["post_workout"] = bestaande_post_workout
 
-            dag_nl_morgen = days_nl[tomorrow.weekday()]
-            dag_en_morgen = days_en[tomorrow.weekday()]
+    # Déjà vu: lijkt de WOD van vandaag op een eerdere uit de historie?
+    with metrics.span("dejavu"):
+        deja = bereken_deja_vu(full_text, datum_vandaag_str)
+    if deja:
+        data["deja_vu"] = deja
 
-            morgen_is_volgende_week = (now.weekday() == 6)
+    # Wanneer lopen de lessen meestal vol? (hints van bink_vulling)
+    pas_hints_toe(data, lees_hints())
 
-            print("Inloggen...")
-            # '/login' is een 404; de echte loginpagina is '/inloggen-voor-leden'.
-            await page.goto("https://www.crossfitbink36.nl/inloggen-voor-leden", wait_until="domcontentloaded", timeout=45000)
-            await page.wait_for_selector("input[name*='user'], input[name*='email']", timeout=25000)
+    # Bij succes eventuele oude storings-markering wissen.
+    data.pop("last_alert", None)
 
-            await page.locator("input[name*='user'], input[name*='email']").first.fill(EMAIL)
-            await page.locator("input[name*='pass']").first.fill(PASSWORD)
-            await page.locator("button[type='submit'], input[type='submit']").first.click()
-            await page.wait_for_timeout(4000)
+    with metrics.span("schrijven:workout"):
+        schrijf_workout(data)
 
-            print("WOD checken...")
-            await page.goto("https://www.crossfitbink36.nl/?workout=wod", wait_until="domcontentloaded", timeout=45000)
-            try:
-                await page.wait_for_selector(".wod-card, .wod-list", timeout=8000)
-                # De hele les-kaart (.wod-card) bevat naast het metcon-blok (.wod-list)
-                # ook Strength/Techniek/Accessory, die BUITEN .wod-list staan.
-                # Daarom pakken we de hele kaart i.p.v. alleen het eerste .wod-list.
-                if await page.locator(".wod-card").count() > 0:
-                    ruwe_tekst = await page.locator(".wod-card").first.inner_text()
-                else:
-                    ruwe_tekst = await page.locator(".wod-list").first.locator("xpath=..").inner_text()
-                full_text = schoon_wod_tekst(ruwe_tekst)
-                if not full_text:
-                    full_text = "Geen WOD tekst gevonden."
-            except: full_text = "Geen WOD tekst gevonden."
-
-            print("Naar Rooster voor status vandaag & morgen (Inclusief Compleet Rooster)...")
-            status_vandaag, rooster_vandaag = await check_dag_status_en_rooster(page, dag_en_vandaag, is_volgende_week=False)
-            status_morgen, rooster_morgen = await check_dag_status_en_rooster(page, dag_en_morgen, is_volgende_week=morgen_is_volgende_week)
-
-            print("Rooster resterende dagen huidige week scrapen...")
-            rooster_deze_week = await scrape_deze_week_rooster(page)
-
-            print("Volledig rooster van aankomende week scrapen...")
-            rooster_week = await scrape_week_rooster(page)
-
-            oud_data = lees_workout_json()
-            bestaande_post_workout = None
-            if oud_data.get("datum") == datum_vandaag_str:
-                bestaande_post_workout = oud_data.get("post_workout")
-
-            data = {
-                "datum": datum_vandaag_str,
-                "dag": dag_nl_vandaag,
-                "workout": full_text.strip(),
-                "status_vandaag": status_vandaag,
-                "rooster_vandaag": rooster_vandaag,
-                "dag_morgen": dag_nl_morgen,
-                "status_morgen": status_morgen,
-                "rooster_morgen": rooster_morgen,
-                "rooster_deze_week": rooster_deze_week,
-                "rooster_week": rooster_week,
-                "last_success": now.isoformat(timespec="seconds"),
-            }
-            if bestaande_post_workout: data["post_workout"] = bestaande_post_workout
-
-            # Déjà vu: lijkt de WOD van vandaag op een eerdere uit history.csv?
-            deja = bereken_deja_vu(full_text, datum_vandaag_str)
-            if deja:
-                data["deja_vu"] = deja
-
-            # Bij succes eventuele oude storings-markering wissen.
-            data.pop("last_alert", None)
-
-            with open("workout.json", "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=4)
-
-            if len(full_text) > 10:
-                update_history_csv(datum_vandaag_str, dag_nl_vandaag, full_text.strip())
-            print("✅ Succesvol!")
-        finally:
-            await browser.close()
+    if len(full_text) > 10:
+        with metrics.span("schrijven:historie"):
+            update_history(datum_vandaag_str, dag_nl_vandaag, full_text.strip())
+    schrijf_heartbeat(now, hashes, gewijzigd=True)
+    if wacht.METINGEN:
+        print(wacht.rapport())
+    print("✅ Succesvol!")
 
 def meld_storing_indien_nodig(laatste_fout):
     """Stuurt hooguit 1 Telegram-melding per ALERT_THROTTLE_UUR uur, zodat je bij
@@ -491,21 +482,37 @@ def meld_storing_indien_nodig(laatste_fout):
     # Markeer dat we net gealerteerd hebben (throttle onthouden).
     data["last_alert"] = now.isoformat(timespec="seconds")
     try:
-        with open("workout.json", "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=4)
+        schrijf_workout(data)
     except Exception as e:
         print(f"Kon last_alert niet opslaan: {e}")
 
+def verkeer_tellers():
+    """HTTP- en browserverkeer van deze run, voor bink_metrics."""
+    return {"http_requests": HTTP_VERKEER["requests"], "http_bytes": HTTP_VERKEER["bytes"],
+            "browser_requests": VERKEER["requests"], "browser_bytes": VERKEER["bytes"]}
+
+def nieuwe_meting():
+    """Spans, tellers en verkeer op nul: elke poging (en elke daemon-ronde)
+    krijgt zijn eigen metrics-record."""
+    metrics.reset()
+    HTTP_VERKEER.update(requests=0, bytes=0)
+    VERKEER.update(requests=0, bytes=0, geblokkeerd=0)
+
 async def main():
+    verstuur_spool()
     laatste_fout = None
     for poging in range(1, MAX_POGINGEN + 1):
+        nieuwe_meting()
+        metrics.tel("poging", poging)
         try:
             print(f"--- Poging {poging}/{MAX_POGINGEN} ---")
             await scrape_once()
+            metrics.schrijf_run("bink_auto", True, verkeer_tellers())
             return  # Succes -> exit 0, geen mail/ping.
         except Exception as e:
             laatste_fout = str(e)
             print(f"❌ Poging {poging} mislukt: {e}")
+            metrics.schrijf_run("bink_auto", False, verkeer_tellers())
             if poging < MAX_POGINGEN:
                 await asyncio.sleep(10)
 
@@ -514,5 +521,148 @@ async def main():
     print(f"❌ Alle {MAX_POGINGEN} pogingen mislukt. Laatste fout: {laatste_fout}")
     meld_storing_indien_nodig(laatste_fout)
 
+# --- Daemon-modus (python bink_auto.py --daemon) -------------------------------
+# Eén proces dat blijft draaien (bv. op een eigen server i.p.v. de uurlijkse
+# cron): de login blijft warm en de scrape-frequentie past zich aan. Met
+# --herinneringen stuurt hij ook de lesherinneringen (bink_herinnering), precies
+# op tijd; zet dan de herinnering-workflow uit.
+
+# Seconden tot de volgende scrape, per situatie.
+INTERVALLEN = {
+    "opening": 2 * 60,      # inschrijving volgende week gaat open
+    "druk": 5 * 60,         # wachtlijst / gevolgde les vol
+    "standaard": 15 * 60,
+    "nacht": 60 * 60,
+}
+NACHT_UREN = (0, 5)          # van 00:00 tot 05:00
+# Zondag 04:00-07:00 gaat het rooster van volgende week open (zie bink_inschrijven).
+OPENING = (6, 4, 7)
+# Lestypes die je volgt, bv. BINK_VOLG="Oly Lifting,WOD": staat er vandaag of
+# morgen zo'n les op vol, dan vaker kijken (er kan een plek vrijkomen).
+VOLG_TYPES = [t.strip().lower() for t in os.environ.get("BINK_VOLG", "").split(",") if t.strip()]
+
+class WarmeSessie:
+    """Houdt tussen scrapes de ingelogde HttpSessie open en, alleen als het
+    HTTP-pad faalt, ook een browser + context. Crasht de browser, dan start de
+    volgende scrape hem gewoon opnieuw."""
+
+    def __init__(self):
+        self._http = None
+        self._pw = None
+        self._browser = None
+        self._context = None
+        self._page = None
+
+    def http_sessie(self, opnieuw=False):
+        if opnieuw or self._http is None:
+            self._http = http_sessie(EMAIL, PASSWORD)
+        return self._http
+
+    def vergeet_http(self):
+        self._http = None
+
+    async def scrape_playwright(self, status_dagen):
+        if self._browser is None or not self._browser.is_connected():
+            await self.sluit()
+            print("🌐 Browser starten (blijft open tussen scrapes)...")
+            self._pw = await async_playwright().start()
+            self._browser = await start_browser(self._pw)
+            self._context = await maak_context(self._browser)
+            self._page = await nieuwe_pagina(self._context)
+        try:
+            return await scrape_in_context(self._context, self._page, status_dagen)
+        except Exception:
+            # Onbekende staat (crash, vastgelopen pagina): volgende keer vers.
+            await self.sluit()
+            raise
+
+    async def sluit(self):
+        try:
+            if self._browser: await self._browser.close()
+        except Exception: pass
+        try:
+            if self._pw: await self._pw.stop()
+        except Exception: pass
+        self._pw = self._browser = self._context = self._page = None
+
+def volgende_interval(data, now):
+    """(seconden, reden) tot de volgende scrape, op basis van de tijd en de
+    laatst geschreven workout.json."""
+    dag, uur = now.weekday(), now.hour
+    if dag == OPENING[0] and OPENING[1] <= uur < OPENING[2]:
+        return INTERVALLEN["opening"], "inschrijving gaat open"
+    if NACHT_UREN[0] <= uur < NACHT_UREN[1]:
+        return INTERVALLEN["nacht"], "nacht"
+    for key in ("status_vandaag", "status_morgen"):
+        if (data.get(key) or {}).get("wachtlijst"):
+            return INTERVALLEN["druk"], "je staat op een wachtlijst"
+    if VOLG_TYPES:
+        rooster = rooster_uit_workout(data)
+        for datum in (now, now + timedelta(days=1)):
+            dag = rooster.dag(datum)
+            for les in dag.lessen if dag else []:
+                if les.start is None or les.start <= now:
+                    continue
+                if les.status.vol and any(t in les.type.lower() for t in VOLG_TYPES):
+                    return INTERVALLEN["druk"], f"{les.type} {les.tijd} is vol"
+    return INTERVALLEN["standaard"], "standaard"
+
+async def daemon(rondes=None, herinneringen=False):
+    """Scrapet in een lus tot Ctrl+C/SIGTERM (of na 'rondes' scrapes).
+    Fouten breken de lus niet: korter wachten en opnieuw, met dezelfde
+    throttled storingsmelding als de cron-versie."""
+    stop = asyncio.Event()
+    try:
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+    except (NotImplementedError, RuntimeError):
+        pass  # bv. Windows: dan alleen Ctrl+C via KeyboardInterrupt
+
+    verstuur_spool()
+    # Na elke scrape de herinner-planner laten herplannen (nieuwe aankomend.json).
+    herplan = asyncio.Event()
+    planner = asyncio.ensure_future(herinner_lus(stop, herplan)) if herinneringen else None
+    warm = WarmeSessie()
+    fouten, ronde = 0, 0
+    print("🔁 Daemon gestart.")
+    try:
+        while not stop.is_set():
+            ronde += 1
+            nieuwe_meting()
+            print(f"--- Ronde {ronde} ({datetime.now().strftime('%H:%M:%S')}) ---")
+            try:
+                await scrape_once(warm)
+                metrics.schrijf_run("bink_auto:daemon", True, verkeer_tellers())
+                herplan.set()
+                fouten = 0
+            except Exception as e:
+                fouten += 1
+                metrics.schrijf_run("bink_auto:daemon", False, verkeer_tellers())
+                print(f"❌ Scrape mislukt ({fouten}x op rij): {e}")
+                warm.vergeet_http()
+                if fouten >= MAX_POGINGEN:
+                    meld_storing_indien_nodig(str(e))
+
+            if rondes and ronde >= rondes:
+                break
+            interval, reden = volgende_interval(lees_workout_json(), datetime.now())
+            if fouten:
+                interval = min(interval, 30 * 2 ** (fouten - 1))
+                reden = "na fout"
+            print(f"⏰ Volgende scrape over {interval // 60}m{interval % 60:02d}s ({reden}).")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=interval)
+            except asyncio.TimeoutError:
+                pass
+    finally:
+        if planner:
+            planner.cancel()
+        await warm.sluit()
+        print("🛑 Daemon gestopt.")
+
 if __name__ == "__main__":
-    asyncio.run(main())
+    if "--daemon" in sys.argv:
+        asyncio.run(daemon(herinneringen="--herinneringen" in sys.argv))
+    else:
+        asyncio.run(main())
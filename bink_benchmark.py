@@ -0,0 +1,78 @@
+"""Benchmark: les-extractie per element (extract_les) vs. in 1 evaluate
+(lees_les_records) op een opgeslagen roosterpagina.
+
+Gebruik:
+    python bink_benchmark.py rooster.html      # opgeslagen pagina (Ctrl+S)
+    python bink_benchmark.py --synthetisch     # gegenereerde week, 15 lessen/dag
+
+Telt de Playwright round trips (elke await op page/locator) en meet de tijd.
+Beide paden moeten exact dezelfde lessen opleveren."""
+import asyncio
+import sys
+import time
+from playwright.async_api import async_playwright
+
+from bink_auto import extract_les, lees_les_records
+from bink_browser import Teller
+from bink_mock import synthetisch_rooster_html
+from bink_rooster import DAGEN_EN, lessen_per_dag
+
+ZAAL = "Zaal 1"
+HERHALINGEN = 3
+
+
+async def oud_pad(page):
+    """Zoals vroeger: per dag een locator, per les extract_les."""
+    lessen = {en: [] for en in DAGEN_EN}
+    for en in DAGEN_EN:
+        for les in await page.locator(f"li[data-remodal-target*='{en}']").all():
+            d = await extract_les(les, ZAAL)
+            if d:
+                lessen[en].append(d)
+    return lessen
+
+
+async def nieuw_pad(page):
+    return lessen_per_dag(await lees_les_records(page), ZAAL)
+
+
+async def meet(page, pad):
+    teller = [0]
+    start = time.perf_counter()
+    for _ in range(HERHALINGEN):
+        resultaat = await pad(Teller(page, teller))
+    duur = (time.perf_counter() - start) / HERHALINGEN
+    return resultaat, teller[0] // HERHALINGEN, duur
+
+
+async def main():
+    if len(sys.argv) < 2:
+        print(__doc__)
+        return
+    if sys.argv[1] == "--synthetisch":
+        html = synthetisch_rooster_html()
+    else:
+        with open(sys.argv[1], encoding="utf-8") as f:
+            html = f.read()
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        page = await browser.new_page()
+        page.set_default_timeout(2000)
+        await page.set_content(html, wait_until="domcontentloaded")
+
+        oud, oud_rt, oud_tijd = await meet(page, oud_pad)
+        nieuw, nieuw_rt, nieuw_tijd = await meet(page, nieuw_pad)
+        await browser.close()
+
+    aantal = sum(len(v) for v in nieuw.values())
+    print(f"Lessen gevonden: {aantal}")
+    print(f"Per element : {oud_rt:5d} round trips, {oud_tijd * 1000:8.1f} ms")
+    print(f"1 evaluate  : {nieuw_rt:5d} round trips, {nieuw_tijd * 1000:8.1f} ms")
+    if nieuw_tijd > 0:
+        print(f"Versnelling : {oud_tijd / nieuw_tijd:.1f}x")
+    print("Zelfde resultaat:", "ja" if oud == nieuw else "NEE")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,306 @@
+"""Bezetting per les door de tijd: compacte, append-only tijdreeks uit elke scrape.
+
+Elke scrape ziet 'deelnemers' ("14/16") en de status van alle lessen in alle
+zalen voor twee weken; workout.json bewaart alleen de laatste stand. Hier
+houden we de hele geschiedenis bij, klein genoeg voor jaren uurlijkse scrapes:
+
+- LESSEN_FILE: 1 record van 12 bytes per les (start, zaal, weekdag, minuut
+  van de dag, type). Het record-nummer is het les-id; zaal- en typenamen zijn
+  geïnterneerd in NAMEN_FILE.
+- METINGEN_FILE: records van 12 bytes (tijd, les-id, aangemeld, capaciteit,
+  vlaggen). Alleen als er voor die les iets veranderd is t.o.v. de vorige
+  meting: een vulcurve is een trapfunctie, dus er gaat niets verloren en een
+  les die een week op 3/16 staat kost 1 record i.p.v. 168.
+- Schrijven gaat met struct (geen numpy nodig in de scrape-workflow); lezen
+  via np.memmap, zonder alles in Python-objecten te laden.
+- De bestanden staan niet in git maar gaan via actions/cache (append-only
+  binair: elke commit zou een volledige kopie zijn).
+
+    python bink_bezetting.py --info
+    python bink_bezetting.py --slot dinsdag 18:30 --zaal "Zaal 2"
+    python bink_bezetting.py --les 20-10-2026 18:15 --zaal "Zaal 2"
+
+Vereist voor het lezen numpy (pip install numpy)."""
+import argparse
+import calendar
+import json
+import os
+import struct
+from datetime import datetime, timedelta
+
+from bink_model import LesStatus, parse_tijd
+from bink_rooster import DAGEN_EN, DAGEN_NL
+
+LESSEN_FILE = "bezetting_lessen.bin"
+METINGEN_FILE = "bezetting.bin"
+NAMEN_FILE = "bezetting.json"
+
+LES = struct.Struct("<IBBHHH")      # start, zaal, weekdag, minuut, type, reserve
+METING = struct.Struct("<IIBBBB")   # tijd, les, aangemeld, capaciteit, vlaggen, reserve
+
+VOL = 1
+INGESCHREVEN = 2
+WACHTLIJST = 4
+
+def _pad(map_, naam):
+    return os.path.join(map_ or ".", naam)
+
+
+def vlaggen(status):
+    """LesStatus -> bitjes VOL/INGESCHREVEN/WACHTLIJST."""
+    v = VOL if status.vol else 0
+    if status is LesStatus.INGESCHREVEN:
+        v |= INGESCHREVEN
+    if status is LesStatus.WACHTLIJST:
+        v |= WACHTLIJST
+    return v
+
+
+def epoch(dt):
+    """Wandklok-tijd als epoch-seconden (alsof het UTC is): onafhankelijk van
+    de TZ van het proces, dus de scraper en de analyse rekenen hetzelfde."""
+    return calendar.timegm(dt.timetuple())
+
+
+def uit_epoch(seconden):
+    return datetime(1970, 1, 1) + timedelta(seconds=int(seconden))
+
+
+def start_minuut(tijd):
+    """'18:30 - 19:30' -> minuten na middernacht, of None."""
+    tijden = parse_tijd(tijd)
+    return tijden[0][0] * 60 + tijden[0][1] if tijden else None
+
+
+def metingen_uit_rooster(rooster, now):
+    """[(start datetime, zaal, type, aangemeld, capaciteit, vlaggen)] voor alle
+    lessen in het rooster (bink_model) met een bekende bezetting die nog
+    moeten beginnen."""
+    return [(les.start, les.zaal, les.type, min(les.aangemeld, 255), min(les.capaciteit, 255), vlaggen(les.status))
+            for les in rooster.lessen() if les.aangemeld is not None and les.start is not None and les.start > now]
+
+
+class BezettingSchrijver:
+    """Houdt de geïnterneerde namen, les-ids en laatst geschreven waarden bij."""
+
+    def __init__(self, map_=None):
+        self.map = map_
+        self.namen = {"zalen": [], "types": [], "laatste": {}}
+        try:
+            with open(_pad(map_, NAMEN_FILE), encoding="utf-8") as f:
+                self.namen.update(json.load(f))
+        except (FileNotFoundError, ValueError):
+            pass
+        self.les_ids = {}
+        self.les_start = []
+        try:
+            with open(_pad(map_, LESSEN_FILE), "rb") as f:
+                data = f.read()
+            data = data[:len(data) - len(data) % LES.size]  # half geschreven record negeren
+            for i, (start, zaal, _, _, soort, _) in enumerate(LES.iter_unpack(data)):
+                self.les_ids[(start, zaal, soort)] = i
+                self.les_start.append(start)
+        except FileNotFoundError:
+            pass
+
+    def _intern(self, lijst, naam):
+        tabel = self.namen[lijst]
+        if naam not in tabel:
+            tabel.append(naam)
+        return tabel.index(naam)
+
+    def schrijf(self, metingen, now):
+        """Voegt de metingen toe die verschillen van de vorige meting van die
+        les. Retourneert het aantal nieuwe meet-records."""
+        tijd = epoch(now)
+        nieuwe_lessen, nieuwe_metingen = [], []
+        laatste = self.namen["laatste"]
+        for start_dt, zaal, soort, aangemeld, capaciteit, vlag in metingen:
+            start = epoch(start_dt)
+            zaal_id, type_id = self._intern("zalen", zaal), self._intern("types", soort)
+            sleutel = (start, zaal_id, type_id)
+            les_id = self.les_ids.get(sleutel)
+            if les_id is None:
+                les_id = len(self.les_start)
+                self.les_ids[sleutel] = les_id
+                self.les_start.append(start)
+                minuut = start_dt.hour * 60 + start_dt.minute
+                nieuwe_lessen.append(LES.pack(start, zaal_id, start_dt.weekday(), minuut, type_id, 0))
+            waarde = [aangemeld, capaciteit, vlag]
+            if laatste.get(str(les_id)) == waarde:
+                continue
+            laatste[str(les_id)] = waarde
+            nieuwe_metingen.append(METING.pack(tijd, les_id, aangemeld, capaciteit, vlag, 0))
+
+        # Alleen lessen die nog niet (lang) voorbij zijn hoeven we te onthouden.
+        grens = tijd - 86400
+        self.namen["laatste"] = {k: v for k, v in laatste.items() if self.les_start[int(k)] >= grens}
+
+        # Eerst de namen, dan de lessen, dan de metingen: een record verwijst
+        # nooit naar iets dat nog niet op schijf staat.
+        tmp = _pad(self.map, NAMEN_FILE) + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.namen, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, _pad(self.map, NAMEN_FILE))
+        for naam, records in ((LESSEN_FILE, nieuwe_lessen), (METINGEN_FILE, nieuwe_metingen)):
+            if records:
+                with open(_pad(self.map, naam), "ab") as f:
+                    f.write(b"".join(records))
+        return len(nieuwe_metingen)
+
+
+def registreer(rooster, now, map_=None):
+    """Voor bink_auto: de bezetting uit deze scrape toevoegen. Aantal nieuwe records."""
+    return BezettingSchrijver(map_).schrijf(metingen_uit_rooster(rooster, now), now)
+
+
+# --- lezen (numpy) -----------------------------------------------------------------
+
+def _dtypes():
+    import numpy as np
+    les = np.dtype([("start", "<u4"), ("zaal", "u1"), ("weekdag", "u1"), ("minuut", "<u2"),
+                    ("type", "<u2"), ("_", "<u2")])
+    meting = np.dtype([("tijd", "<u4"), ("les", "<u4"), ("aangemeld", "u1"), ("capaciteit", "u1"),
+                       ("vlaggen", "u1"), ("_", "u1")])
+    return les, meting
+
+
+def _memmap(pad, dtype):
+    import numpy as np
+    aantal = os.path.getsize(pad) // dtype.itemsize if os.path.exists(pad) else 0
+    if not aantal:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(pad, dtype=dtype, mode="r", shape=(aantal,))
+
+
+class Bezetting:
+    """Leesbare kant: .lessen en .metingen zijn memmaps (structured arrays)."""
+
+    def __init__(self, map_=None):
+        les_dtype, meting_dtype = _dtypes()
+        self.lessen = _memmap(_pad(map_, LESSEN_FILE), les_dtype)
+        self.metingen = _memmap(_pad(map_, METINGEN_FILE), meting_dtype)
+        try:
+            with open(_pad(map_, NAMEN_FILE), encoding="utf-8") as f:
+                namen = json.load(f)
+        except (FileNotFoundError, ValueError):
+            namen = {}
+        self.zalen = namen.get("zalen", [])
+        self.types = namen.get("types", [])
+
+    def _id(self, tabel, naam):
+        return tabel.index(naam) if naam in tabel else -1
+
+    def lessen_in_slot(self, weekdag, tijd, zaal=None, soort=None):
+        """Les-ids op deze weekdag (0 = maandag) en starttijd 'HH:MM', optioneel
+        gefilterd op zaal en type; op starttijd."""
+        import numpy as np
+        masker = (self.lessen["weekdag"] == weekdag) & (self.lessen["minuut"] == start_minuut(tijd))
+        if zaal is not None:
+            masker &= self.lessen["zaal"] == self._id(self.zalen, zaal)
+        if soort is not None:
+            masker &= self.lessen["type"] == self._id(self.types, soort)
+        ids = np.flatnonzero(masker)
+        return ids[np.argsort(self.lessen["start"][ids], kind="stable")]
+
+    def les_id(self, start_dt, zaal):
+        """Les-id van de les die op start_dt in deze zaal begint, of None."""
+        import numpy as np
+        masker = (self.lessen["start"] == epoch(start_dt)) & (self.lessen["zaal"] == self._id(self.zalen, zaal))
+        ids = np.flatnonzero(masker)
+        return int(ids[0]) if len(ids) else None
+
+    def metingen_van(self, les_ids):
+        """De meet-records van deze lessen, gesorteerd op (les, tijd)."""
+        import numpy as np
+        sub = self.metingen[np.isin(self.metingen["les"], les_ids)]
+        return sub[np.lexsort((sub["tijd"], sub["les"]))]
+
+    def vulcurves(self, les_ids, uren):
+        """Aangemeld per les (rijen) op 'uren' voor de start (kolommen), als
+        float-array; NaN waar de les nog niet gemeten was. De stand op een
+        moment = de laatste meting op of voor dat moment (trapfunctie).
+        Retourneert (aangemeld, capaciteit per les)."""
+        import numpy as np
+        les_ids = np.asarray(les_ids, dtype=np.int64)
+        uren = np.asarray(uren, dtype=np.float64)
+        # Alleen de kolommen die we nodig hebben; 1 sortering op een
+        # samengestelde sleutel (rij in les_ids, tijd).
+        positie = np.full(len(self.lessen), -1, dtype=np.int64)
+        positie[les_ids] = np.arange(len(les_ids))
+        rij = positie[self.metingen["les"]]
+        keuze = np.flatnonzero(rij >= 0)
+        sleutel = rij[keuze] << 32 | self.metingen["tijd"][keuze].astype(np.int64)
+        herorden = np.argsort(sleutel)
+        sleutel, keuze = sleutel[herorden], keuze[herorden]
+        sub = {"aangemeld": self.metingen["aangemeld"][keuze], "capaciteit": self.metingen["capaciteit"][keuze]}
+
+        starts = self.lessen["start"][les_ids].astype(np.int64)
+        momenten = starts[:, None] - (uren[None, :] * 3600).astype(np.int64)
+        vraag = (np.arange(len(les_ids), dtype=np.int64)[:, None] << 32) | np.maximum(momenten, 0)
+        idx = np.searchsorted(sleutel, vraag, side="right") - 1
+        geldig = idx >= 0
+        geldig[geldig] &= (sleutel[idx[geldig]] >> 32) == np.broadcast_to(
+            np.arange(len(les_ids))[:, None], idx.shape)[geldig]
+        aangemeld = np.full(idx.shape, np.nan)
+        aangemeld[geldig] = sub["aangemeld"][idx[geldig]]
+
+        capaciteit = np.zeros(len(les_ids))
+        if len(keuze):
+            # Laatst bekende capaciteit per les.
+            laatste = np.searchsorted(sleutel, (np.arange(len(les_ids), dtype=np.int64) + 1) << 32) - 1
+            heeft = (laatste >= 0) & ((sleutel[np.maximum(laatste, 0)] >> 32) == np.arange(len(les_ids)))
+            capaciteit[heeft] = sub["capaciteit"][laatste[heeft]]
+        return aangemeld, capaciteit
+
+    def info(self):
+        grootte = self.lessen.nbytes + self.metingen.nbytes
+        return (f"{len(self.lessen)} lessen, {len(self.metingen)} metingen, "
+                f"{grootte / 1024:.1f} KB (+ {NAMEN_FILE})")
+
+
+def weekdag_uit_tekst(tekst):
+    tekst = tekst.lower()
+    for i, (nl, en) in enumerate(zip(DAGEN_NL, DAGEN_EN)):
+        if tekst in (nl.lower(), en, nl.lower()[:2], en[:3]):
+            return i
+    raise SystemExit(f"Onbekende dag: {tekst}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bezetting van lessen door de tijd")
+    parser.add_argument("--info", action="store_true")
+    parser.add_argument("--slot", nargs=2, metavar=("DAG", "HH:MM"), help="alle lessen op dit tijdslot")
+    parser.add_argument("--les", nargs=2, metavar=("DD-MM-JJJJ", "HH:MM"), help="1 les")
+    parser.add_argument("--zaal")
+    parser.add_argument("--type")
+    args = parser.parse_args()
+
+    import numpy as np
+    b = Bezetting()
+    uren = np.array([168, 96, 72, 48, 24, 12, 6, 3, 1, 0])
+    if args.slot:
+        ids = b.lessen_in_slot(weekdag_uit_tekst(args.slot[0]), args.slot[1], args.zaal, args.type)
+    elif args.les:
+        start = datetime.strptime(" ".join(args.les), "%d-%m-%Y %H:%M")
+        les = b.les_id(start, args.zaal or "Zaal 1")
+        ids = np.array([] if les is None else [les], dtype=np.int64)
+    else:
+        print(b.info())
+        return
+    if not len(ids):
+        print("Geen lessen gevonden.")
+        return
+
+    aangemeld, capaciteit = b.vulcurves(ids, uren)
+    print("les                         " + " ".join(f"{u:>5}u" for u in uren))
+    for i, les_id in enumerate(ids):
+        les = b.lessen[les_id]
+        start = uit_epoch(les["start"])
+        naam = f"{start.strftime('%d-%m-%Y %H:%M')} {b.types[les['type']][:10]}"
+        cellen = " ".join("     -" if np.isnan(x) else f"{int(x):>3}/{int(capaciteit[i]):<2}" for x in aangemeld[i])
+        print(f"{naam:<27} {cellen}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Gedeelde, zuinige browser-setup voor alle Playwright-scripts.
+
+- start_browser: headless Chromium met low-memory flags (installeert Chromium
+  zelf als hij ontbreekt, zie bink_auto: de scrape-workflow doet dat niet meer).
+- maak_context: context met de bewaarde sessie (bink_sessie) en route-blocking:
+  afbeeldingen, media en fonts nooit, en alleen domeinen uit de allowlist.
+  Tracking-scripts en de cookie-consent-widget worden dus niet eens geladen.
+- verkeer_rapport: aantal requests, bytes en geblokkeerde requests van de run.
+- nieuwe_pagina: pagina in een Teller-proxy, die elke Playwright-aanroep
+  (round trip) telt als metrics-teller 'playwright', ook waits en retries.
+
+We lezen alleen tekst uit de DOM, dus niets hiervan is nodig voor het resultaat."""
+import inspect
+import os
+import subprocess
+import sys
+import urllib.parse
+from playwright.async_api import Locator
+
+import bink_metrics as metrics
+from bink_rooster import BASE_URL
+from bink_sessie import lees_storage_state
+
+LAUNCH_ARGS = [
+    "--disable-dev-shm-usage",          # /dev/shm is klein op CI-runners
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--no-first-run",
+    "--mute-audio",
+    "--renderer-process-limit=2",
+    "--js-flags=--max-old-space-size=256",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,BackForwardCache",
+]
+
+GEBLOKKEERDE_TYPES = {"image", "media", "font"}
+
+# De site zelf + CDN's waar jQuery/remodal vandaan kunnen komen (nodig voor de
+# modals). Extra domeinen: BINK_EXTRA_DOMEINEN="a.nl,b.com".
+TOEGESTANE_DOMEINEN = {
+    urllib.parse.urlparse(BASE_URL).hostname or "",
+    "crossfitbink36.nl",
+    "code.jquery.com",
+    "cdnjs.cloudflare.com",
+    "cdn.jsdelivr.net",
+    "ajax.googleapis.com",
+    "unpkg.com",
+} | {d.strip() for d in os.environ.get("BINK_EXTRA_DOMEINEN", "").split(",") if d.strip()}
+
+# Verkeer van deze run (alle contexts samen).
+VERKEER = {"requests": 0, "bytes": 0, "geblokkeerd": 0}
+
+
+def domein_toegestaan(url):
+    host = (urllib.parse.urlparse(url).hostname or "").lower()
+    if not host:
+        return True  # data:/blob:-URL's
+    return any(host == d or host.endswith("." + d) for d in TOEGESTANE_DOMEINEN if d)
+
+
+async def start_browser(p):
+    """Start headless Chromium met zuinige flags; installeert hem eerst als
+    hij ontbreekt."""
+    try:
+        return await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+    except Exception as e:
+        if "Executable doesn't exist" not in str(e):
+            raise
+        print("Chromium ontbreekt; nu installeren...")
+        subprocess.run([sys.executable, "-m", "playwright", "install", "chromium"], check=True)
+        return await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+
+
+async def _route(route):
+    req = route.request
+    if req.resource_type in GEBLOKKEERDE_TYPES or not domein_toegestaan(req.url):
+        VERKEER["geblokkeerd"] += 1
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _tel_request(request):
+    VERKEER["requests"] += 1
+    try:
+        sizes = await request.sizes()
+        VERKEER["bytes"] += (sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+                             + sizes.get("requestBodySize", 0) + sizes.get("requestHeadersSize", 0))
+    except Exception:
+        pass
+
+
+async def maak_context(browser, **kwargs):
+    """Nieuwe context met bewaarde sessie, route-blocking en verkeerstelling."""
+    state = lees_storage_state()
+    if state:
+        kwargs["storage_state"] = state
+    kwargs.setdefault("service_workers", "block")
+    context = await browser.new_context(**kwargs)
+    await context.route("**/*", _route)
+    context.on("requestfinished", _tel_request)
+    return context
+
+
+def verkeer_rapport():
+    mb = VERKEER["bytes"] / (1024 * 1024)
+    return (f"📦 Browserverkeer: {VERKEER['requests']} requests, {mb:.2f} MB, "
+            f"{VERKEER['geblokkeerd']} geblokkeerd")
+
+
+class Teller:
+    """Proxy rond Page/Locator die elke await-bare aanroep telt (= 1 round trip).
+    Zonder 'teller' gaat de telling naar metrics ('playwright'); bink_benchmark
+    geeft een eigen [0] mee."""
+
+    def __init__(self, doel, teller=None):
+        self._doel = doel
+        self._teller = teller
+
+    def _tel(self):
+        if self._teller is None:
+            metrics.tel("playwright")
+        else:
+            self._teller[0] += 1
+
+    def __getattr__(self, naam):
+        attr = getattr(self._doel, naam)
+        if not callable(attr):
+            return _omhul(attr, self._teller)
+
+        def aanroep(*args, **kwargs):
+            res = attr(*args, **kwargs)
+            if inspect.isawaitable(res):
+                async def afwachten():
+                    self._tel()
+                    return _omhul(await res, self._teller)
+                return afwachten()
+            return _omhul(res, self._teller)
+        return aanroep
+
+
+def _omhul(obj, teller):
+    if isinstance(obj, Locator):
+        return Teller(obj, teller)
+    if isinstance(obj, list):
+        return [_omhul(o, teller) for o in obj]
+    return obj
+
+
+async def nieuwe_pagina(context, timeout_ms=20000):
+    """Nieuwe pagina in de context, met default-timeout en Playwright-telling."""
+    page = await context.new_page()
+    page.set_default_timeout(timeout_ms)
+    return Teller(page)
@@ -0,0 +1,218 @@
+"""AI-coach voor bink_analyze, met een cache van eerdere antwoorden.
+
+Dezelfde WOD met (bijna) dezelfde stats leverde steeds een nieuwe, vrijwel
+gelijke coach-tekst op, telkens met een trage API-call. Nu:
+
+- sleutel = genormaliseerde WOD (normaliseer_wod uit bink_dejavu) + de stats
+  in emmers (BUCKETS): 47 of 49 minuten, 151 of 153 bpm tellen als gelijk.
+- CACHE_FILE staat naast de andere data in de repo (de analyse-workflow
+  commit hem mee); oudste/verlopen antwoorden vallen eruit (MAX_ITEMS, TTL_DAGEN).
+- bij een hit geen API-call; hits en misses worden geteld en gelogd.
+- stream_coach() geeft het antwoord in stukjes (stream=True), zodat
+  bink_analyze het bericht kan bijwerken terwijl het binnenkomt.
+- BINK_COACH_STUB=1 gebruikt StubClient i.p.v. OpenAI (offline testen);
+  BINK_COACH_STUB_VERTRAGING=s laat de stub per stukje s seconden wachten.
+
+    BINK_COACH_STUB=1 python bink_coach.py "5 rounds 200m run" --duur 45 --hr 150"""
+import argparse
+import hashlib
+import json
+import os
+import time
+
+from bink_dejavu import normaliseer_wod
+
+CACHE_FILE = os.environ.get("BINK_COACH_CACHE", "coach_cache.json")
+MAX_ITEMS = 200
+TTL_DAGEN = 60
+MODEL = "gpt-4o-mini"
+TIMEOUT = 30
+
+# Emmerbreedte per stat: binnen een emmer is het antwoord herbruikbaar.
+BUCKETS = {"duration": 5, "calories": 50, "avg_hr": 5, "max_hr": 5}
+
+SYSTEEM = "Je bent een ervaren en motiverende CrossFit coach."
+STANDAARD = "Lekker gewerkt! 💪 Zorg voor een goede recovery."
+
+
+def prompt_voor(workout, stats):
+    return (
+        f"Ik heb zojuist deze CrossFit WOD afgerond:\n{workout}\n\n"
+        f"Mijn stats van mijn Apple Watch:\n"
+        f"⏱️ Duur: {stats['duration']} minuten\n"
+        f"🔥 Calorieën: {stats['calories']} kcal\n"
+        f"❤️ Gemiddelde hartslag: {stats['avg_hr']} bpm\n"
+        f"🚀 Maximale hartslag: {stats['max_hr']} bpm\n\n"
+        "Je bent mijn no-nonsense CrossFit coach. Schrijf een kort, motiverend bericht "
+        "als recap van mijn training. Geef me één specifieke tip voor herstel op basis van "
+        "de bewegingen in de WOD of mijn hartslag-piek. Spreek me aan met 'je'."
+    )
+
+
+def cache_sleutel(workout, stats):
+    emmers = [f"{naam}={int(stats.get(naam) or 0) // breedte}" for naam, breedte in sorted(BUCKETS.items())]
+    tekst = normaliseer_wod(workout) + "|" + ",".join(emmers)
+    return hashlib.sha1(tekst.encode("utf-8")).hexdigest()
+
+
+class CoachCache:
+    """{sleutel: {'tekst', 'gemaakt', 'gebruikt'}} in een JSON-bestand."""
+
+    def __init__(self, pad=CACHE_FILE, max_items=MAX_ITEMS, ttl_dagen=TTL_DAGEN):
+        self.pad = pad
+        self.max_items = max_items
+        self.ttl = ttl_dagen * 86400
+        self.items = {}
+        self.tellers = {"hits": 0, "misses": 0}
+        self.gewijzigd = False
+
+    def laad(self):
+        try:
+            with open(self.pad, encoding="utf-8") as f:
+                data = json.load(f)
+            self.items = data.get("items", {})
+            self.tellers.update(data.get("tellers", {}))
+        except Exception:
+            pass
+        return self
+
+    def bewaar(self):
+        if not self.gewijzigd:
+            return
+        tmp = self.pad + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"tellers": self.tellers, "items": self.items}, f, indent=1, ensure_ascii=False)
+        os.replace(tmp, self.pad)
+        self.gewijzigd = False
+
+    def _verlopen(self, item, nu):
+        return nu - item.get("gemaakt", 0) > self.ttl
+
+    def haal(self, sleutel, nu=None):
+        nu = nu or time.time()
+        item = self.items.get(sleutel)
+        self.gewijzigd = True
+        if item and not self._verlopen(item, nu):
+            item["gebruikt"] = nu
+            self.tellers["hits"] += 1
+            return item["tekst"]
+        if item:
+            del self.items[sleutel]
+        self.tellers["misses"] += 1
+        return None
+
+    def zet(self, sleutel, tekst, nu=None):
+        nu = nu or time.time()
+        self.items[sleutel] = {"tekst": tekst, "gemaakt": nu, "gebruikt": nu}
+        for s in [s for s, item in self.items.items() if self._verlopen(item, nu)]:
+            del self.items[s]
+        # Te vol: minst recent gebruikte eruit.
+        if len(self.items) > self.max_items:
+            oudste = sorted(self.items, key=lambda s: self.items[s].get("gebruikt", 0))
+            for s in oudste[:len(self.items) - self.max_items]:
+                del self.items[s]
+        self.gewijzigd = True
+
+
+class StubClient:
+    """Zelfde vorm als OpenAI().chat.completions.create(...), zonder netwerk."""
+
+    class _Completions:
+        def __init__(self, vertraging):
+            self.aanroepen = 0
+            self.vertraging = vertraging
+
+        def create(self, model, messages, stream=False, **kw):
+            self.aanroepen += 1
+            tekst = f"[stub] Lekker gewerkt! ({len(messages[-1]['content'])} tekens prompt)"
+            if stream:
+                return self._stukjes(tekst)
+            bericht = type("Bericht", (), {"content": tekst})
+            keuze = type("Keuze", (), {"message": bericht})
+            return type("Antwoord", (), {"choices": [keuze]})
+
+        def _stukjes(self, tekst):
+            for woord in tekst.split(" "):
+                time.sleep(self.vertraging)
+                delta = type("Delta", (), {"content": woord + " "})
+                yield type("Chunk", (), {"choices": [type("Keuze", (), {"delta": delta})]})
+
+    def __init__(self, vertraging=0.0):
+        self.chat = type("Chat", (), {"completions": self._Completions(vertraging)})
+
+
+def maak_client():
+    """StubClient met BINK_COACH_STUB=1, anders OpenAI (of None zonder key)."""
+    if os.environ.get("BINK_COACH_STUB"):
+        return StubClient(float(os.environ.get("BINK_COACH_STUB_VERTRAGING") or 0))
+    api_key = os.environ.get("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=api_key, timeout=TIMEOUT)
+
+
+def _berichten(workout, stats):
+    return [
+        {"role": "system", "content": SYSTEEM},
+        {"role": "user", "content": prompt_voor(workout, stats)},
+    ]
+
+
+def stream_coach(client, workout, stats, timeout=TIMEOUT):
+    """Het coach-antwoord in stukjes zoals ze binnenkomen (zonder cache)."""
+    stream = client.chat.completions.create(model=MODEL, messages=_berichten(workout, stats),
+                                            stream=True, timeout=timeout)
+    for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            yield delta
+
+
+def uit_cache(cache, sleutel):
+    """Tekst uit de cache (of None); logt hit/miss met de totalen."""
+    if cache is None:
+        return None
+    tekst = cache.haal(sleutel)
+    soort = "hit" if tekst else "miss"
+    print(f"🗃️ Coach-cache {soort} ({cache.tellers['hits']} hits / {cache.tellers['misses']} misses).")
+    return tekst
+
+
+def coach_advies(workout, stats, client=None, cache=None):
+    """Coach-tekst voor deze WOD + stats: uit de cache, anders via de client
+    (en dan in de cache). Zonder client of bij een fout: STANDAARD."""
+    sleutel = cache_sleutel(workout, stats)
+    tekst = uit_cache(cache, sleutel)
+    if tekst:
+        return tekst
+    if client is None:
+        return STANDAARD
+    try:
+        response = client.chat.completions.create(model=MODEL, messages=_berichten(workout, stats))
+        tekst = response.choices[0].message.content
+    except Exception as e:
+        print(f"AI Error: {e}")
+        return STANDAARD
+    if cache is not None and tekst:
+        cache.zet(sleutel, tekst)
+    return tekst
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Coach-advies (met cache)")
+    parser.add_argument("workout")
+    parser.add_argument("--duur", type=int, default=45)
+    parser.add_argument("--kcal", type=int, default=500)
+    parser.add_argument("--hr", type=int, default=150)
+    parser.add_argument("--max-hr", type=int, default=180)
+    args = parser.parse_args()
+
+    stats = {"duration": args.duur, "calories": args.kcal, "avg_hr": args.hr, "max_hr": args.max_hr}
+    cache = CoachCache().laad()
+    print(coach_advies(args.workout, stats, maak_client(), cache))
+    cache.bewaar()
+
+
+if __name__ == "__main__":
+    main()
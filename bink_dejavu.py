@@ -0,0 +1,266 @@
+"""Déjà-vu-index: snel de meest gelijkende eerdere WOD vinden.
+
+Voorheen las bereken_deja_vu bij elke run heel history.csv opnieuw en draaide
+SequenceMatcher tegen elke eerdere datum. Nu houden we in INDEX_FILE per datum
+de genormaliseerde WOD + een MinHash-handtekening (over karakter-shingles) bij:
+
+- bijwerken is incrementeel: we onthouden tot welke versie van de historie
+  (bink_historie) we bij zijn en halen via de versie-index alleen de datums op
+  die sindsdien zijn toegevoegd of gewijzigd. Is de database vervangen (lagere
+  versie), dan bouwen we de index opnieuw op.
+- zoeken: LSH-banden op de handtekening leveren een shortlist, de beste
+  KANDIDATEN daarvan (op geschatte Jaccard) krijgen de exacte SequenceMatcher.
+  De score is dus dezelfde ratio als vroeger en de drempels 0.55 / 0.9 blijven
+  geldig.
+
+Los te draaien:
+    python bink_dejavu.py --herbouw      # index opnieuw opbouwen
+    python bink_dejavu.py --check        # vergelijk met de oude volledige scan"""
+import difflib
+import json
+import os
+import sys
+import zlib
+from datetime import datetime
+
+from bink_historie import gewijzigd_sinds, hoogste_versie, open_db
+
+INDEX_FILE = "dejavu_index.json"
+INDEX_VERSIE = 2
+
+MIN_LENGTE = 15       # kortere WOD's tellen niet mee (zoals vroeger)
+DREMPEL = 0.55        # vanaf hier 'lijkt op'
+IDENTIEK = 0.9        # vanaf hier 'identiek'
+
+SHINGLE = 4           # karakters per shingle
+PERMUTATIES = 128     # lengte van de MinHash-handtekening
+RIJEN_PER_BAND = 2    # 64 banden van 2: ook J=0.2 komt vrijwel altijd door
+KANDIDATEN = 16       # zoveel beste kandidaten krijgen de exacte vergelijking
+
+_PRIEM = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+
+def _maak_coefficienten():
+    # Vaste LCG-seed: handtekeningen moeten tussen runs vergelijkbaar blijven.
+    x, coef = 0x5EED, []
+    for _ in range(PERMUTATIES):
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        a = (x >> 3) % _PRIEM or 1
+        x = (x * 6364136223846793005 + 1442695040888963407) & ((1 << 64) - 1)
+        coef.append((a, (x >> 3) % _PRIEM))
+    return coef
+
+
+_COEF = _maak_coefficienten()
+
+
+def normaliseer_wod(tekst):
+    """Maakt een WOD-tekst vergelijkbaar: kleine letters, leestekens weg,
+    scheidingstekens ('|', nieuwe regels) naar spaties, dubbele spaties inklappen."""
+    if not tekst:
+        return ""
+    t = tekst.lower().replace("|", " ").replace("\n", " ")
+    t = "".join(ch if (ch.isalnum() or ch.isspace()) else " " for ch in t)
+    return " ".join(t.split())
+
+
+def parse_dmy(datum):
+    try:
+        return datetime.strptime(datum, "%d-%m-%Y")
+    except Exception:
+        return None
+
+
+def shingles(tekst):
+    if len(tekst) <= SHINGLE:
+        return {zlib.crc32(tekst.encode("utf-8"))}
+    return {zlib.crc32(tekst[i:i + SHINGLE].encode("utf-8")) for i in range(len(tekst) - SHINGLE + 1)}
+
+
+def handtekening(tekst):
+    sh = shingles(tekst)
+    return [min(((a * s + b) % _PRIEM) & _MAX_HASH for s in sh) for a, b in _COEF]
+
+
+def geschatte_jaccard(sig_a, sig_b):
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / PERMUTATIES
+
+
+def _banden(sig):
+    for i in range(0, PERMUTATIES, RIJEN_PER_BAND):
+        yield (i, *sig[i:i + RIJEN_PER_BAND])
+
+
+class DejaVuIndex:
+    def __init__(self, db_file=None, index_file=INDEX_FILE):
+        self.db_file = db_file
+        self.index_file = index_file
+        self.versie = 0
+        self.datums = {}   # datum -> {"tekst": genormaliseerd, "sig": [...]}
+        self.buckets = {}  # band -> {datum, ...}
+        self.gewijzigd = False
+
+    # --- opslag ---------------------------------------------------------------
+
+    def laad(self):
+        try:
+            with open(self.index_file, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("versie") != INDEX_VERSIE or data.get("instellingen") != [SHINGLE, PERMUTATIES]:
+                return self
+            self.versie = int(data.get("versie_historie", 0))
+            self.datums = data.get("datums", {})
+        except Exception:
+            return self
+        for datum, item in self.datums.items():
+            self._in_buckets(datum, item["sig"])
+        return self
+
+    def bewaar(self):
+        if not self.gewijzigd:
+            return
+        data = {
+            "versie": INDEX_VERSIE,
+            "instellingen": [SHINGLE, PERMUTATIES],
+            "versie_historie": self.versie,
+            "datums": self.datums,
+        }
+        tmp = self.index_file + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.index_file)
+        self.gewijzigd = False
+
+    # --- bijwerken ------------------------------------------------------------
+
+    def _in_buckets(self, datum, sig):
+        for band in _banden(sig):
+            self.buckets.setdefault(band, set()).add(datum)
+
+    def _uit_buckets(self, datum, sig):
+        for band in _banden(sig):
+            groep = self.buckets.get(band)
+            if groep:
+                groep.discard(datum)
+
+    def voeg_toe(self, datum, workout):
+        """Zet de WOD van deze datum in de index (zelfde datum: laatste wint)."""
+        n = normaliseer_wod(workout)
+        oud = self.datums.get(datum)
+        if len(n) < MIN_LENGTE or (oud and oud["tekst"] == n):
+            return
+        if oud:
+            self._uit_buckets(datum, oud["sig"])
+        self.gewijzigd = True
+        sig = handtekening(n)
+        self.datums[datum] = {"tekst": n, "sig": sig}
+        self._in_buckets(datum, sig)
+
+    def synchroniseer(self):
+        """Haalt alleen de datums op die sinds de vorige keer in de historie
+        zijn toegevoegd of gewijzigd. Retourneert het aantal verwerkte datums."""
+        conn = open_db(self.db_file)
+        try:
+            if hoogste_versie(conn) < self.versie:
+                # Andere/nieuwe database: opnieuw beginnen.
+                self.datums, self.buckets, self.versie = {}, {}, 0
+                self.gewijzigd = True
+            rijen = gewijzigd_sinds(conn, self.versie)
+        finally:
+            conn.close()
+        for r in rijen:
+            self.voeg_toe(r["datum"], r["workout"])
+            self.versie = r["versie"]
+        if rijen:
+            self.gewijzigd = True
+        return len(rijen)
+
+    # --- zoeken ---------------------------------------------------------------
+
+    def kandidaten(self, sig, uitsluiten=None):
+        gevonden = set()
+        for band in _banden(sig):
+            gevonden |= self.buckets.get(band, set())
+        gevonden.discard(uitsluiten)
+        geschat = sorted(gevonden, key=lambda d: geschatte_jaccard(sig, self.datums[d]["sig"]), reverse=True)
+        return geschat[:KANDIDATEN]
+
+    def meest_gelijkend(self, workout, datum_vandaag):
+        """(datum, ratio) van de meest gelijkende eerdere WOD, of (None, 0.0).
+        Ratio = difflib.SequenceMatcher, exact zoals de oude volledige scan."""
+        doel = normaliseer_wod(workout)
+        if len(doel) < MIN_LENGTE:
+            return None, 0.0
+        beste_datum, beste_ratio = None, 0.0
+        for datum in self.kandidaten(handtekening(doel), uitsluiten=datum_vandaag):
+            ratio = difflib.SequenceMatcher(None, doel, self.datums[datum]["tekst"]).ratio()
+            if ratio > beste_ratio:
+                beste_datum, beste_ratio = datum, ratio
+            elif ratio == beste_ratio and beste_datum:
+                # Gelijke score: kies de meest recente datum.
+                d_new, d_old = parse_dmy(datum), parse_dmy(beste_datum)
+                if d_new and d_old and d_new > d_old:
+                    beste_datum = datum
+        return beste_datum, beste_ratio
+
+
+def laad_index(db_file=None, index_file=INDEX_FILE):
+    """Index van schijf, bijgewerkt met de nieuwe datums uit de historie."""
+    index = DejaVuIndex(db_file, index_file).laad()
+    index.synchroniseer()
+    return index
+
+
+def deja_vu(workout, datum_vandaag, db_file=None, index_file=INDEX_FILE):
+    """{'datum','gelijkenis','soort'} of None, zoals bereken_deja_vu altijd gaf."""
+    index = laad_index(db_file, index_file)
+    index.bewaar()
+    beste_datum, beste_ratio = index.meest_gelijkend(workout, datum_vandaag)
+    if not beste_datum or beste_ratio < DREMPEL:
+        return None
+    return {
+        "datum": beste_datum,
+        "gelijkenis": round(beste_ratio * 100),
+        "soort": "identiek" if beste_ratio >= IDENTIEK else "lijkt op",
+    }
+
+
+def _volledige_scan(index, workout, datum_vandaag):
+    """Oude methode (SequenceMatcher tegen elke datum), alleen voor --check."""
+    doel = normaliseer_wod(workout)
+    beste_datum, beste_ratio = None, 0.0
+    for datum, item in index.datums.items():
+        if datum == datum_vandaag:
+            continue
+        ratio = difflib.SequenceMatcher(None, doel, item["tekst"]).ratio()
+        if ratio > beste_ratio:
+            beste_datum, beste_ratio = datum, ratio
+    return beste_datum, beste_ratio
+
+
+def main():
+    if "--herbouw" in sys.argv:
+        try:
+            os.remove(INDEX_FILE)
+        except FileNotFoundError:
+            pass
+    index = laad_index()
+    index.bewaar()
+    print(f"Index: {len(index.datums)} datums, bij tot versie {index.versie} van de historie.")
+
+    if "--check" in sys.argv:
+        # Elke datum als 'vandaag': wijkt de shortlist af van de volledige scan?
+        verschil = 0
+        for datum, item in index.datums.items():
+            _, snel = index.meest_gelijkend(item["tekst"], datum)
+            _, volledig = _volledige_scan(index, item["tekst"], datum)
+            # Alleen relevant als de uitkomst t.o.v. de drempels verandert.
+            if (snel >= DREMPEL) != (volledig >= DREMPEL) or (snel >= IDENTIEK) != (volledig >= IDENTIEK):
+                verschil += 1
+                print(f"  {datum}: index {snel:.2f} vs volledig {volledig:.2f}")
+        print(f"Afwijkingen t.o.v. volledige scan: {verschil}/{len(index.datums)}")
+
+
+if __name__ == "__main__":
+    main()
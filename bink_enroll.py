@@ -1,22 +1,22 @@
 import os
 import json
 import asyncio
-import urllib.request
-import urllib.parse
+import argparse
 from playwright.async_api import async_playwright
+from bink_auto import lees_les_records, lees_persoonlijke_status
+from bink_browser import maak_context, nieuwe_pagina, start_browser, verkeer_rapport
+from bink_http import (actie_formulier, is_ingeschreven_class, les_class, les_records,
+                       parse_html, status_uit_dom, zoek_les)
+from bink_rooster import INGESCHREVEN_CLASSES, LOGIN_URL, ZALEN, les_uit_record, rooster_url
+from bink_sessie import zorg_voor_login
+from bink_telegram import stuur_telegram, verstuur_spool
+from bink_workout import patch_workout_json
+import bink_metrics as metrics
+import bink_wacht as wacht
 from datetime import datetime, timedelta
 
 EMAIL = os.environ.get("BINK_EMAIL")
 PASSWORD = os.environ.get("BINK_PASSWORD")
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
-
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID: return
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode({"chat_id": TG_CHAT_ID, "text": bericht}).encode("utf-8")
-    try: urllib.request.urlopen(urllib.request.Request(url, data=data))
-    except: pass
 
 async def klik_cookies_weg(page):
     """Klikt een eventuele cookie-/consent-melding weg (best effort, faalt stil)."""
@@ -29,7 +29,7 @@ async def klik_cookies_weg(page):
             knop = page.locator(sel).first
             if await knop.count() > 0 and await knop.is_visible():
                 await knop.click(timeout=2000)
-                await page.wait_for_timeout(500)
+                await wacht.wacht_tot_weg(knop, "cookies")
                 return
         except:
             pass
@@ -42,16 +42,16 @@ async def robuuste_login(page):
     for poging in range(1, 4):
         try:
             print(f"Login poging {poging}/3...")
+            metrics.tel("navigaties")
             # Direct naar de echte login-pagina. LET OP: '/login' is nu een 404;
             # de loginpagina is '/inloggen-voor-leden' (velden: useremail/userpassword).
-            await page.goto("https://www.crossfitbink36.nl/inloggen-voor-leden", wait_until="domcontentloaded", timeout=45000)
+            await page.goto(LOGIN_URL, wait_until="domcontentloaded", timeout=45000)
             await klik_cookies_weg(page)
             # Wacht expliciet tot het e-mailveld er is i.p.v. blind te fillen.
             await page.wait_for_selector("input[name*='user'], input[name*='email']", timeout=25000)
             await page.locator("input[name*='user'], input[name*='email']").first.fill(EMAIL)
             await page.locator("input[name*='pass']").first.fill(PASSWORD)
-            await page.locator("button[type='submit'], input[type='submit']").first.click()
-            await page.wait_for_timeout(4000)
+            await wacht.na_klik(page, page.locator("button[type='submit'], input[type='submit']").first.click, "login")
             return
         except Exception as e:
             laatste = str(e)
@@ -59,171 +59,465 @@ async def robuuste_login(page):
             await page.wait_for_timeout(3000)
     raise Exception(f"Inloggen mislukt na 3 pogingen: {laatste}")
 
-async def run():
-    print("Inschrijf-robot gestart!")
-    
-    event_path = os.environ.get("GITHUB_EVENT_PATH")
-    if not event_path or not os.path.exists(event_path):
-        print("Geen event data gevonden.")
-        return
-        
-    with open(event_path, "r") as f:
-        payload = json.load(f).get("client_payload", {})
-    
-    doel_dag = payload.get("dag")
+async def werk_workout_json_bij(page, dag_en, week, doel_tijd, zaal):
+    """Zet de nieuwe stand van deze ene les in workout.json (zie bink_workout),
+    uit de roosterpagina die toch al open staat. Geen tweede login/scrape."""
+    try:
+        await wacht.sluit_modal(page)
+        records = await lees_les_records(page)
+        record = next((r for r in records
+                       if dag_en in (r.get("target") or "") and doel_tijd in (r.get("tijd") or "")), None)
+        les = les_uit_record(record, zaal) if record else None
+        if not les:
+            print("Les niet teruggevonden; workout.json niet bijgewerkt.")
+            return
+        status = await lees_persoonlijke_status(page, dag_en, records)
+        aangepast = patch_workout_json(dag_en, week, les, status)
+        print(f"📝 workout.json bijgewerkt ({aangepast} plek(ken)).")
+    except Exception as e:
+        print(f"Kon workout.json niet bijwerken: {e}")
+
+# Wachtrij: 1 JSON-payload per regel (zelfde velden als client_payload), zodat
+# meerdere widget-tikken in 1 sessie worden afgehandeld. (Niet requests.jsonl:
+# die naam is in deze repo al in gebruik.) Vullen: dispatch 'enroll_queue'
+# (python bink_enroll.py --in-wachtrij, zonder browser); leeglopen doet de
+# volgende gewone run. Mislukte acties gaan terug in de wachtrij, tot
+# MAX_POGINGEN_WACHTRIJ keer.
+WACHTRIJ_FILE = os.environ.get("BINK_WACHTRIJ", "enroll_queue.jsonl")
+MAX_POGINGEN_WACHTRIJ = 3
+# Rapportregels die met een van deze tekens beginnen zijn mislukte acties.
+MISLUKT = ("🚨", "❌", "⚠️")
+
+# De knoppen in de pop-up zijn <input value="INSCHRIJVEN/UITSCHRIJVEN">
+# (niet altijd <button>/<a>). We dekken daarom álle varianten af,
+# gelijk aan het bewezen werkende bink_inschrijven.py. De oude versie
+# zocht alleen op zichtbare tekst en miste zo de <input>-knoppen,
+# waardoor uit-/inschrijven stil faalde.
+INSCHRIJF_SEL = ("input[value*='INSCHRIJVEN' i]:not([value*='UITSCHRIJVEN' i]), "
+                 "button:has-text('Inschrijven'), a:has-text('Inschrijven')")
+WACHTLIJST_SEL = ("input[value*='WACHTLIJST' i], "
+                  "button:has-text('Wachtlijst'), a:has-text('Wachtlijst')")
+UITSCHRIJF_SEL = ("input[value*='UITSCHRIJVEN' i], input[value*='Afmelden' i], "
+                  "button:has-text('Uitschrijven'), a:has-text('Uitschrijven'), "
+                  "button:has-text('Afmelden'), a:has-text('Afmelden')")
+
+DAYS_EN = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+def actie_uit_payload(payload, now):
+    """client_payload -> {'actie','tijd','zaal','dag_en','week','payload'} of None
+    als hij incompleet is. 'payload' is de vorm voor de wachtrij: met een vaste
+    'datum', zodat 'Morgen'/'current' een run later nog naar dezelfde les wijzen."""
     doel_tijd = payload.get("tijd")
-    doel_zaal = payload.get("zaal")
     actie = payload.get("actie")
-    payload_dag_en = payload.get("dag_en")   # bv. "monday" (nieuw: week-lessen)
-    payload_week = payload.get("week")        # "next" of "current" (nieuw)
-
     if not doel_tijd or not actie:
-        print("Commando incompleet!")
-        return
-
-    now = datetime.now()
-    days_en = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+        return None
 
-    if payload_dag_en:
+    maandag = (now - timedelta(days=now.weekday())).replace(hour=0, minute=0, second=0, microsecond=0)
+    if payload.get("datum"):
+        # Uit de wachtrij: week opnieuw bepalen; verlopen (of verder weg) = weg.
+        try:
+            datum = datetime.strptime(payload["datum"], "%d-%m-%Y")
+        except ValueError:
+            return None
+        week_nr = (datum - maandag).days // 7
+        if week_nr not in (0, 1) or datum.date() < now.date():
+            print(f"Verlopen actie uit de wachtrij overgeslagen: {payload}")
+            return None
+        dag_en = DAYS_EN[datum.weekday()]
+        is_volgende_week = week_nr == 1
+    elif payload.get("dag_en"):
         # Nieuwe stijl: widget geeft de exacte weekdag + welke week door.
-        dag_en = payload_dag_en
-        is_volgende_week = (payload_week == "next")
+        dag_en = payload["dag_en"]
+        is_volgende_week = (payload.get("week") == "next")
     else:
         # Oude stijl (Vandaag/Morgen) — blijft werken.
-        is_morgen = (doel_dag == "Morgen")
+        is_morgen = (payload.get("dag") == "Morgen")
         target_date = now + timedelta(days=1) if is_morgen else now
-        dag_en = days_en[target_date.weekday()]
+        dag_en = DAYS_EN[target_date.weekday()]
         is_volgende_week = (now.weekday() == 6 and is_morgen)
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page()
+    if dag_en not in DAYS_EN:
+        return None
+    doel_zaal = payload.get("zaal")
+    datum = maandag + timedelta(days=DAYS_EN.index(dag_en) + (7 if is_volgende_week else 0))
+    return {
+        "actie": actie,
+        "tijd": doel_tijd,
+        "zaal": doel_zaal if doel_zaal in ZALEN else "Zaal 1",
+        "zaal_label": doel_zaal,
+        "dag_en": dag_en,
+        "week": "next" if is_volgende_week else "current",
+        "payload": {"actie": actie, "tijd": doel_tijd, "zaal": doel_zaal, "datum": f"{datum:%d-%m-%Y}",
+                    "pogingen": payload.get("pogingen", 0)},
+    }
 
+def event_payloads():
+    """De payload(s) van deze dispatch: 1 actie, of meerdere via {"acties": [...]}."""
+    event_path = os.environ.get("GITHUB_EVENT_PATH")
+    if not event_path or not os.path.exists(event_path):
+        return []
+    with open(event_path, "r") as f:
+        client_payload = json.load(f).get("client_payload", {})
+    return client_payload.get("acties") or ([client_payload] if client_payload else [])
+
+def lees_wachtrij(pad=WACHTRIJ_FILE):
+    payloads = []
+    try:
+        with open(pad, encoding="utf-8") as f:
+            for regel in f:
+                regel = regel.strip()
+                if not regel:
+                    continue
+                try:
+                    payloads.append(json.loads(regel))
+                except ValueError:
+                    print(f"Ongeldige regel in {pad} overgeslagen: {regel[:80]}")
+    except FileNotFoundError:
+        pass
+    return payloads
+
+def voeg_toe_wachtrij(payloads, pad=WACHTRIJ_FILE):
+    with open(pad, "a", encoding="utf-8") as f:
+        for payload in payloads:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+
+def schrijf_wachtrij(payloads, pad=WACHTRIJ_FILE):
+    """Vervangt de wachtrij (atomair) door deze payloads."""
+    tmp = pad + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for payload in payloads:
+            f.write(json.dumps(payload, ensure_ascii=False) + "\n")
+    os.replace(tmp, pad)
+
+def werk_wachtrij_bij(gelezen, mislukt, pad=WACHTRIJ_FILE):
+    """Na een run: de 'gelezen' regels gaan eruit, mislukte acties komen terug
+    (met 'pogingen' + 1) tot MAX_POGINGEN_WACHTRIJ. Wat er tijdens de run bij
+    kwam blijft staan. Retourneert (opnieuw, opgegeven) als actie-lijsten."""
+    opnieuw, opgegeven = [], []
+    for a in mislukt:
+        payload = dict(a["payload"], pogingen=a["payload"].get("pogingen", 0) + 1)
+        (opnieuw if payload["pogingen"] < MAX_POGINGEN_WACHTRIJ else opgegeven).append(dict(a, payload=payload))
+    nieuw = lees_wachtrij(pad)[len(gelezen):]
+    if gelezen or opnieuw or nieuw:
+        schrijf_wachtrij([a["payload"] for a in opnieuw] + nieuw, pad)
+    return opnieuw, opgegeven
+
+TEGENOVERGESTELD = {"inschrijven": "uitschrijven", "uitschrijven": "inschrijven"}
+
+def klap_samen(acties):
+    """Per les (dag, week, zaal, tijd) blijft hooguit 1 actie over: dubbele
+    acties tellen 1 keer, een actie gevolgd door het tegenovergestelde
+    (inschrijven + uitschrijven) heft elkaar op. Retourneert (acties, weggestreept)."""
+    per_les, volgorde, weggestreept = {}, [], []
+    for a in acties:
+        sleutel = (a["dag_en"], a["week"], a["zaal"], a["tijd"])
+        if sleutel not in per_les:
+            volgorde.append(sleutel)
+        vorige = per_les.get(sleutel)
+        if vorige and TEGENOVERGESTELD.get(vorige["actie"]) == a["actie"]:
+            weggestreept.append((vorige, a))
+            per_les[sleutel] = None
+        elif not vorige:
+            per_les[sleutel] = a
+    return [per_les[k] for k in volgorde if per_les[k]], weggestreept
+
+def groepeer_per_pagina(acties):
+    """{(zaal, week): [acties]} in volgorde van binnenkomst: 1 pagina per groep."""
+    groepen = {}
+    for a in acties:
+        groepen.setdefault((a["zaal"], a["week"]), []).append(a)
+    return groepen
+
+async def open_rooster(page, url):
+    with metrics.span("rooster"):
+        metrics.tel("navigaties")
+        await page.goto(url, wait_until="domcontentloaded", timeout=45000)
         try:
-            page.set_default_timeout(20000)
-            print("Inloggen...")
-            await robuuste_login(page)
-
-            print(f"Navigeren naar {doel_zaal}...")
-            zalen = {
-                "Zaal 1": "https://www.crossfitbink36.nl/rooster",
-                "Zaal 2": "https://www.crossfitbink36.nl/rooster?hall=Zaal%202",
-                "Buiten": "https://www.crossfitbink36.nl/rooster?hall=Buiten"
-            }
-            url = zalen.get(doel_zaal, zalen["Zaal 1"])
-            if is_volgende_week:
-                url = f"{url}&week=next" if "?" in url else f"{url}?week=next"
-
-            await page.goto(url, wait_until="domcontentloaded", timeout=45000)
+            await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
+        except:
+            pass
+
+def rapport_regel(actie, geklikt, nog_in, doel_tijd, doel_zaal):
+    """Telegram-regel voor de uitkomst van 1 actie (zelfde teksten voor het
+    directe formulier-pad en de UI-klik)."""
+    if actie == "inschrijven":
+        if not geklikt:
+            return f"⚠️ *Mislukt:* geen inschrijfknop gevonden voor {doel_tijd}. Zat je er al in, of is de wachtlijst óók vol?"
+        if nog_in is True:
+            return f"✅ *Ingeschreven* voor de les van *{doel_tijd}* in *{doel_zaal}* (of op de wachtlijst)."
+        if nog_in is False:
+            return f"⚠️ *Let op:* inschrijfknop geklikt voor {doel_tijd} ({doel_zaal}), maar je staat er (nog) niet in. Check het rooster."
+        return f"✅ *Inschrijf-actie uitgevoerd* voor *{doel_tijd}* in *{doel_zaal}*."
+    if actie == "uitschrijven":
+        if not geklikt:
+            return f"⚠️ *Mislukt:* geen uitschrijfknop gevonden voor {doel_tijd}. Zat je er wel in?"
+        if nog_in is False:
+            return f"🗑️ *Uitgeschreven* voor de les van *{doel_tijd}* in *{doel_zaal}*."
+        if nog_in is True:
+            return f"⚠️ *Let op:* uitschrijfknop geklikt voor {doel_tijd} ({doel_zaal}), maar je staat er NOG steeds in. De actie is niet doorgekomen."
+        return f"🗑️ *Uitschrijf-actie uitgevoerd* voor *{doel_tijd}* in *{doel_zaal}*."
+    return f"⚠️ Onbekende actie '{actie}' voor {doel_tijd} ({doel_zaal})."
+
+async def direct_actie(context, page, url, a, stand):
+    """Snelle route: leest action + verborgen velden van het formulier in de
+    modal en post dat in 1 request via context.request (zelfde cookies, geen
+    klik/rendering). De bevestiging komt uit de response; staat de les daar
+    niet in, dan 1 lichte GET van het rooster (HTML, geen browser).
+    stand["html"] = laatst bekende HTML van deze roosterpagina, zodat een
+    volgende actie in dezelfde groep de pagina niet opnieuw hoeft te lezen.
+    Retourneert de rapportregel, of None als de klik-route veilig is: er is
+    geen formulier, of de POST faalde en de verse stand laat zien dat hij niet
+    is doorgekomen. Een in-/uitschrijving is een toggle; na een POST met een
+    onbekende uitkomst nooit blind opnieuw klikken."""
+    doel_tijd, actie, dag_en = a["tijd"], a["actie"], a["dag_en"]
+    dom = parse_html(stand.get("html") or await page.content())
+    record = zoek_les(les_records(dom), dag_en, doel_tijd)
+    if not record:
+        return None
+    target = record.get("target") or ""
+    formulier = actie_formulier(dom, target, actie, url)
+    if not formulier:
+        return None
+    action, velden, knop = formulier
+
+    print(f"Les {doel_tijd} ({a['zaal_label']}) gevonden; formulier '{knop}' direct versturen...")
+    # Vanaf hier kan de server de actie al hebben; voer_actie_uit klikt dan niet meer bij een fout.
+    stand["verzonden"] = True
+    with metrics.span("formulier"):
+        metrics.tel("navigaties")
+        html = None
+        try:
+            resp = await context.request.post(action, form=velden, timeout=20000)
+            if resp.ok:
+                html = await resp.text()
+            else:
+                print(f"Formulier gaf HTTP {resp.status}; stand opnieuw lezen.")
+        except Exception as e:
+            print(f"Formulier versturen mislukt ({e}); stand opnieuw lezen.")
+        bevestigd = html is not None
+        dom = parse_html(html) if bevestigd else None
+        cls = les_class(dom, target) if bevestigd else None
+        if cls is None:
+            # Response zonder rooster (bv. een bedankpagina) of geen response: alleen deze pagina ophalen.
+            metrics.tel("navigaties")
+            resp = await context.request.get(url, timeout=20000)
+            html = await resp.text()
+            dom = parse_html(html)
+            cls = les_class(dom, target)
+    stand["html"] = html
+    # De browserpagina laat nu de oude stand zien; alleen herladen als de klik-route nog nodig is.
+    stand["verouderd"] = True
+
+    nog_in = None if cls is None else is_ingeschreven_class(cls)
+    if not bevestigd:
+        if nog_in is None:
+            return (f"❌ *Fout:* {actie} voor {doel_tijd} ({a['zaal_label']}) is misschien verstuurd, "
+                    f"maar de les staat niet in het rooster. Check het rooster; niet opnieuw geprobeerd.")
+        if nog_in != (actie == "inschrijven"):
+            print("Verse stand: de actie is niet doorgekomen; terug naar de klik-route.")
+            stand["verzonden"] = False
+            return None
+    records = les_records(dom)
+    record = zoek_les(records, dag_en, doel_tijd)
+    les = les_uit_record(record, a["zaal"]) if record else None
+    if les:
+        with metrics.span("schrijven:workout"):
+            aangepast = patch_workout_json(dag_en, a["week"], les, status_uit_dom(dom, records, dag_en))
+        print(f"📝 workout.json bijgewerkt ({aangepast} plek(ken)).")
+    return rapport_regel(actie, True, nog_in, doel_tijd, a["zaal_label"])
+
+async def voer_actie_uit(page, url, a, context=None, stand=None):
+    """Voert 1 in-/uitschrijving uit op de (al geladen) roosterpagina en werkt
+    workout.json bij. Eerst via het formulier (direct_actie), anders met een
+    klik zoals in de browser. Retourneert de regel voor het Telegram-rapport."""
+    doel_tijd, doel_zaal, actie, dag_en = a["tijd"], a["zaal_label"], a["actie"], a["dag_en"]
+    stand = {} if stand is None else stand
+
+    if context is not None:
+        try:
+            regel = await direct_actie(context, page, url, a, stand)
+            if regel:
+                return regel
+        except Exception as e:
+            if stand.pop("verzonden", False):
+                # De POST is weg en de stand is niet te lezen: klikken kan hem terugdraaien.
+                return (f"❌ *Fout:* {actie} voor {doel_tijd} ({doel_zaal}) is misschien verstuurd, "
+                        f"maar de stand is niet te lezen ({e}). Check het rooster; niet opnieuw geprobeerd.")
+            print(f"Direct versturen mislukt ({e}); terug naar de klik-route.")
+        stand.pop("verzonden", None)
+
+    # Na een vorige actie kan de pagina genavigeerd of verouderd zijn: dan opnieuw laden.
+    if page.url != url or stand.pop("verouderd", False):
+        await open_rooster(page, url)
+        stand.pop("html", None)
+    await wacht.sluit_modal(page)
+
+    # Zoek het juiste blokje
+    selector = f"li[data-remodal-target*='{dag_en}']"
+    target_les = None
+    for les in await page.locator(selector).all():
+        try:
+            tijd_text = (await les.locator(".event-date").first.inner_text()).strip()
+            if doel_tijd in tijd_text:
+                target_les = les
+                break
+        except: pass
+
+    if not target_les:
+        return f"❌ *Fout:* Kon de les van {doel_tijd} ({doel_zaal}) niet vinden in het rooster."
+
+    print(f"Les {doel_tijd} ({doel_zaal}) gevonden! Klikken...")
+    doel_target = await target_les.get_attribute("data-remodal-target") or ""
+    with metrics.span("modal"):
+        await target_les.click()
+        await wacht.modal_open(page)
+
+    modal = page.locator(".remodal-is-opened")
+
+    async def klik_knop(selector):
+        """Klikt de eerste zichtbare/enabled knop die matcht. Geeft True bij klik."""
+        knop = modal.locator(selector).first
+        if await knop.count() > 0:
             try:
-                await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
+                await knop.scroll_into_view_if_needed()
             except:
                 pass
-            await page.wait_for_timeout(1000)
+            # Wacht op de navigatie/POST die de klik veroorzaakt i.p.v. vast 2,5 s.
+            await wacht.na_klik(page, lambda: knop.click(force=True), "actie")
+            return True
+        return False
 
-            # Zoek het juiste blokje
-            selector = f"li[data-remodal-target*='{dag_en}']"
-            lessen = await page.locator(selector).all()
-            target_les = None
-            for les in lessen:
-                try:
-                    tijd_text = (await les.locator(".event-date").first.inner_text()).strip()
-                    if doel_tijd in tijd_text:
-                        target_les = les
-                        break
-                except: pass
-
-            if not target_les:
-                stuur_telegram(f"❌ *Fout:* Kon de les van {doel_tijd} ({doel_zaal}) niet vinden in het rooster.")
-                return
+    async def is_nog_ingeschreven(verwacht):
+        """Checkt de class van deze les. True als je nog steeds ingeschreven/
+        op de wachtlijst staat. Eerst kort wachten tot de class op de pagina
+        zelf de verwachte kant op verandert; pas als dat niet gebeurt het
+        rooster herladen en opnieuw zoeken."""
+        if doel_target and await wacht.wacht_op_class(page, doel_target, INGESCHREVEN_CLASSES, aanwezig=verwacht):
+            return verwacht
+        metrics.tel("navigaties")
+        try:
+            await page.reload(wait_until="domcontentloaded", timeout=45000)
+            await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
+        except:
+            pass
+        for les in await page.locator(selector).all():
+            try:
+                tijd_text = (await les.locator(".event-date").first.inner_text()).strip()
+                if doel_tijd in tijd_text:
+                    cls = (await les.get_attribute("class") or "").lower()
+                    return any(k in cls for k in INGESCHREVEN_CLASSES)
+            except:
+                pass
+        return None  # les niet teruggevonden -> onbekend
 
-            print("Les gevonden! Klikken...")
-            await target_les.click()
-            await page.wait_for_selector(".remodal-is-opened", timeout=5000)
-            await page.wait_for_timeout(1500)
-
-            modal = page.locator(".remodal-is-opened")
-
-            # De knoppen in de pop-up zijn <input value="INSCHRIJVEN/UITSCHRIJVEN">
-            # (niet altijd <button>/<a>). We dekken daarom álle varianten af,
-            # gelijk aan het bewezen werkende bink_inschrijven.py. De oude versie
-            # zocht alleen op zichtbare tekst en miste zo de <input>-knoppen,
-            # waardoor uit-/inschrijven stil faalde.
-            INSCHRIJF_SEL = ("input[value*='INSCHRIJVEN' i]:not([value*='UITSCHRIJVEN' i]), "
-                             "button:has-text('Inschrijven'), a:has-text('Inschrijven')")
-            WACHTLIJST_SEL = ("input[value*='WACHTLIJST' i], "
-                              "button:has-text('Wachtlijst'), a:has-text('Wachtlijst')")
-            UITSCHRIJF_SEL = ("input[value*='UITSCHRIJVEN' i], input[value*='Afmelden' i], "
-                              "button:has-text('Uitschrijven'), a:has-text('Uitschrijven'), "
-                              "button:has-text('Afmelden'), a:has-text('Afmelden')")
-
-            async def klik_knop(selector):
-                """Klikt de eerste zichtbare/enabled knop die matcht. Geeft True bij klik."""
-                knop = modal.locator(selector).first
-                if await knop.count() > 0:
-                    try:
-                        await knop.scroll_into_view_if_needed()
-                    except:
-                        pass
-                    await knop.click(force=True)
-                    await page.wait_for_timeout(2500)
-                    return True
-                return False
-
-            async def is_nog_ingeschreven():
-                """Herlaadt het rooster en checkt de class van deze les. True als je
-                nog steeds ingeschreven/op de wachtlijst staat."""
-                try:
-                    await page.reload(wait_until="domcontentloaded", timeout=45000)
-                    await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
-                except:
-                    pass
-                for les in await page.locator(selector).all():
+    # --- KLIK OP DE JUISTE KNOP ---
+    geklikt = False
+    nog_in = None
+    if actie == "inschrijven":
+        geklikt = await klik_knop(INSCHRIJF_SEL) or await klik_knop(WACHTLIJST_SEL)
+        if geklikt:
+            nog_in = await is_nog_ingeschreven(True)
+    elif actie == "uitschrijven":
+        geklikt = await klik_knop(UITSCHRIJF_SEL)
+        if geklikt:
+            nog_in = await is_nog_ingeschreven(False)
+    regel = rapport_regel(actie, geklikt, nog_in, doel_tijd, doel_zaal)
+
+    # Alleen deze les in workout.json bijwerken i.p.v. een volledige scrape.
+    if geklikt:
+        await werk_workout_json_bij(page, dag_en, a["week"], doel_tijd, a["zaal"])
+    return regel
+
+async def verwerk(acties):
+    """Alle acties in 1 browser + 1 login; per (zaal, week) 1 keer de pagina laden.
+    Retourneert (rapportregels in volgorde, mislukte acties)."""
+    regels, mislukt, gedaan = [], [], []
+    async with async_playwright() as p:
+        browser = await start_browser(p)
+        context = await maak_context(browser)
+        page = await nieuwe_pagina(context)
+
+        try:
+            print("Inloggen...")
+            await zorg_voor_login(context, page, robuuste_login)
+
+            for (zaal, week), groep in groepeer_per_pagina(acties).items():
+                url = rooster_url(zaal, week)
+                print(f"Navigeren naar {zaal} ({week}): {len(groep)} actie(s)...")
+                await open_rooster(page, url)
+                stand = {}
+                for a in groep:
                     try:
-                        tijd_text = (await les.locator(".event-date").first.inner_text()).strip()
-                        if doel_tijd in tijd_text:
-                            cls = (await les.get_attribute("class") or "").lower()
-                            return any(k in cls for k in ("signedup", "signed", "booked", "on-waiting-list"))
-                    except:
-                        pass
-                return None  # les niet teruggevonden -> onbekend
-
-            # --- KLIK OP DE JUISTE KNOP ---
-            if actie == "inschrijven":
-                geklikt = await klik_knop(INSCHRIJF_SEL) or await klik_knop(WACHTLIJST_SEL)
-
-                if geklikt:
-                    nog_in = await is_nog_ingeschreven()
-                    if nog_in is True:
-                        stuur_telegram(f"✅ *Ingeschreven* voor de les van *{doel_tijd}* in *{doel_zaal}* (of op de wachtlijst).")
-                    elif nog_in is False:
-                        stuur_telegram(f"⚠️ *Let op:* inschrijfknop geklikt voor {doel_tijd} ({doel_zaal}), maar je staat er (nog) niet in. Check het rooster.")
-                    else:
-                        stuur_telegram(f"✅ *Inschrijf-actie uitgevoerd* voor *{doel_tijd}* in *{doel_zaal}*.")
-                else:
-                    stuur_telegram(f"⚠️ *Mislukt:* geen inschrijfknop gevonden voor {doel_tijd}. Zat je er al in, of is de wachtlijst óók vol?")
-
-            elif actie == "uitschrijven":
-                geklikt = await klik_knop(UITSCHRIJF_SEL)
-
-                if geklikt:
-                    nog_in = await is_nog_ingeschreven()
-                    if nog_in is False:
-                        stuur_telegram(f"🗑️ *Uitgeschreven* voor de les van *{doel_tijd}* in *{doel_zaal}*.")
-                    elif nog_in is True:
-                        stuur_telegram(f"⚠️ *Let op:* uitschrijfknop geklikt voor {doel_tijd} ({doel_zaal}), maar je staat er NOG steeds in. De actie is niet doorgekomen.")
-                    else:
-                        stuur_telegram(f"🗑️ *Uitschrijf-actie uitgevoerd* voor *{doel_tijd}* in *{doel_zaal}*.")
-                else:
-                    stuur_telegram(f"⚠️ *Mislukt:* geen uitschrijfknop gevonden voor {doel_tijd}. Zat je er wel in?")
+                        with metrics.span(f"actie:{a['actie']}"):
+                            regel = await voer_actie_uit(page, url, a, context, stand)
+                    except Exception as e:
+                        regel = f"🚨 *Widget-actie mislukt* voor {a['tijd']} ({a['zaal_label']}):\n{str(e)}"
+                        print(f"Fout bij {a['tijd']}: {e}")
+                    regels.append(regel)
+                    gedaan.append(a)
+                    if regel.startswith(MISLUKT):
+                        mislukt.append(a)
+
+            print(wacht.rapport())
+            print(verkeer_rapport())
 
         except Exception as e:
             # Fout melden via Telegram, maar netjes afsluiten (exit 0) zodat GitHub
             # geen failure-mail stuurt.
-            stuur_telegram(f"🚨 *Widget-actie mislukt* voor {doel_tijd} ({doel_zaal}):\n{str(e)}")
+            regels.append(f"🚨 *Widget-actie mislukt*:\n{str(e)}")
             print(f"CRITICAL: {e}")
+            # Wat nog niet aan de beurt was (bv. login mislukt) telt ook als mislukt.
+            mislukt.extend(a for a in acties if not any(a is g for g in gedaan))
         finally:
             await browser.close()
+    return regels, mislukt
+
+async def run():
+    print("Inschrijf-robot gestart!")
+    metrics.reset()
+    verstuur_spool()
+
+    # Payload van deze dispatch (als die er is) + alles wat in de wachtrij staat.
+    wachtrij = lees_wachtrij()
+    payloads = wachtrij + event_payloads()
+
+    now = datetime.now()
+    acties = [a for a in (actie_uit_payload(p, now) for p in payloads) if a]
+    if not acties:
+        print("Commando incompleet!" if payloads else "Geen acties (geen event data, lege wachtrij).")
+        werk_wachtrij_bij(wachtrij, [])
+        return
+
+    acties, weggestreept = klap_samen(acties)
+    regels, mislukt = await verwerk(acties) if acties else ([], [])
+    for a, _ in weggestreept:
+        regels.append(f"↩️ In- en uitschrijven voor {a['tijd']} ({a['zaal_label']}) heffen elkaar op; niets gedaan.")
+
+    opnieuw, opgegeven = werk_wachtrij_bij(wachtrij, mislukt)
+    if opnieuw:
+        regels.append(f"🔁 {len(opnieuw)} mislukte actie(s) blijven in de wachtrij voor de volgende run.")
+    for a in opgegeven:
+        regels.append(f"🛑 {a['actie'].capitalize()} voor {a['tijd']} ({a['zaal_label']}) opgegeven "
+                      f"na {MAX_POGINGEN_WACHTRIJ} pogingen.")
+    if len(regels) == 1:
+        stuur_telegram(regels[0])
+    elif regels:
+        stuur_telegram(f"📋 *Widget-acties ({len(regels)}):*\n\n" + "\n".join(regels))
+    metrics.schrijf_run("bink_enroll", not mislukt, {"acties": len(acties), "mislukt": len(mislukt)})
+
+def in_wachtrij():
+    """Zet de payload(s) van deze dispatch alleen in de wachtrij (geen browser)."""
+    now = datetime.now()
+    acties = [a for a in (actie_uit_payload(p, now) for p in event_payloads()) if a]
+    payloads = [a["payload"] for a in acties]
+    voeg_toe_wachtrij(payloads)
+    print(f"📥 {len(payloads)} actie(s) in {WACHTRIJ_FILE}; de volgende run handelt ze af.")
 
 if __name__ == "__main__":
-    asyncio.run(run())
+    parser = argparse.ArgumentParser(description="In-/uitschrijven via de widget")
+    parser.add_argument("--in-wachtrij", action="store_true",
+                        help=f"payload van deze dispatch alleen in {WACHTRIJ_FILE} zetten")
+    if parser.parse_args().in_wachtrij:
+        in_wachtrij()
+    else:
+        asyncio.run(run())
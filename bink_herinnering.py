@@ -1,42 +1,42 @@
-"""Stuurt ~UUR_VOORAF uur voor een ingeschreven les een Telegram-herinnering.
-
-Leest de reeds gescrapete workout.json (geen login nodig) en houdt in
-reminders.json bij welke lessen al herinnerd zijn, zodat er nooit dubbel
-gepingd wordt. Draait via cron (zie .github/workflows/herinnering.yml)."""
+"""Stuurt UUR_VOORAF uur voor een ingeschreven les een Telegram-herinnering.
+
+Leest aankomend.json, de gesorteerde index van ingeschreven lessen met
+absolute starttijden die de scraper naast workout.json schrijft (zie
+bink_workout; ontbreekt hij, dan wordt hij uit workout.json berekend). Elke
+les krijgt een moment (start - UUR_VOORAF) op een heap; de planner slaapt tot
+het eerstvolgende moment en stuurt dan precies op tijd. reminders.json houdt
+bij welke lessen al herinnerd zijn, zodat er nooit dubbel gepingd wordt.
+
+    python bink_herinnering.py                    # alleen wat nu al aan de beurt is
+    python bink_herinnering.py --horizon 15       # ook wachten op wat binnen 15 min komt
+    python bink_herinnering.py --horizon 15 --git # index vlak voor het sturen van origin/main
+
+Na het slapen wordt de index vlak voor het sturen opnieuw gelezen: een les
+waar je inmiddels uit bent (bink_enroll) krijgt geen herinnering. De workflow
+(herinnering.yml) draait elk kwartier met een horizon van 1 kwartier en leest
+met --git de aankomend.json die nu op main staat, niet die van de checkout.
+Lang wachten is voor de daemon van bink_auto: daar draait herinner_lus() mee
+en wordt de heap na elke scrape opnieuw opgebouwd."""
+import argparse
+import asyncio
+import heapq
 import os
 import json
+import subprocess
 import time
-import urllib.request
-import urllib.parse
 from datetime import datetime, timedelta
 
+from bink_telegram import stuur_telegram, verstuur_spool
+from bink_workout import AANKOMEND_FILE, WORKOUT_FILE, aankomende_lessen, lees_aankomend
+
 os.environ['TZ'] = 'Europe/Amsterdam'
 try:
     time.tzset()
 except Exception:
     pass
 
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
-
 UUR_VOORAF = 3          # hoeveel uur van tevoren we herinneren
 STATE_FILE = "reminders.json"
-INGESCHREVEN = {"Jij bent Ingeschreven", "Jij staat op Wachtlijst"}
-
-
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID:
-        print("Geen Telegram-gegevens, bericht niet verstuurd.")
-        return
-    print(f"Telegram: {bericht}")
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode(
-        {"chat_id": TG_CHAT_ID, "text": bericht, "parse_mode": "Markdown"}
-    ).encode("utf-8")
-    try:
-        urllib.request.urlopen(urllib.request.Request(url, data=data), timeout=15)
-    except Exception as e:
-        print(f"Telegram fout: {e}")
 
 
 def lees_json(pad, default):
@@ -47,100 +47,42 @@ def lees_json(pad, default):
         return default
 
 
-def parse_start(datum, tijd):
-    """datum 'dd-mm-yyyy' + tijd '18:30 - 19:30' -> datetime van de starttijd."""
-    if not datum or not tijd:
-        return None
-    start = tijd.split("-")[0].strip()
+def lees_aankomend_git():
+    """aankomend.json zoals hij nu op origin/main staat (de checkout van de
+    workflow is van de start van de job); None als dat niet lukt."""
     try:
-        return datetime.strptime(f"{datum} {start}", "%d-%m-%Y %H:%M")
-    except Exception:
+        subprocess.run(["git", "fetch", "-q", "origin", "main"], check=True, timeout=60)
+        uit = subprocess.run(["git", "show", f"origin/main:{AANKOMEND_FILE}"],
+                             check=True, capture_output=True, timeout=30)
+        lessen = json.loads(uit.stdout)
+        return lessen if isinstance(lessen, list) else None
+    except Exception as e:
+        print(f"⚠️ {AANKOMEND_FILE} niet van origin/main gelezen ({e}); lokale versie.")
         return None
 
 
-def verzamel_ingeschreven(data):
-    """Alle lessen waar je in/op wachtlijst staat, als (datum, les)-tuples."""
-    now = datetime.now()
-    result = []
-
-    # Vandaag (datum uit de JSON).
-    for les in data.get("rooster_vandaag", []):
-        if les.get("status") in INGESCHREVEN:
-            result.append((data.get("datum"), les))
-
-    # Morgen.
-    morgen = (now + timedelta(days=1)).strftime("%d-%m-%Y")
-    for les in data.get("rooster_morgen", []):
-        if les.get("status") in INGESCHREVEN:
-            result.append((morgen, les))
-
-    # Rest van deze week + volgende week (dag draagt eigen datum).
-    for dag in (data.get("rooster_deze_week", []) or []) + (data.get("rooster_week", []) or []):
-        for les in dag.get("lessen", []):
-            if les.get("status") in INGESCHREVEN:
-                result.append((dag.get("datum"), les))
-
-    # Fallback: status_vandaag/morgen die (nog) niet in het rooster stond.
-    sv = data.get("status_vandaag") or {}
-    if sv.get("ingeschreven") and sv.get("tijd"):
-        result.append((data.get("datum"), {
-            "tijd": sv.get("tijd"), "type": sv.get("type") or "les",
-            "zaal": "", "status": "Jij staat op Wachtlijst" if sv.get("wachtlijst") else "Jij bent Ingeschreven",
-        }))
-    sm = data.get("status_morgen") or {}
-    if sm.get("ingeschreven") and sm.get("tijd"):
-        result.append((morgen, {
-            "tijd": sm.get("tijd"), "type": sm.get("type") or "les",
-            "zaal": "", "status": "Jij staat op Wachtlijst" if sm.get("wachtlijst") else "Jij bent Ingeschreven",
-        }))
-
-    return result
+def lees_lessen(git=False):
+    """De index van aankomende lessen; zonder index (oude workout.json) uit
+    workout.json zelf."""
+    lessen = lees_aankomend_git() if git else None
+    if lessen is None:
+        lessen = lees_aankomend(AANKOMEND_FILE)
+    if lessen is None:
+        data = lees_json(WORKOUT_FILE, {})
+        lessen = aankomende_lessen(data) if data else []
+    return lessen
 
 
-def main():
-    data = lees_json("workout.json", {})
-    if not data:
-        print("Geen workout.json.")
-        return
-
+def lees_reminded():
     state = lees_json(STATE_FILE, {})
     if not isinstance(state, dict):
         state = {}
-    reminded = set(state.get("reminded", []))
+    return state, set(state.get("reminded", []))
 
-    now = datetime.now()
-    grens = now + timedelta(hours=UUR_VOORAF)
-
-    nieuw = False
-    seen = set()
-    for datum, les in verzamel_ingeschreven(data):
-        tijd = les.get("tijd", "")
-        # Dedup per tijdslot (niet per zaal): je zit maar in één les per slot,
-        # en het rooster + de status-fallback mogen niet dubbel pingen.
-        key = f"{datum} {tijd}".strip()
-        if key in seen:
-            continue
-        seen.add(key)
 
-        start = parse_start(datum, tijd)
-        if not start:
-            continue
-
-        # Herinner zodra de les binnen UUR_VOORAF valt en nog niet gepingd is.
-        if now < start <= grens and key not in reminded:
-            resterend = start - now
-            uren = int(resterend.total_seconds() // 3600)
-            mins = int((resterend.total_seconds() % 3600) // 60)
-            wachtlijst = " (wachtlijst)" if les.get("status") == "Jij staat op Wachtlijst" else ""
-            zaal = f" in *{les.get('zaal')}*" if les.get("zaal") else ""
-            stuur_telegram(
-                f"⏰ *Bink-herinnering* — over ~{uren}u{mins:02d}m:\n"
-                f"*{les.get('type', 'les')}* om *{tijd}*{zaal}{wachtlijst}."
-            )
-            reminded.add(key)
-            nieuw = True
-
-    # Oude keys opruimen (datum ouder dan gisteren).
+def bewaar_reminded(state, reminded, now):
+    """Ruimt oude keys op (datum ouder dan gisteren) en schrijft reminders.json
+    als er iets veranderd is. True bij schrijven."""
     gisteren = (now - timedelta(days=1)).date()
     schoon = set()
     for key in reminded:
@@ -151,13 +93,107 @@ def main():
         except Exception:
             schoon.add(key)  # onbekend formaat: behouden
 
-    if nieuw or schoon != reminded:
-        state["reminded"] = sorted(schoon)
-        with open(STATE_FILE, "w", encoding="utf-8") as f:
-            json.dump(state, f, indent=2, ensure_ascii=False)
-        print("reminders.json bijgewerkt.")
+    if schoon == set(state.get("reminded", [])):
+        return False
+    state["reminded"] = sorted(schoon)
+    with open(STATE_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, ensure_ascii=False)
+    return True
+
+
+def plan(lessen, reminded, now):
+    """Heap van (moment, key, les) voor lessen die nog moeten beginnen en nog
+    niet herinnerd zijn; moment = start - UUR_VOORAF (epoch-seconden)."""
+    heap = []
+    nu = now.timestamp()
+    for les in lessen:
+        if les["start"] > nu and les["key"] not in reminded:
+            heap.append((les["start"] - UUR_VOORAF * 3600, les["key"], les))
+    heapq.heapify(heap)
+    return heap
+
+
+def herinner(les, now):
+    resterend = les["start"] - now.timestamp()
+    uren = int(resterend // 3600)
+    mins = int((resterend % 3600) // 60)
+    wachtlijst = " (wachtlijst)" if les.get("wachtlijst") else ""
+    zaal = f" in *{les.get('zaal')}*" if les.get("zaal") else ""
+    stuur_telegram(
+        f"⏰ *Bink-herinnering* — over ~{uren}u{mins:02d}m:\n"
+        f"*{les.get('type', 'les')}* om *{les.get('tijd')}*{zaal}{wachtlijst}.",
+        parse_mode="Markdown",
+    )
+
+
+def verwerk_heap(heap, reminded, now, geboekt=None):
+    """Stuurt alles van de heap dat aan de beurt is. Een les die al begonnen is
+    (bv. pas vlak ervoor ingeschreven en gemist) slaan we over, net als een les
+    die niet meer in 'geboekt' (keys uit een verse index) staat. Aantal verstuurd."""
+    verstuurd = 0
+    while heap and heap[0][0] <= now.timestamp():
+        _, key, les = heapq.heappop(heap)
+        if geboekt is not None and key not in geboekt:
+            print(f"↩️ {key} niet meer ingeschreven; geen herinnering.")
+            continue
+        if les["start"] > now.timestamp() and key not in reminded:
+            herinner(les, now)
+            verstuurd += 1
+        reminded.add(key)
+    return verstuurd
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lesherinneringen via Telegram")
+    parser.add_argument("--horizon", type=float, default=0, metavar="MIN",
+                        help="wacht op herinneringen die binnen MIN minuten vallen")
+    parser.add_argument("--git", action="store_true",
+                        help=f"lees {AANKOMEND_FILE} van origin/main i.p.v. de checkout")
+    args = parser.parse_args()
+
+    verstuur_spool()
+    state, reminded = lees_reminded()
+    now = datetime.now()
+    heap = plan(lees_lessen(args.git), reminded, now)
+    grens = now.timestamp() + args.horizon * 60
+
+    verstuurd = verwerk_heap(heap, reminded, now)
+    while heap and heap[0][0] <= grens:
+        slaap = heap[0][0] - time.time()
+        if slaap > 0:
+            print(f"⏳ Slapen tot {datetime.fromtimestamp(heap[0][0]).strftime('%H:%M:%S')} "
+                  f"voor {heap[0][1]}.")
+            time.sleep(slaap)
+        # Tijdens het slapen kan je uitgeschreven zijn: vlak voor het sturen opnieuw lezen.
+        geboekt = {les["key"] for les in lees_lessen(args.git)}
+        verstuurd += verwerk_heap(heap, reminded, datetime.now(), geboekt)
+        # Meteen vastleggen: een volgende run mag dit niet opnieuw sturen.
+        bewaar_reminded(state, reminded, datetime.now())
+
+    if bewaar_reminded(state, reminded, datetime.now()) or verstuurd:
+        print(f"reminders.json bijgewerkt ({verstuurd} herinnering(en)).")
     else:
         print("Niets te herinneren.")
+    if heap:
+        print(f"Volgende herinnering: {datetime.fromtimestamp(heap[0][0]).strftime('%d-%m %H:%M')} ({heap[0][1]}).")
+
+
+async def herinner_lus(stop, opnieuw):
+    """Voor de daemon: slaapt tot de volgende herinnering, of tot 'opnieuw'
+    gezet wordt (nieuwe aankomend.json na een scrape) of 'stop'."""
+    while not stop.is_set():
+        opnieuw.clear()
+        state, reminded = lees_reminded()
+        heap = plan(lees_lessen(), reminded, datetime.now())
+        if verwerk_heap(heap, reminded, datetime.now()):
+            bewaar_reminded(state, reminded, datetime.now())
+        slaap = heap[0][0] - time.time() if heap else None
+        wachters = [asyncio.ensure_future(stop.wait()), asyncio.ensure_future(opnieuw.wait())]
+        try:
+            await asyncio.wait(wachters, timeout=slaap, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for w in wachters:
+                w.cancel()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,170 @@
+"""WOD-historie in SQLite: 1 rij per datum i.p.v. 1 regel per uurlijkse run.
+
+history.csv kreeg bij elke geslaagde run een regel erbij, dus dezelfde WOD
+stond er tientallen keren per datum in en elke lezer moest ontdubbelen. Nu:
+
+- DB_FILE (history.db) met datum als unieke sleutel; upsert() werkt de WOD en
+  het coach-advies van een datum bij (en schrijft niets als er niets verandert).
+- 'versie' loopt op bij elke wijziging (met index), zodat lezers zoals de
+  déjà-vu-index alleen de nieuwe/gewijzigde datums hoeven op te halen.
+- datum_iso (jjjj-mm-dd) is de primary key, dus datumbereiken gaan via de index.
+- history.csv blijft bestaan als export (1 rij per datum, zelfde kolommen) voor
+  wie hem nog leest; open_db() migreert een bestaande CSV eenmalig.
+- Alleen history.csv staat in git; history.db gaat via actions/cache. Ontbreekt
+  de database (cache verlopen), dan bouwt open_db() hem uit de CSV opnieuw op.
+
+Los te draaien:
+    python bink_historie.py --migreer            # (opnieuw) importeren uit history.csv
+    python bink_historie.py --export             # history.csv opnieuw schrijven
+    python bink_historie.py --van 01-02-2026 --tot 28-02-2026"""
+import argparse
+import csv
+import os
+import sqlite3
+from datetime import datetime
+
+DB_FILE = os.environ.get("BINK_HISTORY_DB", "history.db")
+CSV_FILE = "history.csv"
+CSV_HEADER = ["Datum", "Dag", "Workout", "AI Coach Advies"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS wods (
+    datum_iso TEXT PRIMARY KEY,
+    datum     TEXT NOT NULL,
+    dag       TEXT NOT NULL DEFAULT '',
+    workout   TEXT NOT NULL DEFAULT '',
+    coach     TEXT NOT NULL DEFAULT '',
+    versie    INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wods_versie ON wods (versie);
+"""
+
+UPSERT = """
+INSERT INTO wods (datum_iso, datum, dag, workout, coach, versie)
+VALUES (?, ?, ?, ?, ?, (SELECT COALESCE(MAX(versie), 0) + 1 FROM wods))
+ON CONFLICT (datum_iso) DO UPDATE SET
+    dag = excluded.dag,
+    workout = excluded.workout,
+    coach = CASE WHEN excluded.coach != '' THEN excluded.coach ELSE wods.coach END,
+    versie = excluded.versie
+WHERE wods.workout != excluded.workout
+   OR wods.dag != excluded.dag
+   OR (excluded.coach != '' AND wods.coach != excluded.coach)
+"""
+
+
+def naar_iso(datum):
+    """'dd-mm-jjjj' -> 'jjjj-mm-dd' (of None als het geen datum is)."""
+    try:
+        return datetime.strptime(datum, "%d-%m-%Y").strftime("%Y-%m-%d")
+    except Exception:
+        return None
+
+
+def _csv_veld(tekst):
+    # Zelfde vorm als de oude append: regels als ' | ', coach op 1 regel.
+    return (tekst or "").replace("\n", " | ")
+
+
+def open_db(pad=None, csv_file=CSV_FILE):
+    """Verbinding met de historie; maakt het schema aan en migreert history.csv
+    als de database nog leeg is."""
+    conn = sqlite3.connect(pad or DB_FILE)
+    conn.row_factory = sqlite3.Row
+    conn.executescript(SCHEMA)
+    if conn.execute("SELECT 1 FROM wods LIMIT 1").fetchone() is None and os.path.isfile(csv_file):
+        aantal = migreer_csv(conn, csv_file)
+        print(f"📚 history.csv gemigreerd naar {pad or DB_FILE}: {aantal} datums.")
+    return conn
+
+
+def upsert(conn, datum, dag, workout, coach=""):
+    """Zet de WOD (en evt. coach-advies) van deze datum. Leeg coach-advies
+    overschrijft een eerder advies niet. True als er iets veranderd is."""
+    iso = naar_iso(datum)
+    if not iso:
+        return False
+    with conn:
+        cur = conn.execute(UPSERT, (iso, datum, dag or "", _csv_veld(workout),
+                                    (coach or "").replace("\n", " ")))
+    return cur.rowcount > 0
+
+
+def migreer_csv(conn, csv_file=CSV_FILE):
+    """Eenmalige import: per datum de laatste WOD en het laatste niet-lege
+    coach-advies (zo lazen de oude lezers het ook)."""
+    per_datum = {}
+    with open(csv_file, newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        for rij in reader:
+            if len(rij) < 3 or not naar_iso(rij[0]):
+                continue
+            oud = per_datum.get(rij[0], {})
+            coach = rij[3] if len(rij) > 3 and rij[3] else oud.get("coach", "")
+            per_datum[rij[0]] = {"dag": rij[1], "workout": rij[2], "coach": coach}
+
+    # Chronologisch, zodat 'versie' dezelfde volgorde heeft als de datums.
+    for datum in sorted(per_datum, key=naar_iso):
+        r = per_datum[datum]
+        upsert(conn, datum, r["dag"], r["workout"], r["coach"])
+    return len(per_datum)
+
+
+def tussen(conn, van=None, tot=None):
+    """Rijen met van <= datum <= tot (dd-mm-jjjj, beide optioneel), op datum."""
+    sql, args = "SELECT * FROM wods", []
+    voorwaarden = []
+    if van:
+        voorwaarden.append("datum_iso >= ?")
+        args.append(naar_iso(van))
+    if tot:
+        voorwaarden.append("datum_iso <= ?")
+        args.append(naar_iso(tot))
+    if voorwaarden:
+        sql += " WHERE " + " AND ".join(voorwaarden)
+    return conn.execute(sql + " ORDER BY datum_iso", args).fetchall()
+
+
+def gewijzigd_sinds(conn, versie):
+    """Rijen die na 'versie' zijn toegevoegd of gewijzigd (via de versie-index)."""
+    return conn.execute("SELECT * FROM wods WHERE versie > ? ORDER BY versie", (versie,)).fetchall()
+
+
+def hoogste_versie(conn):
+    return conn.execute("SELECT COALESCE(MAX(versie), 0) FROM wods").fetchone()[0]
+
+
+def exporteer_csv(conn, csv_file=CSV_FILE):
+    """Schrijft history.csv opnieuw: zelfde kolommen, 1 rij per datum."""
+    tmp = csv_file + ".tmp"
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(CSV_HEADER)
+        for r in tussen(conn):
+            writer.writerow([r["datum"], r["dag"], r["workout"], r["coach"]])
+    os.replace(tmp, csv_file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WOD-historie (history.db)")
+    parser.add_argument("--migreer", action="store_true", help="importeer history.csv (upsert)")
+    parser.add_argument("--export", action="store_true", help="schrijf history.csv opnieuw")
+    parser.add_argument("--van", help="dd-mm-jjjj")
+    parser.add_argument("--tot", help="dd-mm-jjjj")
+    args = parser.parse_args()
+
+    conn = open_db()
+    if args.migreer:
+        print(f"{migreer_csv(conn)} datums uit {CSV_FILE} verwerkt.")
+    if args.export:
+        exporteer_csv(conn)
+        print(f"{CSV_FILE} geschreven.")
+    if args.van or args.tot or not (args.migreer or args.export):
+        for r in tussen(conn, args.van, args.tot):
+            print(f"{r['datum']} {r['dag']:<9} {r['workout'][:90]}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""Browserloze scrape-engine: HTTP-sessie met cookie jar + HTML-parser.
+
+De roosterpagina's zijn server-rendered, dus voor het LEZEN is geen Chromium
+nodig. Levert dezelfde snapshots als bink_auto.laad_rooster_snapshots (en dus
+dezelfde les-dicts als extract_les). Kan deze engine een pagina niet lezen,
+dan gooit hij ParseFout en valt bink_auto terug op Playwright.
+
+Alleen standaardbibliotheek (urllib + html.parser): geen extra installs in
+de workflows. Lokaal testen: `python bink_mock.py` en BINK_BASE_URL zetten."""
+import http.cookiejar
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+
+import bink_metrics as metrics
+from bink_rooster import (
+    INGESCHREVEN_CLASSES, LOGIN_URL, WEKEN, WOD_URL, ZALEN, kies_eigen_les, lege_status, lessen_per_dag,
+    modal_gegevens, rooster_url, vul_status_aan,
+)
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/124.0 Safari/537.36")
+TIMEOUT = 45
+
+# Verkeer van deze run (alle sessies samen), ter vergelijking met de browser.
+HTTP_VERKEER = {"requests": 0, "bytes": 0}
+
+# Elementen zonder sluit-tag en elementen die in innerText een regel afbreken.
+VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link",
+        "meta", "param", "source", "track", "wbr"}
+BLOK = {"address", "article", "aside", "blockquote", "dd", "div", "dl", "dt",
+        "fieldset", "figcaption", "figure", "footer", "form", "h1", "h2", "h3",
+        "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre",
+        "section", "table", "tr", "ul"}
+ONZICHTBAAR = {"script", "style", "template", "noscript", "head", "title"}
+
+
+class ParseFout(Exception):
+    """Het HTTP-pad kan de pagina niet (betrouwbaar) lezen -> Playwright-terugval."""
+
+
+class Element:
+    __slots__ = ("tag", "attrs", "kinderen", "ouder")
+
+    def __init__(self, tag, attrs, ouder=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.kinderen = []
+        self.ouder = ouder
+
+    def get(self, naam, default=None):
+        return self.attrs.get(naam, default)
+
+    def classes(self):
+        return (self.attrs.get("class") or "").split()
+
+    def iter(self):
+        """Alle afstammelingen (elementen) in documentvolgorde."""
+        for kind in self.kinderen:
+            if isinstance(kind, Element):
+                yield kind
+                yield from kind.iter()
+
+    def zoek_alle(self, pred):
+        return [el for el in self.iter() if pred(el)]
+
+    def zoek(self, pred):
+        return next((el for el in self.iter() if pred(el)), None)
+
+    def tekst(self):
+        """Benadering van innerText: blokken worden regels (<p> met een lege regel
+        ertussen, zoals de browser), <br> breekt af, witruimte binnen een regel
+        klapt in tot 1 spatie."""
+        delen = []
+        self._tekst(delen)
+        # Opeenvolgende blokgrenzen (ints) tellen niet op: de grootste wint.
+        uit, breuk = [], 0
+        for deel in delen:
+            if isinstance(deel, int):
+                breuk = max(breuk, deel)
+                continue
+            if not deel.strip() and (breuk or not uit):
+                continue  # witruimte tussen blokken telt niet mee
+            if breuk and uit:
+                uit.append("\n" * breuk)
+            breuk = 0
+            uit.append(deel)
+        regels = [" ".join(r.split()) for r in "".join(uit).split("\n")]
+        while regels and not regels[0]:
+            regels.pop(0)
+        while regels and not regels[-1]:
+            regels.pop()
+        return "\n".join(regels)
+
+    def _tekst(self, delen):
+        if self.tag in ONZICHTBAAR:
+            return
+        if self.tag == "br":
+            delen.append("\n")
+            return
+        breuk = 2 if self.tag == "p" else 1 if self.tag in BLOK else 0
+        if breuk:
+            delen.append(breuk)
+        for kind in self.kinderen:
+            if isinstance(kind, Element):
+                kind._tekst(delen)
+            else:
+                delen.append(kind.replace("\n", " "))
+        if breuk:
+            delen.append(breuk)
+
+
+def heeft_class(naam):
+    return lambda el: naam in el.classes()
+
+
+class _DomBouwer(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Element("#document", {})
+        self.stapel = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        huidig = self.stapel[-1]
+        # Impliciet sluiten van <li>/<p>/<option> als dezelfde tag opnieuw begint.
+        if tag in ("li", "p", "option") and huidig.tag == tag:
+            self.stapel.pop()
+            huidig = self.stapel[-1]
+        el = Element(tag, {k: (v or "") for k, v in attrs}, huidig)
+        huidig.kinderen.append(el)
+        if tag not in VOID:
+            self.stapel.append(el)
+
+    def handle_startendtag(self, tag, attrs):
+        huidig = self.stapel[-1]
+        huidig.kinderen.append(Element(tag, {k: (v or "") for k, v in attrs}, huidig))
+
+    def handle_endtag(self, tag):
+        # Sluit tot en met de dichtstbijzijnde open tag met deze naam; losse
+        # sluit-tags (kapotte HTML) negeren we.
+        for i in range(len(self.stapel) - 1, 0, -1):
+            if self.stapel[i].tag == tag:
+                del self.stapel[i:]
+                return
+
+    def handle_data(self, data):
+        self.stapel[-1].kinderen.append(data)
+
+
+def parse_html(html):
+    bouwer = _DomBouwer()
+    bouwer.feed(html)
+    bouwer.close()
+    return bouwer.root
+
+
+# --- Pagina-specifieke uitlezers ---------------------------------------------
+
+def les_records(dom):
+    """Zelfde records als bink_auto.LES_RECORDS_JS, uit de geparste HTML."""
+    records = []
+    for li in dom.zoek_alle(lambda el: el.tag == "li" and "data-remodal-target" in el.attrs):
+        def tekst(cls):
+            el = li.zoek(heeft_class(cls))
+            return el.tekst().strip() if el is not None else None
+        records.append({
+            "target": li.get("data-remodal-target") or "",
+            "tijd": tekst("event-date"),
+            "type": tekst("event-name"),
+            "deelnemers": tekst("event-registrations") or "",
+            "class": li.get("class") or "",
+        })
+    return records
+
+
+def modal_van(dom, target):
+    """De (verborgen) remodal-div die bij een les hoort, of None."""
+    return dom.zoek(lambda el: el.get("data-remodal-id") == target)
+
+
+def status_uit_dom(dom, records, dag_en):
+    """Persoonlijke status voor dag_en. Deelnemers/wachtlijst komen uit de
+    modal-div als die server-side in de pagina staat, anders uit het blokje."""
+    status = lege_status()
+    gevonden = kies_eigen_les(records, dag_en)
+    if not gevonden:
+        return status
+    _, record, wachtlijst = gevonden
+    status["ingeschreven"] = True
+    status["wachtlijst"] = wachtlijst
+    status["tijd"] = record.get("tijd") or ""
+    status["type"] = record.get("type") or ""
+
+    modal = modal_van(dom, record.get("target"))
+    if modal is not None:
+        grid = modal.zoek(heeft_class("grid")) or modal
+        cols = [c.tekst() for c in grid.zoek_alle(heeft_class("col"))]
+        vul_status_aan(status, modal_gegevens(cols))
+    if not status["deelnemers"]:
+        status["deelnemers"] = record.get("deelnemers") or ""
+    return status
+
+
+def wod_ruwe_tekst(dom):
+    """Zelfde keuze als het Playwright-pad: de hele .wod-card, anders de ouder
+    van het eerste .wod-list. None als geen van beide er is."""
+    kaart = dom.zoek(heeft_class("wod-card"))
+    if kaart is not None:
+        return kaart.tekst()
+    lijst = dom.zoek(heeft_class("wod-list"))
+    if lijst is not None:
+        return (lijst.ouder or lijst).tekst()
+    return None
+
+
+def login_formulier(dom):
+    """Het formulier met een wachtwoordveld (input[name*='pass'])."""
+    for form in dom.zoek_alle(lambda el: el.tag == "form"):
+        if form.zoek(lambda el: el.tag == "input" and "pass" in (el.get("name") or "")):
+            return form
+    return None
+
+
+def heeft_uitlog_link(html):
+    return "uitloggen" in html.lower()
+
+
+def is_ingelogd(html):
+    """Ingelogd als er een uitlog-link staat of (op de loginpagina) geen
+    loginformulier meer wordt getoond."""
+    return heeft_uitlog_link(html) or login_formulier(parse_html(html)) is None
+
+
+def formulier_velden(form):
+    """Naam -> waarde van alle invoervelden (zoals de browser ze zou posten,
+    zonder submit-knoppen)."""
+    velden = {}
+    for el in form.iter():
+        naam = el.get("name")
+        if not naam:
+            continue
+        if el.tag == "input":
+            soort = (el.get("type") or "text").lower()
+            if soort in ("submit", "button", "image", "reset"):
+                continue
+            if soort in ("checkbox", "radio") and "checked" not in el.attrs:
+                continue
+            velden[naam] = el.get("value") or ""
+        elif el.tag in ("textarea", "select"):
+            velden[naam] = el.tekst() if el.tag == "textarea" else ""
+    return velden
+
+
+# --- In-/uitschrijven via het formulier in de modal ----------------------------
+
+# Knoplabels per actie, in voorkeursvolgorde (zoals de UI-klik in bink_enroll:
+# bij inschrijven eerst een gewone plek, anders de wachtlijst).
+ACTIE_KNOPPEN = {
+    "inschrijven": ("inschrijven", "wachtlijst"),
+    "uitschrijven": ("uitschrijven", "afmelden"),
+}
+
+
+def _knop_label(el):
+    if el.tag == "input" and (el.get("type") or "").lower() in ("submit", "button"):
+        return (el.get("value") or "").lower()
+    if el.tag == "button":
+        return el.tekst().lower()
+    return None
+
+
+def zoek_les(records, dag_en, tijd):
+    """Het eerste record van dag_en waarvan de tijd 'tijd' bevat (zoals bink_enroll zoekt)."""
+    return next((r for r in records
+                 if dag_en in (r.get("target") or "") and tijd in (r.get("tijd") or "")), None)
+
+
+def actie_formulier(dom, target, actie, basis_url):
+    """Het formulier in de modal van deze les dat bij de actie hoort, klaar om
+    te posten: (action-url, velden incl. de knop zelf, knoplabel) of None als
+    er geen (of alleen een uitgeschakelde) knop is of het geen POST-formulier is."""
+    modal = modal_van(dom, target)
+    if modal is None:
+        return None
+    formulieren = modal.zoek_alle(lambda el: el.tag == "form")
+    for label in ACTIE_KNOPPEN.get(actie, ()):
+        for form in formulieren:
+            if (form.get("method") or "get").lower() != "post":
+                continue
+            for knop in form.iter():
+                tekst = _knop_label(knop)
+                if not tekst or label not in tekst or "disabled" in knop.attrs:
+                    continue
+                if label == "inschrijven" and "uitschrijven" in tekst:
+                    continue
+                velden = formulier_velden(form)
+                if knop.get("name"):
+                    velden[knop.get("name")] = knop.get("value") or ""
+                return urllib.parse.urljoin(basis_url, form.get("action") or basis_url), velden, tekst
+    return None
+
+
+def les_class(dom, target):
+    """Class van het les-blokje met dit data-remodal-target, of None als het
+    blokje niet in de pagina staat (bv. een response zonder rooster)."""
+    li = dom.zoek(lambda el: el.tag == "li" and el.get("data-remodal-target") == target)
+    return None if li is None else (li.get("class") or "")
+
+
+def is_ingeschreven_class(cls):
+    cls = (cls or "").lower()
+    return any(k in cls for k in INGESCHREVEN_CLASSES)
+
+
+# --- Sessie -------------------------------------------------------------------
+
+class HttpSessie:
+    """urllib-opener met een gedeelde cookie jar (= de ingelogde sessie)."""
+
+    def __init__(self, cookie_jar=None):
+        self.cookies = cookie_jar if cookie_jar is not None else http.cookiejar.CookieJar()
+        self.opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(self.cookies))
+        self.opener.addheaders = [("User-Agent", USER_AGENT), ("Accept-Language", "nl-NL,nl;q=0.9")]
+        self.navigaties = 0
+
+    def _open(self, url, data=None):
+        self.navigaties += 1
+        metrics.tel("navigaties")
+        with self.opener.open(url, data=data, timeout=TIMEOUT) as resp:
+            charset = resp.headers.get_content_charset() or "utf-8"
+            body = resp.read()
+        HTTP_VERKEER["requests"] += 1
+        HTTP_VERKEER["bytes"] += len(body) + len(data or b"")
+        return resp.geturl(), body.decode(charset, errors="replace")
+
+    def get(self, url):
+        """(uiteindelijke url na redirects, html)"""
+        return self._open(url)
+
+    def post(self, url, velden):
+        return self._open(url, urllib.parse.urlencode(velden).encode("utf-8"))
+
+    def is_ingelogd(self):
+        """Goedkope geldigheidscheck: 1 GET van de loginpagina, zonder rooster."""
+        _, html = self.get(LOGIN_URL)
+        return is_ingelogd(html)
+
+    def login(self, email, password):
+        """Post het ledenloginformulier (incl. verborgen velden zoals tokens)."""
+        if not email or not password:
+            raise Exception("Geen inloggegevens!")
+        url, html = self.get(LOGIN_URL)
+        form = login_formulier(parse_html(html))
+        if form is None:
+            raise ParseFout("Geen loginformulier gevonden")
+
+        velden = formulier_velden(form)
+        invoer = [el for el in form.iter() if el.tag == "input" and el.get("name")]
+        gebruiker = next((el for el in invoer if "user" in el.get("name") or "email" in el.get("name")), None)
+        wachtwoord = next(el for el in invoer if "pass" in el.get("name"))
+        if gebruiker is None:
+            raise ParseFout("Geen e-mailveld in het loginformulier")
+        velden[gebruiker.get("name")] = email
+        velden[wachtwoord.get("name")] = password
+        # Een submit-knop mét naam stuurt de browser ook mee.
+        knop = next((el for el in form.iter() if el.tag in ("button", "input")
+                     and (el.get("type") or "").lower() == "submit" and el.get("name")), None)
+        if knop is not None:
+            velden[knop.get("name")] = knop.get("value") or ""
+        actie = urllib.parse.urljoin(url, form.get("action") or url)
+
+        _, html = self.post(actie, velden)
+        if not is_ingelogd(html):
+            raise ParseFout("Na het posten staat het loginformulier er nog (login niet gelukt?)")
+
+
+def _laad_snapshot(sessie, zaal_naam, week, status_dagen):
+    with metrics.span(f"rooster:{zaal_naam}/{week}"):
+        _, html = sessie.get(rooster_url(zaal_naam, week))
+        # Het rooster is ook uitgelogd leesbaar, maar dan zonder je eigen status:
+        # zonder uitlog-link niets schrijven (bink_auto logt opnieuw in of valt terug).
+        if not heeft_uitlog_link(html):
+            raise ParseFout(f"Rooster {zaal_naam}/{week} zonder uitlog-link (sessie verlopen?)")
+        dom = parse_html(html)
+        records = les_records(dom)
+    return {
+        "zaal": zaal_naam,
+        "week": week,
+        "lessen": lessen_per_dag(records, zaal_naam),
+        "status": {dag_en: status_uit_dom(dom, records, dag_en) for dag_en in status_dagen},
+        "aantal": len(records),
+    }
+
+
+def _haal_wod(sessie):
+    with metrics.span("wod"):
+        return sessie.get(WOD_URL)
+
+
+def scrape_http(sessie, status_dagen, max_parallel=3):
+    """WOD + alle (zaal, week)-roosters via een ingelogde HttpSessie
+    (zie bink_sessie.http_sessie). Retourneert (ruwe_wod_tekst of None,
+    snapshots) of gooit ParseFout."""
+    taken = [(zaal_naam, week) for week in WEKEN for zaal_naam in ZALEN]
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as pool:
+        wod = pool.submit(_haal_wod, sessie)
+        futures = [pool.submit(_laad_snapshot, sessie, z, w, status_dagen.get(w, ())) for z, w in taken]
+        snapshots = {taak: f.result() for taak, f in zip(taken, futures)}
+        _, wod_html = wod.result()
+
+    # Nergens een les-blokje: vrijwel zeker door JavaScript gerenderd of een
+    # ander paginaformaat -> laat Playwright het proberen.
+    aantal = sum(s.pop("aantal") for s in snapshots.values())
+    if not aantal:
+        raise ParseFout("Geen enkel les-blokje gevonden in de roosterpagina's")
+
+    return wod_ruwe_tekst(parse_html(wod_html)), snapshots
@@ -1,9 +1,13 @@
 import asyncio
 import os
 import time
-import urllib.request
-import urllib.parse
 from playwright.async_api import async_playwright
+from bink_browser import maak_context, nieuwe_pagina, start_browser, verkeer_rapport
+from bink_rooster import BASE_URL, INGESCHREVEN_CLASSES, LOGIN_URL
+from bink_sessie import zorg_voor_login
+from bink_telegram import stuur_telegram, verstuur_spool
+import bink_metrics as metrics
+import bink_wacht as wacht
 from datetime import datetime
 
 # 1. Tijdzone instellen op Amsterdam
@@ -16,24 +20,191 @@ except:
 # Gegevens ophalen
 EMAIL = os.environ.get("BINK_EMAIL")
 PASSWORD = os.environ.get("BINK_PASSWORD")
-TG_TOKEN = os.environ.get("TELEGRAM_TOKEN")
-TG_CHAT_ID = os.environ.get("TELEGRAM_CHAT_ID")
 
-# --- TELEGRAM FUNCTIE ---
-def stuur_telegram(bericht):
-    if not TG_TOKEN or not TG_CHAT_ID:
-        print("⚠️ Geen Telegram gegevens, bericht niet verstuurd.")
+ROOSTER_URL = f"{BASE_URL}/rooster?week=next&hall=Zaal-2"
+# (data-remodal-target-deel, beschrijving) van de lessen waarvoor we inschrijven.
+DOELEN = [
+    ("tuesday-Oly Lifting-18:30", "Dinsdag OLY (18:30)"),
+    ("saturday-Oly Lifting-11:15", "Zaterdag OLY (11:15)"),
+]
+# Sniper-modus: het moment waarop de inschrijving opent, bv. BINK_OPENING="05:00"
+# (vandaag, lokale tijd) of "2026-03-01T05:00:00". Leeg = gewone modus.
+OPENING = os.environ.get("BINK_OPENING", "").strip()
+
+async def login(page):
+    # '/login' is een 404; de echte loginpagina is '/inloggen-voor-leden'.
+    metrics.tel("navigaties")
+    await page.goto(LOGIN_URL, wait_until="domcontentloaded")
+
+    if not EMAIL or not PASSWORD:
+        raise Exception("Geen inloggegevens!")
+
+    await page.wait_for_selector("input[name*='user'], input[name*='email']", timeout=25000)
+    await page.locator("input[name*='user'], input[name*='email']").first.fill(EMAIL)
+    await page.locator("input[name*='pass']").first.fill(PASSWORD)
+    await wacht.na_klik(page, page.locator("button[type='submit'], input[type='submit']").first.click, "login")
+
+def popup_knoppen(popup):
+    """(inschrijven, wachtlijst, uitschrijven)-locators in een geopende pop-up."""
+    return (
+        popup.locator("input[value='INSCHRIJVEN'], button:has-text('Inschrijven')"),
+        # Op basis van de broncode: vaak 'WACHTLIJST' of 'AANMELDEN WACHTLIJST'.
+        popup.locator("input[value*='WACHTLIJST'], input[value*='Wachtlijst'], button:has-text('Wachtlijst')"),
+        popup.locator("input[value='UITSCHRIJVEN']"),
+    )
+
+async def klik_beste_knop(page, popup):
+    """Klikt inschrijven, anders wachtlijst. Retourneert 'ingeschreven',
+    'wachtlijst', 'al' (reeds ingeschreven) of 'geen'."""
+    inschrijf_knop, wachtlijst_knop, uitschrijf_knop = popup_knoppen(popup)
+    if await inschrijf_knop.count() > 0 and await inschrijf_knop.is_enabled():
+        await wacht.na_klik(page, inschrijf_knop.click, "actie")
+        return "ingeschreven"
+    if await wachtlijst_knop.count() > 0 and await wachtlijst_knop.is_enabled():
+        await wacht.na_klik(page, wachtlijst_knop.click, "actie")
+        return "wachtlijst"
+    if await uitschrijf_knop.count() > 0:
+        return "al"
+    return "geen"
+
+BERICHTEN = {
+    "ingeschreven": "✅ Ingeschreven",
+    "wachtlijst": "⏳ Op WACHTLIJST gezet",
+    "al": "ℹ️ Reeds ingeschreven",
+    "geen": "❌ Geen plek/wachtlijst",
+}
+
+# --- SNIPER-MODUS ---------------------------------------------------------------
+
+def opening_tijdstip(tekst, nu=None):
+    """BINK_OPENING -> epoch-seconden. 'HH:MM[:SS]' = vandaag, anders ISO."""
+    nu = nu or datetime.now()
+    if len(tekst) <= 8 and ":" in tekst:
+        delen = [int(x) for x in tekst.split(":")]
+        while len(delen) < 3:
+            delen.append(0)
+        return nu.replace(hour=delen[0], minute=delen[1], second=delen[2], microsecond=0).timestamp()
+    return datetime.fromisoformat(tekst).timestamp()
+
+async def wacht_tot(tijdstip):
+    """Wacht tot tijdstip (epoch) met ms-precisie: grof slapen tot vlak ervoor,
+    de laatste 30 ms actief. Retourneert hoeveel ms we te laat waren."""
+    while True:
+        rest = tijdstip - time.time()
+        if rest <= 0.03:
+            break
+        await asyncio.sleep(min(rest - 0.03, 30))
+    while time.time() < tijdstip:
+        pass
+    return (time.time() - tijdstip) * 1000
+
+async def open_popup(page, zoek_id):
+    """Klikt het les-blokje en wacht tot de pop-up open is. None als de les er niet is."""
+    les = page.locator(f"li[data-remodal-target*='{zoek_id}']").first
+    if await les.count() == 0:
+        return None, None
+    target = await les.get_attribute("data-remodal-target") or ""
+    with metrics.span("modal"):
+        await les.scroll_into_view_if_needed()
+        await les.click(force=True)
+        await wacht.modal_open(page, deadline_ms=10000)
+    return page.locator(".remodal-is-opened"), target
+
+async def open_rooster(page):
+    with metrics.span("rooster"):
+        metrics.tel("navigaties")
+        await page.goto(ROOSTER_URL, wait_until="domcontentloaded", timeout=45000)
+        try:
+            await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
+        except:
+            pass
+
+async def bereid_voor(context, zoek_id):
+    """Eigen pagina per les: rooster laden en de pop-up alvast openen."""
+    page = await nieuwe_pagina(context)
+    await open_rooster(page)
+    popup, target = await open_popup(page, zoek_id)
+    return page, popup, target
+
+async def snipe(page, popup, target, zoek_id, beschrijving):
+    """Op het openingsmoment: meteen klikken in de al open pop-up. Is de knop er
+    nog niet (pagina van vóór de opening), dan 1x vers laden en opnieuw.
+    Meet klik -> response en klik -> bevestiging (class van het blokje)."""
+    start = time.perf_counter()
+    soort = await klik_beste_knop(page, popup) if popup else "geen"
+    if soort == "geen":
+        metrics.tel("navigaties")
+        await page.reload(wait_until="domcontentloaded", timeout=45000)
+        popup, target = await open_popup(page, zoek_id)
+        if popup:
+            soort = await klik_beste_knop(page, popup)
+    response_ms = round((time.perf_counter() - start) * 1000)
+    metrics.registreer("snipe:response", response_ms, soort != "geen")
+
+    bevestigd_ms = None
+    if soort in ("ingeschreven", "wachtlijst") and target:
+        if await wacht.wacht_op_class(page, target, INGESCHREVEN_CLASSES, aanwezig=True):
+            bevestigd_ms = round((time.perf_counter() - start) * 1000)
+    return {"beschrijving": beschrijving, "soort": soort,
+            "response_ms": response_ms, "bevestigd_ms": bevestigd_ms}
+
+async def sniper(context, messages):
+    tijdstip = opening_tijdstip(OPENING)
+    print(f"🎯 Sniper-modus: opening om {datetime.fromtimestamp(tijdstip).strftime('%H:%M:%S')}.")
+
+    voorbereid = []
+    for zoek_id, beschrijving in DOELEN:
+        try:
+            page, popup, target = await bereid_voor(context, zoek_id)
+            if not popup:
+                messages.append(f"❌ Les niet gevonden: {beschrijving}")
+                continue
+            voorbereid.append((page, popup, target, zoek_id, beschrijving))
+        except Exception as e:
+            messages.append(f"❌ Fout bij voorbereiden {beschrijving}: {e}")
+    if not voorbereid:
         return
 
-    print(f"📨 Telegram: {bericht}")
-    url = f"https://api.telegram.org/bot{TG_TOKEN}/sendMessage"
-    data = urllib.parse.urlencode({"chat_id": TG_CHAT_ID, "text": bericht}).encode("utf-8")
-    
-    try:
-        req = urllib.request.Request(url, data=data)
-        urllib.request.urlopen(req)
-    except Exception as e:
-        print(f"❌ Telegram fout: {e}")
+    print(f"⏳ {len(voorbereid)} pop-up(s) klaar; wachten op de opening...")
+    te_laat_ms = await wacht_tot(tijdstip)
+    print(f"🔫 Vuur! ({te_laat_ms:.1f} ms na het openingsmoment)")
+    resultaten = await asyncio.gather(*(snipe(*v) for v in voorbereid), return_exceptions=True)
+
+    for v, res in zip(voorbereid, resultaten):
+        if isinstance(res, BaseException):
+            messages.append(f"❌ Fout bij {v[4]}: {res}")
+            continue
+        regel = f"{BERICHTEN[res['soort']]}: {res['beschrijving']}"
+        if res["soort"] in ("ingeschreven", "wachtlijst"):
+            regel += f" ({res['response_ms']} ms"
+            regel += f", bevestigd na {res['bevestigd_ms']} ms)" if res["bevestigd_ms"] is not None else ", niet bevestigd)"
+        messages.append(regel)
+        print(f"⏱️ {res}")
+
+async def sequentieel(page, messages):
+    """Gewone modus: de lessen één voor één, in dezelfde pagina."""
+    print(f"Naar rooster: {ROOSTER_URL}")
+    await open_rooster(page)
+
+    for zoek_id, beschrijving in DOELEN:
+        print(f"\n--- {beschrijving} ---")
+        try:
+            popup, _ = await open_popup(page, zoek_id)
+            if not popup:
+                messages.append(f"❌ Les niet gevonden: {beschrijving}")
+                print("❌ Niet gevonden in rooster")
+                continue
+
+            soort = await klik_beste_knop(page, popup)
+            messages.append(f"{BERICHTEN[soort]}: {beschrijving}")
+            print(BERICHTEN[soort])
+
+            # Pagina verversen om pop-up veilig te sluiten
+            metrics.tel("navigaties")
+            await page.reload(wait_until="domcontentloaded", timeout=45000)
+        except Exception as e:
+            messages.append(f"❌ Fout bij {beschrijving}: {str(e)}")
+            print(f"Error: {e}")
 
 async def sign_up():
     # --- TIJD CHECK ---
@@ -46,104 +217,34 @@ async def sign_up():
         return
 
     print(f"✅ Tijd is {nu.strftime('%H:%M')}. We gaan beginnen!")
+    metrics.reset()
+    verstuur_spool()
     
     messages = [] 
+    ok = False
 
     async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        context = await browser.new_context()
-        page = await context.new_page()
+        browser = await start_browser(p)
+        context = await maak_context(browser)
+        page = await nieuwe_pagina(context, timeout_ms=30000)  # Playwright-default
 
         try:
             print("Inloggen...")
-            # '/login' is een 404; de echte loginpagina is '/inloggen-voor-leden'.
-            await page.goto("https://www.crossfitbink36.nl/inloggen-voor-leden", wait_until="domcontentloaded")
-
-            if not EMAIL or not PASSWORD:
-                raise Exception("Geen inloggegevens!")
-
-            await page.wait_for_selector("input[name*='user'], input[name*='email']", timeout=25000)
-            await page.locator("input[name*='user'], input[name*='email']").first.fill(EMAIL)
-            await page.locator("input[name*='pass']").first.fill(PASSWORD)
-            await page.locator("button[type='submit'], input[type='submit']").first.click()
-            await page.wait_for_timeout(3000)
-
-            target_url = "https://www.crossfitbink36.nl/rooster?week=next&hall=Zaal-2"
-            print(f"Naar rooster: {target_url}")
-            await page.goto(target_url, wait_until="domcontentloaded", timeout=45000)
-            try:
-                await page.wait_for_selector("li[data-remodal-target]", timeout=10000)
-            except:
-                pass
-            
-            # --- INSCHRIJF FUNCTIE (NU MET WACHTLIJST) ---
-            async def schrijf_in(zoek_id, beschrijving):
-                print(f"\n--- {beschrijving} ---")
-                try:
-                    selector = f"li[data-remodal-target*='{zoek_id}']"
-                    
-                    # Check of de les bestaat
-                    if await page.locator(selector).count() > 0:
-                        knop = page.locator(selector).first
-                        await knop.scroll_into_view_if_needed()
-                        await knop.click(force=True)
-                        
-                        # Wacht op pop-up
-                        await page.wait_for_selector(".remodal-is-opened", timeout=10000)
-                        popup = page.locator(".remodal-is-opened")
-                        
-                        # Definieer de knoppen
-                        # 1. Normaal inschrijven
-                        inschrijf_knop = popup.locator("input[value='INSCHRIJVEN'], button:has-text('Inschrijven')")
-                        # 2. Wachtlijst (Op basis van je broncode: vaak 'WACHTLIJST' of 'AANMELDEN WACHTLIJST')
-                        wachtlijst_knop = popup.locator("input[value*='WACHTLIJST'], input[value*='Wachtlijst'], button:has-text('Wachtlijst')")
-                        # 3. Uitschrijven (reeds ingeschreven)
-                        uitschrijf_knop = popup.locator("input[value='UITSCHRIJVEN']")
-
-                        # --- LOGICA ---
-                        if await inschrijf_knop.count() > 0 and await inschrijf_knop.is_enabled():
-                            # Situatie A: Plek vrij!
-                            await inschrijf_knop.click()
-                            await page.wait_for_timeout(3000)
-                            messages.append(f"✅ Ingeschreven: {beschrijving}")
-                            print("✅ Gelukt!")
-
-                        elif await wachtlijst_knop.count() > 0 and await wachtlijst_knop.is_enabled():
-                            # Situatie B: Vol, maar wachtlijst open
-                            print("⚠️ Les is vol. Inschrijven op WACHTLIJST...")
-                            await wachtlijst_knop.click()
-                            await page.wait_for_timeout(3000)
-                            messages.append(f"⏳ Op WACHTLIJST gezet: {beschrijving}")
-                            print("✅ Op wachtlijst!")
-
-                        elif await uitschrijf_knop.count() > 0:
-                            # Situatie C: Al geregeld
-                            messages.append(f"ℹ️ Reeds ingeschreven: {beschrijving}")
-                            print("ℹ️ Was al ingeschreven")
-
-                        else:
-                            # Situatie D: Echt helemaal dicht
-                            messages.append(f"❌ Geen plek/wachtlijst: {beschrijving}")
-                            print("❌ Geen opties gevonden")
-                        
-                        # Pagina verversen om pop-up veilig te sluiten
-                        await page.reload(wait_until="domcontentloaded", timeout=45000)
-                        
-                    else:
-                        messages.append(f"❌ Les niet gevonden: {beschrijving}")
-                        print("❌ Niet gevonden in rooster")
-                        
-                except Exception as e:
-                    messages.append(f"❌ Fout bij {beschrijving}: {str(e)}")
-                    print(f"Error: {e}")
+            await zorg_voor_login(context, page, login)
 
             # --- UITVOEREN ---
-            await schrijf_in("tuesday-Oly Lifting-18:30", "Dinsdag OLY (18:30)")
-            await schrijf_in("saturday-Oly Lifting-11:15", "Zaterdag OLY (11:15)")
+            if OPENING:
+                await sniper(context, messages)
+            else:
+                await sequentieel(page, messages)
 
             # --- RAPPORTAGE ---
-            eind_bericht = "🏋️‍♂️ *Bink Update:*\n\n" + "\n".join(messages)
+            titel = "Bink Update (sniper)" if OPENING else "Bink Update"
+            eind_bericht = f"🏋️‍♂️ *{titel}:*\n\n" + "\n".join(messages)
             stuur_telegram(eind_bericht)
+            print(wacht.rapport())
+            print(verkeer_rapport())
+            ok = not any(m.startswith("❌") for m in messages)
 
         except Exception as e:
             # We melden de fout via Telegram, maar sluiten netjes af (exit 0) zodat
@@ -153,6 +254,7 @@ async def sign_up():
             print(f"CRITICAL: {e}")
         
         await browser.close()
+    metrics.schrijf_run("bink_inschrijven", ok, {"lessen": len(messages)})
 
 if __name__ == "__main__":
     asyncio.run(sign_up())
@@ -0,0 +1,215 @@
+"""Meetpunten per run: spans per fase, tellers, en een metrics-bestand.
+
+Als de scrape traag wordt of tegen de goto-timeouts van 45 s loopt, zijn losse
+prints ("Inloggen...") geen bewijs. Hier meten de scripts (bink_auto,
+bink_enroll, bink_inschrijven, bink_analyze) per fase:
+
+- span(naam): duur in ms + gelukt/mislukt (exception) van bv. 'login',
+  'rooster:Zaal 2/next', 'modal', 'schrijven:workout'. Mag ook om een await
+  heen en vanuit threads (het HTTP-pad laadt de roosters parallel).
+- tel(naam): tellers, bv. 'navigaties' en 'playwright' (API-calls).
+- De wachttijden van bink_wacht (METINGEN) gaan als 'wacht:<naam>' mee.
+
+schrijf_run() voegt per run 1 compacte regel toe aan METRICS_FILE (JSON
+Lines; per fase [aantal, totaal ms, max ms, mislukt]) en schrijft, als
+BINK_PROMETHEUS_FILE gezet is, ook een Prometheus-textfile (node_exporter
+textfile collector). Het bestand houdt de laatste MAX_REGELS runs.
+
+    python bink_metrics.py                      # p50/p95 per fase, laatste 50 runs
+    python bink_metrics.py --laatste 200 --script bink_auto"""
+import argparse
+import json
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import bink_wacht as wacht
+
+METRICS_FILE = os.environ.get("BINK_METRICS_FILE", "metrics.jsonl")
+PROMETHEUS_FILE = os.environ.get("BINK_PROMETHEUS_FILE")
+MAX_REGELS = 5000
+
+# (naam, duur_ms, gelukt) per span, in volgorde van afronden.
+SPANS = []
+TELLERS = {}
+_lock = threading.Lock()
+_start = time.perf_counter()
+
+
+def reset():
+    """Begin van een nieuwe run (ook per ronde in de daemon)."""
+    global _start
+    with _lock:
+        SPANS.clear()
+        TELLERS.clear()
+    wacht.METINGEN.clear()
+    _start = time.perf_counter()
+
+
+def registreer(naam, ms, gelukt=True):
+    with _lock:
+        SPANS.append((naam, round(ms), gelukt))
+
+
+@contextmanager
+def span(naam):
+    t0 = time.perf_counter()
+    gelukt = False
+    try:
+        yield
+        gelukt = True
+    finally:
+        registreer(naam, (time.perf_counter() - t0) * 1000, gelukt)
+
+
+def totaal_ms():
+    """ms sinds het begin van de run (reset)."""
+    return round((time.perf_counter() - _start) * 1000)
+
+
+def tel(naam, n=1):
+    with _lock:
+        TELLERS[naam] = TELLERS.get(naam, 0) + n
+
+
+def run_record(script, ok=True, tellers=None):
+    """De regel voor METRICS_FILE: {'t', 'script', 'ok', 'ms', 'fases': {naam:
+    [aantal, totaal_ms, max_ms, mislukt]}, 'tellers': {...}}."""
+    fases = {}
+    spans = list(SPANS) + [(f"wacht:{naam}", ms, gelukt) for naam, ms, gelukt in wacht.METINGEN]
+    for naam, ms, gelukt in spans:
+        f = fases.setdefault(naam, [0, 0, 0, 0])
+        f[0] += 1
+        f[1] += ms
+        f[2] = max(f[2], ms)
+        f[3] += 0 if gelukt else 1
+    alle_tellers = dict(TELLERS)
+    for naam, waarde in (tellers or {}).items():
+        if waarde:
+            alle_tellers[naam] = waarde
+    return {
+        "t": datetime.now().isoformat(timespec="seconds"),
+        "script": script,
+        "ok": bool(ok),
+        "ms": totaal_ms(),
+        "fases": fases,
+        "tellers": alle_tellers,
+    }
+
+
+def _prometheus(record):
+    label = f'script="{record["script"]}"'
+    regels = [
+        "# TYPE bink_run_ok gauge", f"bink_run_ok{{{label}}} {int(record['ok'])}",
+        "# TYPE bink_run_ms gauge", f"bink_run_ms{{{label}}} {record['ms']}",
+        "# TYPE bink_run_timestamp_seconds gauge", f"bink_run_timestamp_seconds{{{label}}} {int(time.time())}",
+        "# TYPE bink_fase_ms gauge", "# TYPE bink_fase_aantal gauge",
+    ]
+    for naam, (aantal, totaal, _, _) in sorted(record["fases"].items()):
+        fase = naam.replace("\\", "\\\\").replace('"', '\\"')
+        regels.append(f'bink_fase_ms{{{label},fase="{fase}"}} {totaal}')
+        regels.append(f'bink_fase_aantal{{{label},fase="{fase}"}} {aantal}')
+    regels.append("# TYPE bink_teller gauge")
+    for naam, waarde in sorted(record["tellers"].items()):
+        regels.append(f'bink_teller{{{label},teller="{naam}"}} {waarde}')
+    return "\n".join(regels) + "\n"
+
+
+def schrijf_run(script, ok=True, tellers=None, pad=None, prometheus_pad=None):
+    """Voegt het record van deze run toe aan METRICS_FILE (+ Prometheus-textfile
+    als die ingesteld is). Een fout hier mag de run nooit laten mislukken."""
+    record = run_record(script, ok, tellers)
+    pad = pad or METRICS_FILE
+    prometheus_pad = prometheus_pad or PROMETHEUS_FILE
+    try:
+        with open(pad, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        _kort_in(pad)
+        if prometheus_pad:
+            tmp = prometheus_pad + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(_prometheus(record))
+            os.replace(tmp, prometheus_pad)
+    except Exception as e:
+        print(f"Metrics niet opgeslagen: {e}")
+    return record
+
+
+def _kort_in(pad):
+    # Goedkope check eerst: pas inkorten als het bestand echt groot wordt.
+    if os.path.getsize(pad) < MAX_REGELS * 300:
+        return
+    with open(pad, encoding="utf-8") as f:
+        regels = f.readlines()
+    if len(regels) <= MAX_REGELS:
+        return
+    tmp = pad + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(regels[-MAX_REGELS:])
+    os.replace(tmp, pad)
+
+
+def lees_runs(pad=None, script=None, laatste=50):
+    runs = []
+    try:
+        with open(pad or METRICS_FILE, encoding="utf-8") as f:
+            for regel in f:
+                try:
+                    run = json.loads(regel)
+                except ValueError:
+                    continue
+                if script is None or run.get("script") == script:
+                    runs.append(run)
+    except FileNotFoundError:
+        pass
+    return runs[-laatste:]
+
+
+def percentiel(waarden, p):
+    """Nearest-rank percentiel (p in 0..100) van een niet-lege lijst."""
+    waarden = sorted(waarden)
+    return waarden[max(1, math.ceil(p / 100 * len(waarden))) - 1]
+
+
+def rapport(runs):
+    """Regels met per script en per fase p50/p95/max (ms per run) en tellers."""
+    regels = []
+    for script in sorted({run["script"] for run in runs}):
+        van = [run for run in runs if run["script"] == script]
+        mislukt = sum(1 for run in van if not run.get("ok"))
+        totalen = [run["ms"] for run in van]
+        regels.append(f"📊 {script}: {len(van)} runs ({mislukt} mislukt), totaal "
+                      f"p50 {percentiel(totalen, 50)}ms p95 {percentiel(totalen, 95)}ms")
+        per_fase = {}
+        for run in van:
+            for naam, (aantal, totaal, _, fout) in run.get("fases", {}).items():
+                per_fase.setdefault(naam, []).append((totaal, aantal, fout))
+        for naam in sorted(per_fase, key=lambda n: -percentiel([t for t, _, _ in per_fase[n]], 95)):
+            tijden = [t for t, _, _ in per_fase[naam]]
+            fouten = sum(f for _, _, f in per_fase[naam])
+            regels.append(f"   {naam:<28} p50 {percentiel(tijden, 50):>6}ms  p95 {percentiel(tijden, 95):>6}ms  "
+                          f"max {max(tijden):>6}ms  ({len(tijden)} runs{f', {fouten} mislukt' if fouten else ''})")
+        tellers = {}
+        for run in van:
+            for naam, waarde in run.get("tellers", {}).items():
+                tellers.setdefault(naam, []).append(waarde)
+        if tellers:
+            regels.append("   tellers (p50/max per run): " + ", ".join(
+                f"{naam} {percentiel(w, 50)}/{max(w)}" for naam, w in sorted(tellers.items())))
+    return regels or ["Nog geen metrics."]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="p50/p95 per fase over de laatste runs")
+    parser.add_argument("--laatste", type=int, default=50, metavar="N")
+    parser.add_argument("--script")
+    parser.add_argument("--bestand", default=METRICS_FILE)
+    args = parser.parse_args()
+    print("\n".join(rapport(lees_runs(args.bestand, args.script, args.laatste))))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Lokale nep-versie van crossfitbink36.nl om de scrapers zonder internet te testen.
+
+Gebruik:
+    python bink_mock.py                      # synthetisch rooster op :8036
+    python bink_mock.py --map tests/fixtures # opgeslagen HTML serveren
+    python bink_mock.py --vertraging 2       # elke pagina 2 s traag
+    python bink_mock.py --sessie-duur 60     # login verloopt na 60 s
+    python bink_mock.py --telegram-429 3     # Telegram-stub: elk 3e bericht een 429
+
+en dan bv.:
+    BINK_BASE_URL=http://127.0.0.1:8036 BINK_EMAIL=a@b.nl BINK_PASSWORD=x python bink_auto.py
+
+Met --map worden (indien aanwezig) deze bestanden geserveerd:
+    login.html, wod.html, rooster-<zaal>-<week>.html (bv. 'rooster-Zaal 2-next.html')
+Ontbreekt een bestand, dan komt er een gegenereerde pagina. In-/uitschrijven
+(POST van het formulier in de modal) wordt onthouden zolang de mock draait.
+Met TELEGRAM_API_URL=http://127.0.0.1:8036 gaan Telegram-berichten naar de
+stub op /bot<token>/sendMessage en /editMessageText (zie bink_telegram.py)."""
+import argparse
+import json
+import os
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DAGEN = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+SESSIE_COOKIE = "bink_mock_sessie"
+
+LOGIN_HTML = """<html><body><form method="post" action="/inloggen-voor-leden">
+<input type="hidden" name="token" value="mock-token">
+<input type="email" name="useremail"><input type="password" name="userpassword">
+<button type="submit">Inloggen</button></form></body></html>"""
+
+WOD_HTML = """<html><body><div class="wod-card"><h3>WOD</h3>
+<div><p>Strength:</p><p>12min to find 1rm squat snatch</p></div>
+<div class="wod-list"><p>WOD:</p><p>5 rounds<br>200m run<br>max rope climbs</p></div>
+<a>Share this Workout</a></div></body></html>"""
+
+
+def synthetisch_rooster_html(lessen_per_dag_aantal=15, zaal="Zaal 1", week="current", inschrijvingen=None):
+    """Roosterpagina met dezelfde opbouw als de echte: li[data-remodal-target]
+    met .event-date/.event-name/.event-registrations en een remodal-div per les
+    (met het in-/uitschrijfformulier). inschrijvingen = {target: bool} uit
+    eerdere POSTs, gaat voor de vaste in-/uitschrijvingen."""
+    inschrijvingen = inschrijvingen or {}
+    blokjes, modals = [], []
+    zaal_nr = {"Zaal 1": 0, "Zaal 2": 1, "Buiten": 2}.get(zaal, 0)
+    for d, dag in enumerate(DAGEN):
+        for i in range(lessen_per_dag_aantal):
+            uur = 6 + i
+            tijd = f"{uur:02d}:{15 * zaal_nr:02d} - {uur + 1:02d}:{15 * zaal_nr:02d}"
+            soort = ["WOD", "OLY LIFTING", "OPENGYM"][(i + zaal_nr) % 3]
+            cls = ["workout"]
+            if (i + d) % 4 == 0:
+                cls.append("workout-full")
+            # Per week 1 inschrijving en 1 wachtlijstplek, verspreid over zalen.
+            if week == "current" and zaal_nr == 0 and d in (0, 2) and i == 5:
+                cls.append("workout-signedup")
+            if zaal_nr == 1 and d == 1 and i == 12:
+                cls.append("on-waiting-list")
+            target = f"{dag}-{soort}-{uur:02d}:{15 * zaal_nr:02d}"
+            if target in inschrijvingen:
+                cls = [c for c in cls if c not in ("workout-signedup", "on-waiting-list")]
+                if inschrijvingen[target]:
+                    cls.append("on-waiting-list" if "workout-full" in cls else "workout-signedup")
+            aanmeldingen = f"{16 if 'workout-full' in cls else i}/16"
+            blokjes.append(
+                f'<li class="{" ".join(cls)}" data-remodal-target="{target}">'
+                f'<span class="event-date">{tijd}</span>'
+                f'<span class="event-name">{soort}</span>'
+                f'<span class="event-registrations">{aanmeldingen}</span></li>'
+            )
+            wachtlijst = ""
+            if "on-waiting-list" in cls:
+                wachtlijst = ('<div class="col">Positie op wachtlijst</div><div class="col">2</div>'
+                              '<div class="col">Wachtlijst:</div><div class="col">3</div>')
+            if "workout-signedup" in cls or "on-waiting-list" in cls:
+                actie, knop = "uitschrijven", "UITSCHRIJVEN"
+            else:
+                actie, knop = "inschrijven", "WACHTLIJST" if "workout-full" in cls else "INSCHRIJVEN"
+            formulier = (f'<form method="post" action="/rooster?hall={urllib.parse.quote(zaal)}&amp;week={week}">'
+                         f'<input type="hidden" name="les" value="{target}">'
+                         f'<input type="hidden" name="actie" value="{actie}">'
+                         f'<input type="submit" name="knop" value="{knop}"></form>')
+            modals.append(
+                f'<div class="remodal" data-remodal-id="{target}"><div class="grid">'
+                f'<div class="col">Aanmeldingen</div><div class="col">{aanmeldingen}</div>'
+                f'{wachtlijst}</div>{formulier}</div>'
+            )
+    return f"<html><body><a href=\"/uitloggen\">Uitloggen</a><ul class=\"rooster\">{''.join(blokjes)}</ul>{''.join(modals)}</body></html>"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    fixture_map = None
+    vertraging = 0.0
+    sessie_duur = 0  # seconden; 0 = sessie verloopt nooit
+    inschrijvingen = {}  # target -> ingeschreven (na een POST op /rooster)
+    telegram_429 = 0     # elk N-de Telegram-bericht krijgt een 429 (0 = nooit)
+    telegram_berichten = []
+
+    def log_message(self, fmt, *args):
+        print(f"[mock] {self.command} {self.path} -> {fmt % args}")
+
+    def _fixture(self, naam):
+        if not self.fixture_map:
+            return None
+        pad = os.path.join(self.fixture_map, naam)
+        if os.path.exists(pad):
+            with open(pad, encoding="utf-8") as f:
+                return f.read()
+        return None
+
+    def _ingelogd(self):
+        for deel in (self.headers.get("Cookie") or "").split(";"):
+            naam, _, waarde = deel.strip().partition("=")
+            if naam == SESSIE_COOKIE:
+                if not self.sessie_duur:
+                    return True
+                try:
+                    return time.time() - float(waarde) < self.sessie_duur
+                except ValueError:
+                    return False
+        return False
+
+    def _stuur(self, html, status=200, headers=None):
+        body = html.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.vertraging:
+            time.sleep(self.vertraging)
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+
+        if url.path.startswith("/inloggen-voor-leden"):
+            if self._ingelogd():
+                return self._stuur('<html><body><a href="/uitloggen">Uitloggen</a></body></html>')
+            return self._stuur(self._fixture("login.html") or LOGIN_HTML)
+        if url.path.startswith("/rooster"):
+            if not self._ingelogd():
+                return self._stuur(self._fixture("login.html") or LOGIN_HTML)
+            zaal = query.get("hall", ["Zaal 1"])[0]
+            week = query.get("week", ["current"])[0]
+            html = self._fixture(f"rooster-{zaal}-{week}.html") or synthetisch_rooster_html(
+                zaal=zaal, week=week, inschrijvingen=self.inschrijvingen)
+            return self._stuur(html)
+        if url.path == "/" and query.get("workout"):
+            return self._stuur(self._fixture("wod.html") or WOD_HTML)
+        if url.path == "/":
+            return self._stuur("<html><body>Bink mock</body></html>")
+        self._stuur("<html><body>404</body></html>", status=404)
+
+    def _json(self, data, status=200, headers=None):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _telegram(self, methode, velden):
+        """Stub van de Bot API sendMessage/editMessageText
+        (TELEGRAM_API_URL=http://127.0.0.1:8036)."""
+        pogingen = len(self.telegram_berichten) + 1
+        tekst = velden.get("text", [""])[0]
+        self.telegram_berichten.append(tekst)
+        if self.telegram_429 and pogingen % self.telegram_429 == 0:
+            return self._json({"ok": False, "error_code": 429, "description": "Too Many Requests: retry after 1",
+                               "parameters": {"retry_after": 1}}, status=429)
+        if methode == "editMessageText":
+            message_id = int(velden.get("message_id", ["0"])[0])
+            print(f"[mock] Telegram bewerkt #{message_id}: {tekst!r}")
+        else:
+            message_id = pogingen
+            print(f"[mock] Telegram -> {velden.get('chat_id', ['?'])[0]} #{message_id}: {tekst!r}")
+        self._json({"ok": True, "result": {"message_id": message_id, "text": tekst}})
+
+    def do_POST(self):
+        lengte = int(self.headers.get("Content-Length") or 0)
+        velden = urllib.parse.parse_qs(self.rfile.read(lengte).decode("utf-8"))
+        url = urllib.parse.urlparse(self.path)
+
+        if url.path.startswith("/bot") and url.path.rsplit("/", 1)[-1] in ("sendMessage", "editMessageText"):
+            return self._telegram(url.path.rsplit("/", 1)[-1], velden)
+
+        if url.path.startswith("/inloggen-voor-leden"):
+            if velden.get("useremail") and velden.get("userpassword"):
+                self.send_response(303)
+                self.send_header("Set-Cookie", f"{SESSIE_COOKIE}={time.time():.0f}; Path=/")
+                self.send_header("Location", "/")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            return self._stuur(self._fixture("login.html") or LOGIN_HTML)
+        if url.path.startswith("/rooster"):
+            # In-/uitschrijven: zoals de echte site terug naar het rooster (303).
+            if not self._ingelogd():
+                return self._stuur(self._fixture("login.html") or LOGIN_HTML)
+            les = (velden.get("les") or [""])[0]
+            actie = (velden.get("actie") or [""])[0]
+            if not les or actie not in ("inschrijven", "uitschrijven"):
+                return self._stuur("<html><body>Ongeldige actie</body></html>", status=400)
+            self.inschrijvingen[les] = actie == "inschrijven"
+            self.send_response(303)
+            self.send_header("Location", self.path)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._stuur("<html><body>404</body></html>", status=404)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokale mock van crossfitbink36.nl")
+    parser.add_argument("--poort", type=int, default=8036)
+    parser.add_argument("--map", help="map met opgeslagen HTML-fixtures")
+    parser.add_argument("--vertraging", type=float, default=0.0, help="seconden per GET")
+    parser.add_argument("--sessie-duur", type=float, default=0, help="sessie verloopt na N seconden")
+    parser.add_argument("--telegram-429", type=int, default=0, metavar="N",
+                        help="Telegram-stub: elk N-de bericht krijgt een 429")
+    args = parser.parse_args()
+
+    MockHandler.fixture_map = args.map
+    MockHandler.vertraging = args.vertraging
+    MockHandler.sessie_duur = args.sessie_duur
+    MockHandler.telegram_429 = args.telegram_429
+    server = ThreadingHTTPServer(("127.0.0.1", args.poort), MockHandler)
+    print(f"Mock draait op http://127.0.0.1:{args.poort} (Ctrl+C om te stoppen)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
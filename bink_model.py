@@ -0,0 +1,325 @@
+"""Gedeeld model voor roosterdata: lessen, dagen en je persoonlijke status.
+
+In workout.json reizen lessen als losse dicts met vrije tekst ("09:15 - 10:15",
+"16/16", "Jij bent Ingeschreven") die elk script zelf weer uitpluisde. Hier
+wordt dat 1 keer geparsed, bij de scrape (rooster_uit_snapshots) of bij het
+inlezen van workout.json (rooster_uit_workout):
+
+- Les: start/eind als datetime, aangemeld/capaciteit als int, status als
+  LesStatus, zaal en type geïnterneerd (sys.intern: 1 string per naam). De
+  ruwe tijd-/deelnemerstekst van de site blijft erbij; een les waarvan de
+  tijd niet te lezen is houdt start None, maar valt er niet uit.
+- Dag: datum, week en de lessen van die dag over alle zalen.
+- Status: je eigen in-/uitschrijving op een dag (status_vandaag/_morgen).
+- naar_dict()/uit_dict() zetten om van/naar exact de bestaande JSON-vorm.
+
+Alle klassen zijn dataclasses met __slots__ (klein en snel bij honderden
+lessen per scrape; vereist Python 3.10+)."""
+import re
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Optional
+
+from bink_rooster import DAGEN_EN, DAGEN_NL, ZALEN, status_uit_class, status_van_dag
+
+_TIJD = re.compile(r"(\d{1,2}):(\d{2})(?:\s*-\s*(\d{1,2}):(\d{2}))?")
+_DEELNEMERS = re.compile(r"(\d+)\s*/\s*(\d+)")
+
+
+class LesStatus(Enum):
+    OPEN = "Open"
+    VOL = "Vol (Wachtlijst)"
+    INGESCHREVEN = "Jij bent Ingeschreven"
+    WACHTLIJST = "Jij staat op Wachtlijst"
+
+    @classmethod
+    def uit_class(cls, les_class):
+        """Uit de class van een les-blokje (zoals de site hem zet)."""
+        return cls(status_uit_class(les_class))
+
+    @classmethod
+    def van(cls, tekst):
+        """Uit de tekst in workout.json; onbekend telt als OPEN."""
+        try:
+            return cls(tekst)
+        except ValueError:
+            return cls.OPEN
+
+    @property
+    def ingeschreven(self):
+        """In de les of op de wachtlijst: je 'hebt' deze les."""
+        return self in (LesStatus.INGESCHREVEN, LesStatus.WACHTLIJST)
+
+    @property
+    def vol(self):
+        return self in (LesStatus.VOL, LesStatus.WACHTLIJST)
+
+
+def parse_tijd(tijd):
+    """'18:30 - 19:30' -> ((18, 30), (19, 30)); eind None zonder '- HH:MM'.
+    None als er geen tijd in staat."""
+    m = _TIJD.search(tijd or "")
+    if not m:
+        return None
+    eind = (int(m.group(3)), int(m.group(4))) if m.group(3) else None
+    return (int(m.group(1)), int(m.group(2))), eind
+
+
+def parse_deelnemers(tekst):
+    """'14/16' -> (14, 16), of None."""
+    m = _DEELNEMERS.search(tekst or "")
+    return (int(m.group(1)), int(m.group(2))) if m else None
+
+
+def _middernacht(datum):
+    return datum.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def _datum(tekst):
+    try:
+        return datetime.strptime(tekst, "%d-%m-%Y")
+    except (TypeError, ValueError):
+        return None
+
+
+def _tijden(tekst, datum):
+    """(start, eind) als datetimes op datum, of (None, None) als de tijd (of
+    de datum) niet te lezen is."""
+    tijden = parse_tijd(tekst) if datum is not None else None
+    if not tijden:
+        return None, None
+    (su, sm), eind = tijden
+    return (datum.replace(hour=su, minute=sm),
+            datum.replace(hour=eind[0], minute=eind[1]) if eind else None)
+
+
+def _tijd_tekst(start, eind):
+    if start is None:
+        return ""
+    return f"{start:%H:%M}" + (f" - {eind:%H:%M}" if eind else "")
+
+
+@dataclass(slots=True)
+class Les:
+    start: Optional[datetime]       # None als de tijd niet te lezen is
+    eind: Optional[datetime] = None
+    type: str = ""
+    zaal: str = ""
+    aangemeld: Optional[int] = None
+    capaciteit: Optional[int] = None
+    status: LesStatus = LesStatus.OPEN
+    vol_hint: Optional[str] = None
+    # Tekst zoals de site hem gaf; gaat ongewijzigd terug naar workout.json.
+    tijd_tekst: Optional[str] = None
+    deelnemers_tekst: Optional[str] = None
+
+    @classmethod
+    def uit_dict(cls, d, datum):
+        """Les uit een workout.json-dict op datum (datetime, 00:00)."""
+        start, eind = _tijden(d.get("tijd"), datum)
+        telling = parse_deelnemers(d.get("deelnemers"))
+        return cls(
+            start=start,
+            eind=eind,
+            type=sys.intern(d.get("type") or ""),
+            zaal=sys.intern(d.get("zaal") or ""),
+            aangemeld=telling[0] if telling else None,
+            capaciteit=telling[1] if telling else None,
+            status=LesStatus.van(d.get("status")),
+            vol_hint=d.get("vol_hint"),
+            tijd_tekst=d.get("tijd") or "",
+            deelnemers_tekst=d.get("deelnemers") or "",
+        )
+
+    @property
+    def tijd(self):
+        if self.tijd_tekst is not None:
+            return self.tijd_tekst
+        return _tijd_tekst(self.start, self.eind)
+
+    @property
+    def deelnemers(self):
+        if self.deelnemers_tekst is not None:
+            return self.deelnemers_tekst
+        if self.aangemeld is None:
+            return ""
+        return f"{self.aangemeld}/{self.capaciteit}"
+
+    @property
+    def key(self):
+        """'dd-mm-jjjj HH:MM - HH:MM', de sleutel van reminders.json; None
+        zonder leesbare starttijd."""
+        if self.start is None:
+            return None
+        return f"{self.start:%d-%m-%Y} {self.tijd}"
+
+    @property
+    def is_vol(self):
+        if self.status.vol:
+            return True
+        return bool(self.capaciteit) and self.aangemeld >= self.capaciteit
+
+    def naar_dict(self):
+        d = {"tijd": self.tijd, "type": self.type, "zaal": self.zaal,
+             "deelnemers": self.deelnemers, "status": self.status.value}
+        if self.vol_hint:
+            d["vol_hint"] = self.vol_hint
+        return d
+
+
+@dataclass(slots=True)
+class Dag:
+    datum: datetime
+    week: str
+    lessen: list = field(default_factory=list)
+
+    @property
+    def dag(self):
+        return DAGEN_NL[self.datum.weekday()]
+
+    @property
+    def dag_en(self):
+        return DAGEN_EN[self.datum.weekday()]
+
+    @classmethod
+    def uit_dict(cls, d):
+        datum = _datum(d.get("datum"))
+        if datum is None:
+            return None
+        return cls(datum, d.get("week") or "current", [Les.uit_dict(les, datum) for les in d.get("lessen") or []])
+
+    def naar_dict(self):
+        return {
+            "dag": self.dag,
+            "dag_en": self.dag_en,
+            "datum": f"{self.datum:%d-%m-%Y}",
+            "week": self.week,
+            "lessen": [les.naar_dict() for les in self.lessen],
+        }
+
+
+@dataclass(slots=True)
+class Status:
+    ingeschreven: bool = False
+    wachtlijst: bool = False
+    start: Optional[datetime] = None
+    eind: Optional[datetime] = None
+    type: str = ""
+    aangemeld: Optional[int] = None
+    capaciteit: Optional[int] = None
+    wachtlijst_plek: str = "?"
+    wachtlijst_totaal: str = "?"
+    tijd_tekst: Optional[str] = None
+    deelnemers_tekst: Optional[str] = None
+
+    @classmethod
+    def uit_dict(cls, d, datum):
+        start, eind = _tijden(d.get("tijd"), datum)
+        telling = parse_deelnemers(d.get("deelnemers"))
+        return cls(
+            ingeschreven=bool(d.get("ingeschreven")),
+            wachtlijst=bool(d.get("wachtlijst")),
+            start=start, eind=eind,
+            type=sys.intern(d.get("type") or ""),
+            aangemeld=telling[0] if telling else None,
+            capaciteit=telling[1] if telling else None,
+            wachtlijst_plek=d.get("wachtlijst_plek") or "?",
+            wachtlijst_totaal=d.get("wachtlijst_totaal") or "?",
+            tijd_tekst=d.get("tijd") or "",
+            deelnemers_tekst=d.get("deelnemers") or "",
+        )
+
+    @property
+    def tijd(self):
+        if self.tijd_tekst is not None:
+            return self.tijd_tekst
+        return _tijd_tekst(self.start, self.eind)
+
+    @property
+    def deelnemers(self):
+        if self.deelnemers_tekst is not None:
+            return self.deelnemers_tekst
+        return "" if self.aangemeld is None else f"{self.aangemeld}/{self.capaciteit}"
+
+    def als_les(self):
+        """Deze inschrijving als Les (zaal onbekend), of None zonder tijd."""
+        if not self.ingeschreven or self.start is None:
+            return None
+        return Les(self.start, self.eind, self.type or "les", "", self.aangemeld, self.capaciteit,
+                   LesStatus.WACHTLIJST if self.wachtlijst else LesStatus.INGESCHREVEN,
+                   tijd_tekst=self.tijd_tekst, deelnemers_tekst=self.deelnemers_tekst)
+
+    def naar_dict(self):
+        return {
+            "ingeschreven": self.ingeschreven,
+            "tijd": self.tijd,
+            "type": self.type,
+            "deelnemers": self.deelnemers,
+            "wachtlijst": self.wachtlijst,
+            "wachtlijst_plek": self.wachtlijst_plek,
+            "wachtlijst_totaal": self.wachtlijst_totaal,
+        }
+
+
+@dataclass(slots=True)
+class Rooster:
+    """Alle bekende dagen (op datum) plus de status-blokken van vandaag/morgen."""
+    dagen: dict = field(default_factory=dict)       # datetime (00:00) -> Dag
+    statussen: dict = field(default_factory=dict)   # datetime (00:00) -> Status
+
+    def dag(self, datum):
+        return self.dagen.get(_middernacht(datum))
+
+    def status(self, datum):
+        """Je status op die dag; een lege Status als die niet gelezen is."""
+        return self.statussen.get(_middernacht(datum)) or Status()
+
+    def lessen(self):
+        for dag in sorted(self.dagen.values(), key=lambda d: d.datum):
+            yield from dag.lessen
+
+
+def rooster_uit_snapshots(snapshots, now):
+    """Rooster uit de scrape-snapshots ({(zaal, week): {'lessen': {dag_en: [les]},
+    'status': {dag_en: status}}}): deze en volgende week, per dag alle zalen op
+    tijd gesorteerd, plus de status van de dagen waarvoor die gelezen is."""
+    maandag = datetime(now.year, now.month, now.day) - timedelta(days=now.weekday())
+    rooster = Rooster()
+    for week, offset in (("current", 0), ("next", 7)):
+        for i, dag_en in enumerate(DAGEN_EN):
+            datum = maandag + timedelta(days=offset + i)
+            lessen = []
+            for zaal in ZALEN:
+                snap = snapshots.get((zaal, week))
+                if snap:
+                    lessen.extend(snap["lessen"].get(dag_en, []))
+            # Zelfde volgorde als voorheen: stabiel op de tijd-tekst.
+            lessen = sorted(lessen, key=lambda x: x["tijd"])
+            dag = Dag(datum, week, [Les.uit_dict(d, datum) for d in lessen])
+            rooster.dagen[datum] = dag
+            if any(dag_en in (snap.get("status") or {}) for (_, w), snap in snapshots.items() if w == week):
+                rooster.statussen[datum] = Status.uit_dict(status_van_dag(snapshots, dag_en, week), datum)
+    return rooster
+
+
+def rooster_uit_workout(data):
+    """Rooster uit workout.json (alle views; de eerste view per datum wint)."""
+    rooster = Rooster()
+    vandaag = _datum(data.get("datum"))
+    morgen = vandaag + timedelta(days=1) if vandaag else None
+    week_morgen = "next" if vandaag and vandaag.weekday() == 6 else "current"
+    losse = ((vandaag, "current", "rooster_vandaag"), (morgen, week_morgen, "rooster_morgen"))
+    for datum, week, view in losse:
+        if datum is not None and isinstance(data.get(view), list):
+            rooster.dagen.setdefault(datum, Dag(datum, week, [Les.uit_dict(d, datum) for d in data[view]]))
+    for view in ("rooster_deze_week", "rooster_week"):
+        for d in data.get(view) or []:
+            dag = Dag.uit_dict(d)
+            if dag:
+                rooster.dagen.setdefault(dag.datum, dag)
+    for datum, key in ((vandaag, "status_vandaag"), (morgen, "status_morgen")):
+        if datum is not None and isinstance(data.get(key), dict):
+            rooster.statussen[datum] = Status.uit_dict(data[key], datum)
+    return rooster
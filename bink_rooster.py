@@ -0,0 +1,172 @@
+"""Gedeelde rooster-logica zonder browser: URL's, dagen, les-dicts en statussen.
+
+Zowel het Playwright-pad (bink_auto.py) als het HTTP-pad (bink_http.py) bouwen
+hiermee exact dezelfde workout.json-structuur. Geen Playwright-import, zodat
+ook scripts zonder browser (herinnering, analyse) dit mogen importeren."""
+import os
+from datetime import timedelta
+
+# Te overschrijven voor een lokale mock (zie bink_mock.py).
+BASE_URL = os.environ.get("BINK_BASE_URL", "https://www.crossfitbink36.nl").rstrip("/")
+# '/login' is een 404; de echte loginpagina is '/inloggen-voor-leden'.
+LOGIN_URL = f"{BASE_URL}/inloggen-voor-leden"
+WOD_URL = f"{BASE_URL}/?workout=wod"
+
+# Zalen + roosterpagina's (1 pagina toont een hele week per zaal).
+ZALEN = {
+    "Zaal 1": f"{BASE_URL}/rooster",
+    "Zaal 2": f"{BASE_URL}/rooster?hall=Zaal%202",
+    "Buiten": f"{BASE_URL}/rooster?hall=Buiten",
+}
+WEKEN = ("current", "next")
+
+# Class-delen van een les-blokje waaraan je ziet dat je erin/op de wachtlijst staat.
+INGESCHREVEN_CLASSES = ("signedup", "signed", "booked", "on-waiting-list")
+
+DAGEN_NL = ["Maandag", "Dinsdag", "Woensdag", "Donderdag", "Vrijdag", "Zaterdag", "Zondag"]
+DAGEN_EN = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def rooster_url(zaal_naam, week):
+    """URL van de roosterpagina voor (zaal, week); week is 'current' of 'next'."""
+    zaal_url = ZALEN[zaal_naam]
+    if week == "next":
+        return f"{zaal_url}&week=next" if "?" in zaal_url else f"{zaal_url}?week=next"
+    return zaal_url
+
+
+def dag_van_target(target):
+    """Haalt de weekdag uit een data-remodal-target (bv. 'tuesday-Oly Lifting-18:30').
+    Bij meerdere treffers wint de vroegste positie (de dag staat vooraan)."""
+    beste, beste_pos = None, None
+    for en in DAGEN_EN:
+        pos = target.find(en)
+        if pos >= 0 and (beste_pos is None or pos < beste_pos):
+            beste, beste_pos = en, pos
+    return beste
+
+
+def lege_status():
+    return {
+        "ingeschreven": False,
+        "tijd": "",
+        "type": "",
+        "deelnemers": "",
+        "wachtlijst": False,
+        "wachtlijst_plek": "?",
+        "wachtlijst_totaal": "?"
+    }
+
+
+def status_uit_class(les_class):
+    """Vertaalt de class van een les-blokje naar de status-tekst voor de widget."""
+    les_status = "Open"
+    if "full" in les_class: les_status = "Vol (Wachtlijst)"
+    if "signedup" in les_class or "booked" in les_class: les_status = "Jij bent Ingeschreven"
+    if "on-waiting-list" in les_class: les_status = "Jij staat op Wachtlijst"
+    return les_status
+
+
+def les_uit_record(record, zaal_naam):
+    """Zelfde dict als extract_les, maar uit een les-record (target, tijd, type,
+    deelnemers, class). None als tijd of type ontbreekt (extract_les faalt dan ook)."""
+    if record.get("tijd") is None or record.get("type") is None:
+        return None
+    return {
+        "tijd": record["tijd"],
+        "type": record["type"],
+        "zaal": zaal_naam,
+        "deelnemers": record.get("deelnemers") or "",
+        "status": status_uit_class(record.get("class") or ""),
+    }
+
+
+def lessen_per_dag(records, zaal_naam):
+    """Snijdt de records per weekdag op: {dag_en: [les, ...]} in documentvolgorde."""
+    lessen = {en: [] for en in DAGEN_EN}
+    for record in records:
+        dag_en = dag_van_target(record.get("target") or "")
+        if not dag_en:
+            continue
+        d = les_uit_record(record, zaal_naam)
+        if d:
+            lessen[dag_en].append(d)
+    return lessen
+
+
+def _is_wachtlijst(record):
+    # Zelfde als 'li.on-waiting-list': een hele class, geen substring.
+    return "on-waiting-list" in (record.get("class") or "").split()
+
+
+def _is_ingeschreven(record):
+    # Zelfde als 'li.workout-signedup, li[class*=signed], li[class*=booked]'.
+    cls = record.get("class") or ""
+    return "workout-signedup" in cls.split() or "signed" in cls or "booked" in cls
+
+
+def kies_eigen_les(records, dag_en):
+    """Jouw les op dag_en: (index, record, wachtlijst) of None. Wachtlijst gaat
+    voor een normale inschrijving, daarbinnen de eerste in documentvolgorde."""
+    van_dag = [(i, r) for i, r in enumerate(records) if dag_en in (r.get("target") or "")]
+    for i, r in van_dag:
+        if _is_wachtlijst(r):
+            return i, r, True
+    for i, r in van_dag:
+        if _is_ingeschreven(r):
+            return i, r, False
+    return None
+
+
+def modal_gegevens(cols):
+    """Python-versie van het modal-uitlezen: cols = teksten van '.grid .col' in
+    volgorde; het label staat steeds in de kolom vóór de waarde."""
+    res = {}
+    for i, tekst in enumerate(cols):
+        tekst = tekst.strip()
+        waarde = cols[i + 1].strip() if i + 1 < len(cols) else ""
+        if "Aanmeldingen" in tekst: res["deelnemers"] = waarde
+        elif "Positie op wachtlijst" in tekst: res["wachtlijst_plek"] = waarde
+        elif tekst in ("Wachtlijst:", "Wachtlijst"): res["wachtlijst_totaal"] = waarde
+    return res
+
+
+def vul_status_aan(status, modal_data):
+    """Neemt deelnemers (+ wachtlijstpositie als je op de wachtlijst staat) over."""
+    if modal_data.get("deelnemers"): status["deelnemers"] = modal_data["deelnemers"]
+    if status["wachtlijst"]:
+        if modal_data.get("wachtlijst_plek"): status["wachtlijst_plek"] = modal_data["wachtlijst_plek"]
+        if modal_data.get("wachtlijst_totaal"): status["wachtlijst_totaal"] = modal_data["wachtlijst_totaal"]
+    return status
+
+
+def status_van_dag(snapshots, dag_en, week):
+    """Eerste inschrijving in zaal-volgorde (zoals voorheen: Zaal 1 gaat voor)."""
+    for zaal_naam in ZALEN:
+        snap = snapshots.get((zaal_naam, week)) or {}
+        status = snap.get("status", {}).get(dag_en)
+        if status and status["ingeschreven"]:
+            return status
+    return lege_status()
+
+
+def dagen_deze_week(now):
+    """Resterende dagen van de HUIDIGE week: vanaf overmorgen t/m zondag.
+    (Vandaag en morgen hebben al hun eigen status/rooster.)"""
+    dagen = []
+    for offset in range(2, 7 - now.weekday()):  # overmorgen .. zondag deze week
+        datum_obj = now + timedelta(days=offset)
+        wd = datum_obj.weekday()
+        dagen.append((datum_obj, DAGEN_NL[wd], DAGEN_EN[wd]))
+    return dagen
+
+
+def dagen_volgende_week(now):
+    """Volledige AANKOMENDE week (week=next), alle 7 dagen."""
+    maandag_deze_week = now - timedelta(days=now.weekday())
+    maandag_volgende = maandag_deze_week + timedelta(days=7)
+    dagen = []
+    for i in range(7):
+        datum_obj = maandag_volgende + timedelta(days=i)
+        dagen.append((datum_obj, DAGEN_NL[i], DAGEN_EN[i]))
+    return dagen
@@ -0,0 +1,133 @@
+"""Gedeelde sessie-opslag: hergebruik de login tussen runs en scripts.
+
+Na een geslaagde login bewaren we de Playwright storage_state (cookies +
+localStorage) in SESSIE_FILE. De volgende run laadt die, checkt met 1 lichte
+request of hij nog geldig is en logt alleen opnieuw in als de sessie verlopen
+is. Het HTTP-pad (bink_http) gebruikt hetzelfde bestand via een cookie jar.
+
+In GitHub Actions blijft het bestand bewaard via actions/cache (zie de
+workflows); het staat in .gitignore en komt dus nooit in de repo."""
+import http.cookiejar
+import json
+import os
+
+import bink_metrics as metrics
+from bink_http import HttpSessie, is_ingelogd
+from bink_rooster import LOGIN_URL
+
+SESSIE_FILE = os.environ.get("BINK_SESSIE_FILE", ".bink_sessie.json")
+
+
+def lees_storage_state():
+    """De bewaarde storage_state als dict, of None."""
+    try:
+        with open(SESSIE_FILE, encoding="utf-8") as f:
+            state = json.load(f)
+        return state if isinstance(state, dict) and state.get("cookies") else None
+    except Exception:
+        return None
+
+
+def schrijf_storage_state(state):
+    # Alleen voor de eigenaar leesbaar: dit zijn inlog-cookies.
+    fd = os.open(SESSIE_FILE, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def vergeet_sessie():
+    try:
+        os.remove(SESSIE_FILE)
+    except FileNotFoundError:
+        pass
+
+
+# --- Playwright -----------------------------------------------------------------
+
+async def sessie_geldig(context):
+    """1 lichte GET van de loginpagina via context.request (deelt de cookies,
+    geen rendering): geldig als we daar al ingelogd zijn."""
+    try:
+        with metrics.span("sessie_check"):
+            resp = await context.request.get(LOGIN_URL, timeout=15000)
+            return is_ingelogd(await resp.text())
+    except Exception as e:
+        print(f"Sessie-check mislukt ({e}); opnieuw inloggen.")
+        return False
+
+
+async def bewaar_sessie(context):
+    try:
+        schrijf_storage_state(await context.storage_state())
+    except Exception as e:
+        print(f"Kon sessie niet bewaren: {e}")
+
+
+async def zorg_voor_login(context, page, login):
+    """Hergebruikt de bewaarde sessie als die nog geldig is; anders roept hij
+    login(page) aan en bewaart de nieuwe sessie. True als er ingelogd is."""
+    if lees_storage_state() and await sessie_geldig(context):
+        print("♻️ Bewaarde sessie nog geldig, login overgeslagen.")
+        return False
+    with metrics.span("login"):
+        await login(page)
+    await bewaar_sessie(context)
+    return True
+
+
+# --- HTTP (cookie jar) ----------------------------------------------------------
+
+def _cookie_uit_state(c):
+    domein = c.get("domain") or ""
+    verloopt = c.get("expires", -1)
+    sessie_cookie = verloopt is None or verloopt < 0
+    return http.cookiejar.Cookie(
+        version=0, name=c["name"], value=c.get("value", ""),
+        port=None, port_specified=False,
+        domain=domein, domain_specified=domein.startswith("."), domain_initial_dot=domein.startswith("."),
+        path=c.get("path") or "/", path_specified=True,
+        secure=bool(c.get("secure")),
+        expires=None if sessie_cookie else int(verloopt),
+        discard=sessie_cookie, comment=None, comment_url=None,
+        rest={"HttpOnly": None} if c.get("httpOnly") else {},
+    )
+
+
+def _state_uit_jar(jar, oud=None):
+    cookies = [{
+        "name": c.name,
+        "value": c.value or "",
+        "domain": c.domain,
+        "path": c.path or "/",
+        "expires": c.expires if c.expires else -1,
+        "httpOnly": c.has_nonstandard_attr("HttpOnly"),
+        "secure": bool(c.secure),
+        "sameSite": "Lax",
+    } for c in jar]
+    # localStorage van een eerdere Playwright-run laten we staan.
+    return {"cookies": cookies, "origins": (oud or {}).get("origins", [])}
+
+
+def http_sessie(email, password):
+    """Ingelogde HttpSessie: met de bewaarde cookies als die nog geldig zijn,
+    anders na een verse login (en dan meteen opgeslagen)."""
+    state = lees_storage_state()
+    jar = http.cookiejar.CookieJar()
+    for c in (state or {}).get("cookies", []):
+        try:
+            jar.set_cookie(_cookie_uit_state(c))
+        except Exception:
+            pass
+
+    sessie = HttpSessie(cookie_jar=jar)
+    if state:
+        with metrics.span("sessie_check"):
+            geldig = sessie.is_ingelogd()
+        if geldig:
+            print("♻️ Bewaarde sessie nog geldig, login overgeslagen.")
+            return sessie
+
+    with metrics.span("login"):
+        sessie.login(email, password)
+    schrijf_storage_state(_state_uit_jar(sessie.cookies, state))
+    return sessie
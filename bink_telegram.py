@@ -0,0 +1,331 @@
+"""Gedeelde Telegram-melder voor alle bink-scripts.
+
+Elk script had een eigen stuur_telegram() met een nieuwe urllib-verbinding per
+bericht (soms zonder timeout) die fouten stil inslikte. Nu:
+
+- stuur_telegram() zet het bericht in een wachtrij en keert meteen terug; een
+  achtergrond-thread verstuurt via 1 blijvende (keep-alive) verbinding.
+- berichten die kort na elkaar komen (SAMENVOEG_VENSTER) gaan als 1 bericht.
+- 429 van Telegram: wachten zo lang als 'retry_after' zegt en opnieuw; andere
+  fouten krijgen een paar pogingen met oplopende pauze.
+- lukt het niet, dan gaat het bericht naar SPOOL_FILE; de volgende run
+  verstuurt die eerst (zie verstuur_spool).
+- bij het afsluiten van het script wacht atexit tot de wachtrij leeg is
+  (max. AFSLUIT_TIMEOUT seconden).
+- stuur_direct() + bewerk_telegram(): 1 bericht meteen versturen en later
+  aanvullen (bv. de stats eerst, het coach-advies zodra het er is).
+
+TELEGRAM_API_URL wijst de melder naar een andere server, bv. de stub in
+bink_mock.py:
+
+    python bink_mock.py &
+    TELEGRAM_API_URL=http://127.0.0.1:8036 TELEGRAM_TOKEN=x TELEGRAM_CHAT_ID=1 \\
+        python -c "import bink_telegram as t; t.stuur_telegram('hoi')"
+"""
+import atexit
+import http.client
+import json
+import os
+import queue
+import threading
+import time
+import urllib.parse
+
+API_URL = os.environ.get("TELEGRAM_API_URL", "https://api.telegram.org")
+SPOOL_FILE = os.environ.get("BINK_TELEGRAM_SPOOL", "telegram_spool.jsonl")
+
+SAMENVOEG_VENSTER = 1.0   # seconden wachten op meer berichten voor 1 verzending
+MIN_INTERVAL = 1.0        # Telegram: ca. 1 bericht per seconde per chat
+MAX_LENGTE = 4096         # Telegram-limiet per bericht
+POGINGEN = 3
+MAX_RETRY_AFTER = 60      # langer wachten op een 429 doen we niet; dan naar de spool
+TIMEOUT = 15
+AFSLUIT_TIMEOUT = 30
+
+SCHEIDING = "\n\n"
+
+
+class TelegramFout(Exception):
+    def __init__(self, bericht, retry_after=None, definitief=False, opmaak=False):
+        super().__init__(bericht)
+        self.retry_after = retry_after
+        self.definitief = definitief
+        self.opmaak = opmaak      # 400 "can't parse entities": de Markdown/HTML is kapot
+
+
+def lees_spool(pad=None):
+    items = []
+    try:
+        with open(pad or SPOOL_FILE, encoding="utf-8") as f:
+            for regel in f:
+                try:
+                    items.append(json.loads(regel))
+                except ValueError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return [i for i in items if isinstance(i, dict) and i.get("tekst")]
+
+
+def schrijf_spool(items, pad=None):
+    # Leeg = leeg bestand, niet weghalen: anders bewaart actions/cache niets en
+    # krijgt de volgende run de oude (al verstuurde) spool terug.
+    pad = pad or SPOOL_FILE
+    tmp = pad + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for i in items:
+            f.write(json.dumps(i, ensure_ascii=False) + "\n")
+    os.replace(tmp, pad)
+
+
+def voeg_samen(berichten, max_lengte=MAX_LENGTE):
+    """[tekst] -> zo min mogelijk teksten van hooguit max_lengte tekens
+    (in volgorde; een te lang los bericht wordt afgekapt)."""
+    uit = []
+    for tekst in berichten:
+        tekst = tekst[:max_lengte]
+        if uit and len(uit[-1]) + len(SCHEIDING) + len(tekst) <= max_lengte:
+            uit[-1] += SCHEIDING + tekst
+        else:
+            uit.append(tekst)
+    return uit
+
+
+class TelegramMelder:
+    """Achtergrond-verzender met 1 blijvende verbinding naar de Bot API."""
+
+    def __init__(self, token, chat_id, api_url=API_URL, spool_file=None):
+        self.token = token
+        self.chat_id = chat_id
+        self.api = urllib.parse.urlsplit(api_url)
+        self.spool_file = spool_file or SPOOL_FILE
+        self.wachtrij = queue.Queue()
+        self.verbinding = None
+        self.laatst_verstuurd = 0.0
+        self.tellers = {"verstuurd": 0, "samengevoegd": 0, "429": 0, "gespoold": 0}
+        self._lock = threading.Lock()   # spool-bestand
+        self._verbinding_lock = threading.Lock()
+        self._thread = threading.Thread(target=self._werker, name="telegram", daemon=True)
+        self._thread.start()
+
+    # --- verbinding -------------------------------------------------------------
+
+    def _verbind(self):
+        if self.verbinding is None:
+            klasse = http.client.HTTPSConnection if self.api.scheme == "https" else http.client.HTTPConnection
+            self.verbinding = klasse(self.api.netloc, timeout=TIMEOUT)
+        return self.verbinding
+
+    def _sluit(self):
+        if self.verbinding is not None:
+            try:
+                self.verbinding.close()
+            except Exception:
+                pass
+            self.verbinding = None
+
+    def _api(self, methode, velden):
+        """1 Bot API-call; het 'result' van Telegram, of TelegramFout."""
+        pad = f"{self.api.path.rstrip('/')}/bot{self.token}/{methode}"
+        with self._verbinding_lock:
+            try:
+                conn = self._verbind()
+                conn.request("POST", pad, body=urllib.parse.urlencode(velden),
+                             headers={"Content-Type": "application/x-www-form-urlencoded"})
+                resp = conn.getresponse()
+                body = resp.read()
+            except Exception as e:
+                # Verbinding weg (bv. keep-alive verlopen): volgende poging verbindt opnieuw.
+                self._sluit()
+                raise TelegramFout(f"verbinding: {e}")
+        try:
+            antwoord = json.loads(body)
+        except ValueError:
+            antwoord = {}
+        if resp.status == 200:
+            return antwoord.get("result", True)
+        beschrijving = antwoord.get("description") or body[:200].decode("utf-8", "replace")
+        if resp.status == 429:
+            retry_after = (antwoord.get("parameters") or {}).get("retry_after") or resp.getheader("Retry-After") or 1
+            raise TelegramFout(f"429 {beschrijving}", retry_after=float(retry_after))
+        # 4xx (behalve 429) wordt niet beter van nog eens proberen.
+        raise TelegramFout(f"{resp.status} {beschrijving}", definitief=400 <= resp.status < 500,
+                           opmaak=resp.status == 400 and "can't parse entities" in beschrijving.lower())
+
+    def _roep(self, methode, velden):
+        """Het result bij succes (na retries/429-pauzes), False als het later
+        nog kan lukken (-> spool), None als Telegram het weigert."""
+        for poging in range(1, POGINGEN + 1):
+            pauze = self.laatst_verstuurd + MIN_INTERVAL - time.monotonic()
+            if pauze > 0:
+                time.sleep(pauze)
+            try:
+                result = self._api(methode, velden)
+                self.laatst_verstuurd = time.monotonic()
+                self.tellers["verstuurd"] += 1
+                return result
+            except TelegramFout as e:
+                self.laatst_verstuurd = time.monotonic()
+                print(f"❌ Telegram fout (poging {poging}/{POGINGEN}): {e}")
+                if e.definitief:
+                    if e.opmaak and velden.get("parse_mode"):
+                        # Kapotte Markdown: dan maar als platte tekst. Andere 4xx
+                        # (token, chat_id, bewerkfout) worden daar niet beter van.
+                        return self._roep(methode, {k: v for k, v in velden.items() if k != "parse_mode"})
+                    return None
+                if e.retry_after is not None:
+                    self.tellers["429"] += 1
+                    if e.retry_after > MAX_RETRY_AFTER:
+                        return False
+                    time.sleep(e.retry_after)
+                elif poging < POGINGEN:
+                    time.sleep(2 ** poging)
+        return False
+
+    def _velden(self, tekst, parse_mode, **extra):
+        velden = {"chat_id": self.chat_id, "text": tekst[:MAX_LENGTE], **extra}
+        if parse_mode:
+            velden["parse_mode"] = parse_mode
+        return velden
+
+    def _verstuur(self, tekst, parse_mode):
+        """True als het bericht aangekomen is, False/None zoals bij _roep."""
+        result = self._roep("sendMessage", self._velden(tekst, parse_mode))
+        return result if result in (False, None) else True
+
+    def verstuur_direct(self, tekst, parse_mode=None):
+        """Meteen versturen (blokkerend, buiten de samenvoeg-wachtrij), zodat
+        het bericht later te bewerken is. message_id of None."""
+        result = self._roep("sendMessage", self._velden(tekst, parse_mode))
+        return result.get("message_id") if isinstance(result, dict) else None
+
+    def bewerk(self, message_id, tekst, parse_mode=None):
+        """Vervangt de tekst van een eerder (direct) verstuurd bericht."""
+        result = self._roep("editMessageText", self._velden(tekst, parse_mode, message_id=message_id))
+        return result not in (False, None)
+
+    # --- wachtrij -----------------------------------------------------------------
+
+    def _werker(self):
+        while True:
+            item = self.wachtrij.get()
+            groep = [item]
+            # Berichten die binnen het venster volgen gaan mee in dezelfde verzending.
+            while True:
+                try:
+                    groep.append(self.wachtrij.get(timeout=SAMENVOEG_VENSTER))
+                except queue.Empty:
+                    break
+            try:
+                self._verwerk(groep)
+            finally:
+                for _ in groep:
+                    self.wachtrij.task_done()
+
+    def _verwerk(self, items):
+        # Samenvoegen per parse_mode, in volgorde van binnenkomst.
+        blokken = []
+        for item in items:
+            if blokken and blokken[-1][0] == item.get("parse_mode"):
+                blokken[-1][1].append(item["tekst"])
+            else:
+                blokken.append((item.get("parse_mode"), [item["tekst"]]))
+        mislukt = []
+        for parse_mode, teksten in blokken:
+            samen = voeg_samen(teksten)
+            self.tellers["samengevoegd"] += len(teksten) - len(samen)
+            for tekst in samen:
+                if self._verstuur(tekst, parse_mode) is False:
+                    mislukt.append({"tekst": tekst, "parse_mode": parse_mode, "tijd": time.time()})
+        if mislukt:
+            with self._lock:
+                schrijf_spool(lees_spool(self.spool_file) + mislukt, self.spool_file)
+            self.tellers["gespoold"] += len(mislukt)
+            print(f"💾 {len(mislukt)} Telegram-bericht(en) in {self.spool_file} gezet voor de volgende run.")
+
+    def stuur(self, tekst, parse_mode=None):
+        self.wachtrij.put({"tekst": tekst, "parse_mode": parse_mode})
+
+    def spool_opnieuw(self):
+        """Zet de berichten uit de spool (van een vorige run) weer in de wachtrij."""
+        with self._lock:
+            items = lees_spool(self.spool_file)
+            schrijf_spool([], self.spool_file)
+        for item in items:
+            self.wachtrij.put({"tekst": item["tekst"], "parse_mode": item.get("parse_mode")})
+        return len(items)
+
+    def wacht(self, timeout=AFSLUIT_TIMEOUT):
+        """Wacht tot alles verstuurd (of gespoold) is. False bij timeout."""
+        eind = time.monotonic() + timeout
+        while self.wachtrij.unfinished_tasks:
+            if time.monotonic() > eind:
+                return False
+            time.sleep(0.05)
+        return True
+
+
+_MELDER = None
+_MELDER_LOCK = threading.Lock()
+
+
+def melder():
+    """De gedeelde melder (of None zonder TELEGRAM_TOKEN/TELEGRAM_CHAT_ID)."""
+    global _MELDER
+    token = os.environ.get("TELEGRAM_TOKEN")
+    chat_id = os.environ.get("TELEGRAM_CHAT_ID")
+    if not token or not chat_id:
+        return None
+    with _MELDER_LOCK:
+        if _MELDER is None:
+            _MELDER = TelegramMelder(token, chat_id)
+            atexit.register(_afsluiten)
+    return _MELDER
+
+
+def _afsluiten():
+    if _MELDER is not None and not _MELDER.wacht(AFSLUIT_TIMEOUT):
+        print("⚠️ Telegram-wachtrij niet leeg bij afsluiten.")
+
+
+def stuur_telegram(bericht, parse_mode=None):
+    """Zet een bericht in de wachtrij (keert meteen terug)."""
+    m = melder()
+    if m is None:
+        print("⚠️ Geen Telegram gegevens, bericht niet verstuurd.")
+        return
+    print(f"📨 Telegram: {bericht}")
+    m.stuur(bericht, parse_mode)
+
+
+def stuur_direct(bericht, parse_mode=None):
+    """Zoals stuur_telegram, maar blokkerend en met het message_id terug (voor
+    bewerk_telegram). None zonder Telegram-gegevens of als het mislukt."""
+    m = melder()
+    if m is None:
+        print("⚠️ Geen Telegram gegevens, bericht niet verstuurd.")
+        return None
+    print(f"📨 Telegram: {bericht}")
+    return m.verstuur_direct(bericht, parse_mode)
+
+
+def bewerk_telegram(message_id, bericht, parse_mode=None):
+    """Past een bericht van stuur_direct aan. False als dat niet lukt (stuur
+    dan een nieuw bericht)."""
+    m = melder()
+    if m is None or message_id is None:
+        return False
+    print(f"✏️ Telegram (bewerkt): {bericht}")
+    return m.bewerk(message_id, bericht, parse_mode)
+
+
+def verstuur_spool():
+    """Berichten die een vorige run niet kwijt kon opnieuw in de wachtrij."""
+    m = melder()
+    if m is None or not os.path.exists(m.spool_file) or not os.path.getsize(m.spool_file):
+        return 0
+    aantal = m.spool_opnieuw()
+    if aantal:
+        print(f"📨 {aantal} Telegram-bericht(en) uit de spool opnieuw versturen.")
+    return aantal
+
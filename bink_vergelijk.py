@@ -0,0 +1,242 @@
+"""Top-k gelijkende WOD's over de hele history in 1 matrixproduct (NumPy).
+
+bereken_deja_vu geeft alleen de beste match; dit geeft de k beste, voor een
+tekst of voor een datum:
+
+    python bink_vergelijk.py "5 rounds 200m run max rope climbs" -k 5
+    python bink_vergelijk.py --datum 12-02-2026 -k 10
+    python bink_vergelijk.py --bench 10000      # vs. de difflib-loop
+
+Elke WOD (per datum, uit de déjà-vu-index van bink_dejavu) wordt een vector
+van gehashte karakter-3-grammen (TF-IDF, L2-genormaliseerd). De telmatrix
+staat in CACHE_FILE en wordt alleen aangevuld voor nieuwe/gewijzigde datums;
+de zoekopdracht zelf is 1 matrix-vectorproduct + argpartition.
+
+Vereist numpy (pip install numpy); de scrape-workflow gebruikt dit niet."""
+import argparse
+import difflib
+import random
+import sys
+import time
+import zlib
+
+import numpy as np
+
+from bink_dejavu import laad_index, normaliseer_wod
+
+CACHE_FILE = "vergelijk_cache.npz"
+DIM = 2048     # gehashte kolommen; 10k datums = 20 MB aan tellingen (uint8)
+NGRAM = 3
+
+
+def telmatrix(teksten, dim=DIM):
+    """Tellingen van gehashte karakter-n-grammen, voor alle teksten tegelijk.
+    Alle teksten worden achter elkaar gezet; n-grammen over een grens vallen
+    weg via een maskertje. Geen Python-loop per rij."""
+    matrix = np.zeros((len(teksten), dim), dtype=np.uint8)
+    if not teksten:
+        return matrix
+    data = np.frombuffer("\0".join(teksten).encode("utf-8"), dtype=np.uint8).astype(np.uint64)
+    if len(data) < NGRAM:
+        return matrix
+    rij = np.cumsum(data == 0)  # rijnummer per byte (scheidingsteken = volgende rij)
+    code = np.zeros(len(data) - NGRAM + 1, dtype=np.uint64)
+    for i in range(NGRAM):
+        code = (code << np.uint64(8)) | data[i:len(data) - NGRAM + 1 + i]
+    geldig = (rij[:len(code)] == rij[NGRAM - 1:]) & (data[:len(code)] != 0)
+    # Multiplicatieve hash naar de kolom (Knuth), goedkoop en goed genoeg.
+    kolom = ((code[geldig] * np.uint64(2654435761)) >> np.uint64(7)) % np.uint64(dim)
+    plek = rij[:len(code)][geldig].astype(np.int64) * dim + kolom.astype(np.int64)
+    tellingen = np.bincount(plek, minlength=len(teksten) * dim).reshape(len(teksten), dim)
+    np.minimum(tellingen, 255, out=tellingen)
+    matrix[:] = tellingen
+    return matrix
+
+
+def _crc(tekst):
+    return zlib.crc32(tekst.encode("utf-8"))
+
+
+class WodMatrix:
+    """TF-IDF-matrix over alle datums; .top_k() zoekt in 1 keer."""
+
+    def __init__(self, datums, teksten, tellingen):
+        self.datums = list(datums)
+        self.teksten = list(teksten)
+        self.tellingen = tellingen
+        self._positie = {d: i for i, d in enumerate(self.datums)}
+        df = np.count_nonzero(tellingen, axis=0)
+        self.idf = (np.log((1 + len(self.datums)) / (1 + df)) + 1).astype(np.float32)
+        self.gewichten = self._weeg(tellingen)
+
+    def _weeg(self, tellingen):
+        tf = tellingen.astype(np.float32)
+        np.log1p(tf, out=tf)
+        w = tf * self.idf
+        norm = np.linalg.norm(w, axis=1, keepdims=True)
+        norm[norm == 0] = 1
+        return w / norm
+
+    def vector(self, tekst):
+        return self._weeg(telmatrix([normaliseer_wod(tekst)]))[0]
+
+    def top_k(self, tekst=None, k=5, datum=None, uitsluiten=()):
+        """[(datum, cosinus)] aflopend. Met datum= wordt de WOD van die datum
+        als zoekvraag gebruikt (en die datum zelf overgeslagen)."""
+        if datum is not None:
+            if datum not in self._positie:
+                return []
+            q = self.gewichten[self._positie[datum]]
+            uitsluiten = set(uitsluiten) | {datum}
+        else:
+            q = self.vector(tekst or "")
+        scores = self.gewichten @ q
+        for d in uitsluiten:
+            if d in self._positie:
+                scores[self._positie[d]] = -1
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(self.datums[i], float(scores[i])) for i in top if scores[i] >= 0]
+
+
+def bouw_matrix(datums_teksten, cache_file=CACHE_FILE):
+    """WodMatrix voor {datum: genormaliseerde tekst}. Hergebruikt de tellingen
+    uit cache_file voor datums waarvan de tekst niet veranderd is."""
+    datums = list(datums_teksten)
+    teksten = [datums_teksten[d] for d in datums]
+    crcs = np.array([_crc(t) for t in teksten], dtype=np.uint32)
+
+    oud = {}
+    if cache_file:
+        try:
+            with np.load(cache_file) as c:
+                if int(c["dim"]) == DIM:
+                    for i, (d, crc) in enumerate(zip(c["datums"].tolist(), c["crcs"].tolist())):
+                        oud[d] = (crc, i)
+                    oude_tellingen = c["tellingen"]
+        except Exception:
+            oud = {}
+
+    tellingen = np.zeros((len(datums), DIM), dtype=np.uint8)
+    opnieuw = []
+    for i, (d, crc) in enumerate(zip(datums, crcs.tolist())):
+        hit = oud.get(d)
+        if hit and hit[0] == crc:
+            tellingen[i] = oude_tellingen[hit[1]]
+        else:
+            opnieuw.append(i)
+    if opnieuw:
+        tellingen[opnieuw] = telmatrix([teksten[i] for i in opnieuw])
+        if cache_file:
+            np.savez_compressed(cache_file, dim=DIM, datums=np.array(datums), crcs=crcs, tellingen=tellingen)
+    return WodMatrix(datums, teksten, tellingen)
+
+
+_CACHE = {}
+
+
+def laad_matrix(db_file=None, cache_file=CACHE_FILE):
+    """WodMatrix voor de hele historie; in het geheugen gecachet zolang de
+    déjà-vu-index niets nieuws binnenkrijgt."""
+    index = laad_index(db_file)
+    index.bewaar()
+    sleutel = (db_file, index.versie)
+    if sleutel not in _CACHE:
+        _CACHE.clear()
+        _CACHE[sleutel] = bouw_matrix({d: item["tekst"] for d, item in index.datums.items()}, cache_file)
+    return _CACHE[sleutel]
+
+
+def top_k(tekst=None, k=5, datum=None, db_file=None):
+    return laad_matrix(db_file).top_k(tekst, k=k, datum=datum)
+
+
+# --- benchmark -------------------------------------------------------------------
+
+BEWEGINGEN = ["snatch", "clean and jerk", "back squat", "front squat", "deadlift", "thruster",
+              "wall ball", "burpee", "box jump", "pull up", "toes to bar", "double under",
+              "row", "run", "bike", "ring dip", "handstand push up", "kettlebell swing",
+              "lunges", "rope climb", "muscle up", "push press", "sit up", "ski erg"]
+FORMATS = ["amrap {t}min", "for time", "emom {t}min", "{r} rounds", "every {t}min x {r}", "tabata"]
+
+
+def synthetische_history(aantal, seed=36):
+    rnd = random.Random(seed)
+    teksten = {}
+    for i in range(aantal):
+        delen = [rnd.choice(FORMATS).format(t=rnd.randint(8, 30), r=rnd.randint(3, 10))]
+        for beweging in rnd.sample(BEWEGINGEN, rnd.randint(2, 5)):
+            delen.append(f"{rnd.choice([5, 10, 12, 15, 20, 200, 400])} {beweging}")
+        if rnd.random() < 0.3:
+            delen.append(f"{rnd.choice([40, 50, 60, 70])} {rnd.choice([30, 35, 42])} kg")
+        d = i % 28 + 1
+        m = i // 28 % 12 + 1
+        j = 2000 + i // (28 * 12)
+        teksten[f"{d:02d}-{m:02d}-{j}"] = normaliseer_wod(" | ".join(delen))
+    return teksten
+
+
+def bench(aantal, k=5, vragen=5):
+    teksten = synthetische_history(aantal)
+    datums = list(teksten)
+    rnd = random.Random(1)
+    zoek = [teksten[d] for d in rnd.sample(datums, vragen)]
+
+    start = time.perf_counter()
+    m = bouw_matrix(teksten, cache_file=None)
+    bouw = time.perf_counter() - start
+
+    start = time.perf_counter()
+    numpy_top = [m.top_k(q, k=k) for q in zoek]
+    numpy_tijd = (time.perf_counter() - start) / vragen
+
+    start = time.perf_counter()
+    difflib_top = []
+    for q in zoek:
+        scores = [(d, difflib.SequenceMatcher(None, q, t).ratio()) for d, t in teksten.items()]
+        scores.sort(key=lambda x: -x[1])
+        difflib_top.append(scores[:k])
+    difflib_tijd = (time.perf_counter() - start) / vragen
+
+    overlap = sum(len({d for d, _ in a} & {d for d, _ in b}) for a, b in zip(numpy_top, difflib_top))
+    # Kwaliteit in difflib-maat: hoe dicht zitten de NumPy-treffers bij de beste?
+    ratio_numpy = [difflib.SequenceMatcher(None, q, teksten[d]).ratio() for q, top in zip(zoek, numpy_top) for d, _ in top]
+    ratio_difflib = [r for top in difflib_top for _, r in top]
+    print(f"Synthetische history: {aantal} datums, top-{k}, {vragen} zoekvragen")
+    print(f"Matrix bouwen (eenmalig, daarna cache): {bouw * 1000:8.1f} ms")
+    print(f"NumPy per zoekvraag : {numpy_tijd * 1000:8.1f} ms")
+    print(f"difflib per zoekvraag: {difflib_tijd * 1000:8.1f} ms")
+    if numpy_tijd > 0:
+        print(f"Versnelling          : {difflib_tijd / numpy_tijd:.0f}x")
+    print(f"Overlap top-{k} met difflib: {overlap}/{k * vragen} (veel gelijke scores in synthetische data)")
+    print(f"Gem. difflib-ratio van de top-{k}: NumPy {sum(ratio_numpy) / len(ratio_numpy):.2f}, "
+          f"difflib {sum(ratio_difflib) / len(ratio_difflib):.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Top-k gelijkende WOD's uit de historie")
+    parser.add_argument("tekst", nargs="?", help="WOD-tekst om op te zoeken")
+    parser.add_argument("--datum", help="zoek met de WOD van deze datum (dd-mm-jjjj)")
+    parser.add_argument("-k", type=int, default=5)
+    parser.add_argument("--bench", type=int, metavar="N", help="benchmark op N synthetische datums")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.bench, k=args.k)
+        return
+    if not args.tekst and not args.datum:
+        parser.print_help()
+        sys.exit(1)
+
+    resultaat = top_k(args.tekst, k=args.k, datum=args.datum)
+    if not resultaat:
+        print("Niets gevonden.")
+    for datum, score in resultaat:
+        print(f"{datum}  {round(score * 100):3d}%")
+
+
+if __name__ == "__main__":
+    main()
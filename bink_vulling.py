@@ -0,0 +1,248 @@
+"""Wanneer loopt een les vol? Vulcurves en vol-momenten per tijdslot.
+
+Leest de bezettings-tijdreeks van bink_bezetting (memmap, geen Python-objecten
+per meting) en rekent per slot (zaal, weekdag, starttijd, type) over de
+lessen van de laatste WEKEN_TERUG weken uit:
+
+- hoeveel lessen vol liepen, en hoeveel uur voor de start dat gebeurde
+  (mediaan en spreiding, uit de eerste meting met aangemeld >= capaciteit);
+- de gemiddelde vulcurve: bezetting (%) op vaste momenten voor de start.
+
+Alles gaat met array-operaties (np.unique/lexsort/bincount), dus maanden aan
+uurlijkse metingen kosten ruim minder dan een seconde. Met --schrijf komen er
+korte hints in HINTS_FILE en in workout.json, per les een veld 'vol_hint'
+(bv. "meestal ~20u vooraf vol"). bink_auto zet de hints uit HINTS_FILE bij
+elke scrape opnieuw in workout.json (zonder numpy). Zijn de hints gelijk aan
+die in HINTS_FILE, dan wordt er niets geschreven (ook geen nieuwe tijdstempel),
+en workout.json alleen als er een vol_hint in verandert.
+
+    python bink_vulling.py                       # overzicht van alle slots
+    python bink_vulling.py --slot dinsdag 18:30 --zaal "Zaal 2"
+    python bink_vulling.py --schrijf             # hints bijwerken
+
+Vereist numpy (pip install numpy)."""
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from bink_bezetting import VOL, Bezetting, epoch, start_minuut, weekdag_uit_tekst
+from bink_rooster import DAGEN_EN, DAGEN_NL
+from bink_workout import alle_views, lees_workout, schrijf_workout
+
+HINTS_FILE = "vul_hints.json"
+WEKEN_TERUG = 12        # alleen recente lessen tellen mee
+MIN_LESSEN = 3          # minder lessen in een slot: geen hint
+MEESTAL = 0.5           # aandeel vol vanaf waar het "meestal" heet
+SOMS = 0.2
+CURVE_UREN = [168, 96, 72, 48, 36, 24, 12, 6, 3, 1, 0]
+
+
+def slot_sleutel(zaal, weekdag, tijd, soort):
+    """'Zaal 2|1|18:30|OLY LIFTING'; tijd mag '18:30 - 19:30' zijn."""
+    minuut = start_minuut(tijd)
+    if minuut is None:
+        return None
+    return f"{zaal}|{weekdag}|{minuut // 60:02d}:{minuut % 60:02d}|{soort}"
+
+
+def vol_momenten(b):
+    """Per les (index = les-id) de eerste tijd waarop hij vol was, of -1.
+    De metingen staan op tijd (append-only), dus de eerste vol-meting per les
+    is ook de vroegste."""
+    import numpy as np
+    m = b.metingen
+    vol = (m["capaciteit"] > 0) & ((m["aangemeld"] >= m["capaciteit"]) | ((m["vlaggen"] & VOL) > 0))
+    les_vol = m["les"][vol]
+    ids, eerste = np.unique(les_vol, return_index=True)
+    uit = np.full(len(b.lessen), -1, dtype=np.int64)
+    uit[ids] = m["tijd"][vol][eerste]
+    return uit
+
+
+def bereken(b, now=None, weken=WEKEN_TERUG):
+    """Statistiek per slot als dict van arrays (1 element per slot):
+    zaal, weekdag, minuut, type, lessen, vol, mediaan/p25/p75 (uur voor de
+    start dat het vol liep; NaN als nooit) en curve (gem. bezetting in % op
+    CURVE_UREN). Telt alleen lessen die al begonnen zijn en gemeten zijn."""
+    import numpy as np
+    nu = epoch(now or datetime.now())
+    lessen = b.lessen
+    start = lessen["start"].astype(np.int64)
+    gemeten = np.bincount(b.metingen["les"], minlength=len(lessen))[:len(lessen)] > 0
+    mee = np.flatnonzero(gemeten & (start <= nu) & (start > nu - weken * 7 * 86400))
+
+    sleutel = (lessen["zaal"][mee].astype(np.int64) << 40 | lessen["weekdag"][mee].astype(np.int64) << 32
+               | lessen["minuut"][mee].astype(np.int64) << 16 | lessen["type"][mee].astype(np.int64))
+    slots, groep = np.unique(sleutel, return_inverse=True)
+    aantal = np.bincount(groep, minlength=len(slots))
+
+    vol_tijd = vol_momenten(b)[mee]
+    is_vol = vol_tijd >= 0
+    aantal_vol = np.bincount(groep[is_vol], minlength=len(slots))
+
+    # Kwantielen van 'uur voor start' per slot: sorteer op (slot, uren) en
+    # pak per groep de juiste positie.
+    uren = (start[mee][is_vol] - vol_tijd[is_vol]) / 3600.0
+    g = groep[is_vol]
+    volgorde = np.lexsort((uren, g))
+    uren, g = uren[volgorde], g[volgorde]
+    begin = np.cumsum(aantal_vol) - aantal_vol
+
+    def kwantiel(q):
+        uit = np.full(len(slots), np.nan)
+        heeft = aantal_vol > 0
+        uit[heeft] = uren[begin[heeft] + ((aantal_vol[heeft] - 1) * q).astype(np.int64)]
+        return uit
+
+    aangemeld, capaciteit = b.vulcurves(mee, CURVE_UREN)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pct = aangemeld / capaciteit[:, None] * 100
+    geldig = ~np.isnan(pct)
+    som = np.zeros((len(slots), len(CURVE_UREN)))
+    telling = np.zeros((len(slots), len(CURVE_UREN)))
+    np.add.at(som, groep, np.where(geldig, pct, 0))
+    np.add.at(telling, groep, geldig)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        curve = som / telling
+
+    return {
+        "zaal": (slots >> 40) & 0xFF, "weekdag": (slots >> 32) & 0xFF,
+        "minuut": (slots >> 16) & 0xFFFF, "type": slots & 0xFFFF,
+        "lessen": aantal, "vol": aantal_vol,
+        "mediaan": kwantiel(0.5), "p25": kwantiel(0.25), "p75": kwantiel(0.75),
+        "curve": curve,
+    }
+
+
+def _uren_tekst(uren):
+    if uren >= 48:
+        return f"~{round(uren / 24)}d"
+    return f"~{max(1, round(uren))}u"
+
+
+def hint_tekst(lessen, vol, mediaan):
+    """Korte hint voor de widget, of None als er niets zinnigs te zeggen is."""
+    if lessen < MIN_LESSEN:
+        return None
+    aandeel = vol / lessen
+    if aandeel >= MEESTAL:
+        return f"meestal {_uren_tekst(mediaan)} vooraf vol"
+    if aandeel >= SOMS:
+        return f"soms vol ({round(aandeel * 100)}%)"
+    return None
+
+
+def maak_hints(b, stats):
+    """{slot_sleutel: {'hint', 'lessen', 'vol', 'mediaan_uur'}} voor slots met een hint."""
+    hints = {}
+    for i in range(len(stats["lessen"])):
+        tekst = hint_tekst(int(stats["lessen"][i]), int(stats["vol"][i]), stats["mediaan"][i])
+        if not tekst:
+            continue
+        minuut = int(stats["minuut"][i])
+        sleutel = slot_sleutel(b.zalen[stats["zaal"][i]], int(stats["weekdag"][i]),
+                               f"{minuut // 60:02d}:{minuut % 60:02d}", b.types[stats["type"][i]])
+        hints[sleutel] = {"hint": tekst, "lessen": int(stats["lessen"][i]), "vol": int(stats["vol"][i]),
+                          "mediaan_uur": None if stats["vol"][i] == 0 else round(float(stats["mediaan"][i]), 1)}
+    return hints
+
+
+def lees_hints(pad=HINTS_FILE):
+    try:
+        with open(pad, encoding="utf-8") as f:
+            return json.load(f).get("slots", {})
+    except Exception:
+        return {}
+
+
+def pas_hints_toe(data, hints):
+    """Zet 'vol_hint' op elke les in data waarvoor een hint is (en haalt oude
+    hints weg). Aantal lessen met een hint."""
+    aantal = 0
+    for dag_en, lessen in alle_views(data):
+        for les in lessen:
+            hint = hints.get(slot_sleutel(les.get("zaal"), DAGEN_EN.index(dag_en), les.get("tijd"), les.get("type")))
+            if hint:
+                les["vol_hint"] = hint["hint"]
+                aantal += 1
+            else:
+                les.pop("vol_hint", None)
+    return aantal
+
+
+def schrijf_hints(hints, now, pad=HINTS_FILE):
+    tmp = pad + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"bijgewerkt": now.isoformat(timespec="seconds"), "slots": hints},
+                  f, indent=1, ensure_ascii=False, sort_keys=True)
+    os.replace(tmp, pad)
+
+
+def _slot_naam(b, stats, i):
+    minuut = int(stats["minuut"][i])
+    return (f"{DAGEN_NL[stats['weekdag'][i]][:2]} {minuut // 60:02d}:{minuut % 60:02d} "
+            f"{b.zalen[stats['zaal'][i]]:<7} {b.types[stats['type'][i]][:12]:<12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Wanneer lopen lessen vol?")
+    parser.add_argument("--slot", nargs=2, metavar=("DAG", "HH:MM"), help="vulcurve van 1 tijdslot")
+    parser.add_argument("--zaal")
+    parser.add_argument("--type")
+    parser.add_argument("--weken", type=int, default=WEKEN_TERUG)
+    parser.add_argument("--schrijf", action="store_true", help=f"hints naar {HINTS_FILE} en workout.json")
+    args = parser.parse_args()
+
+    import numpy as np
+    now = datetime.now()
+    t0 = time.perf_counter()
+    b = Bezetting()
+    stats = bereken(b, now, args.weken)
+    duur = time.perf_counter() - t0
+    print(f"📊 {len(b.metingen)} metingen, {len(stats['lessen'])} slots in {duur * 1000:.0f} ms.")
+
+    kies = np.ones(len(stats["lessen"]), dtype=bool)
+    if args.slot:
+        kies &= stats["weekdag"] == weekdag_uit_tekst(args.slot[0])
+        kies &= stats["minuut"] == start_minuut(args.slot[1])
+    if args.zaal:
+        kies &= stats["zaal"] == (b.zalen.index(args.zaal) if args.zaal in b.zalen else -1)
+    if args.type:
+        kies &= stats["type"] == (b.types.index(args.type) if args.type in b.types else -1)
+
+    if args.slot:
+        print("slot                           " + " ".join(f"{u:>4}u" for u in CURVE_UREN))
+        for i in np.flatnonzero(kies):
+            cellen = " ".join("    -" if np.isnan(x) else f"{x:>4.0f}%" for x in stats["curve"][i])
+            print(f"{_slot_naam(b, stats, i)}  {cellen}")
+    for i in np.flatnonzero(kies):
+        if stats["vol"][i] == 0 and not args.slot:
+            continue
+        spreiding = ("" if stats["vol"][i] == 0 else
+                     f", mediaan {stats['mediaan'][i]:.0f}u vooraf (p25-p75 {stats['p25'][i]:.0f}-{stats['p75'][i]:.0f}u)")
+        print(f"{_slot_naam(b, stats, i)}  {stats['vol'][i]}/{stats['lessen'][i]} vol{spreiding}")
+
+    if args.schrijf and not (stats["lessen"] >= MIN_LESSEN).any():
+        # Lege of nog te korte historie (bv. verse cache): de bestaande hints
+        # laten staan i.p.v. alle vol_hints uit workout.json te strippen.
+        print(f"⚠️ Nog geen slot met {MIN_LESSEN}+ gemeten lessen; hints niet bijgewerkt.")
+    elif args.schrijf:
+        # Via JSON vergelijken: zo ziet de dict er na lees_hints() ook uit.
+        hints = json.loads(json.dumps(maak_hints(b, stats)))
+        if hints == lees_hints():
+            print(f"💤 Hints ongewijzigd ({len(hints)} slots); niets geschreven.")
+            return
+        schrijf_hints(hints, now)
+        data = lees_workout()
+        if data:
+            oud = json.dumps(data, sort_keys=True)
+            aantal = pas_hints_toe(data, hints)
+            if json.dumps(data, sort_keys=True) != oud:
+                schrijf_workout(data)
+            print(f"💾 {len(hints)} slot-hints; {aantal} lessen in workout.json met een hint.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Gedeelde wachtlaag: wacht op concrete signalen i.p.v. vaste wait_for_timeout's.
+
+Elke wacht heeft een eigen deadline en wordt gemeten (METINGEN), zodat we
+kunnen zien hoeveel tijd er echt nodig was en regressies opvallen als de site
+verandert. rapport() vat de metingen van deze run samen."""
+import asyncio
+import time
+
+# Deadlines per soort wacht (ms). Ruim genomen: het zijn bovengrenzen, in de
+# praktijk zijn de meeste waits klaar zodra het signaal er is.
+DEADLINES = {
+    "login": 15000,
+    "modal_open": 5000,
+    "modal_dicht": 3000,
+    "actie": 10000,
+    "class": 5000,
+    "cookies": 2000,
+}
+
+# (naam, duur_ms, gelukt) per wacht, in volgorde van uitvoeren.
+METINGEN = []
+
+MODAL_INHOUD = ".remodal-is-opened .grid .col, .remodal-is-opened input, .remodal-is-opened button"
+MODAL_DICHT_JS = "() => !document.querySelector('.remodal-is-opened, .remodal-is-opening, .remodal-is-closing')"
+CLASS_JS = """([target, delen, aanwezig]) => {
+    const el = Array.from(document.querySelectorAll('li[data-remodal-target]'))
+        .find(li => li.getAttribute('data-remodal-target') === target);
+    if (!el) return false;
+    const cls = (el.getAttribute('class') || '').toLowerCase();
+    return delen.some(d => cls.includes(d)) === aanwezig;
+}"""
+
+
+def _registreer(naam, start, gelukt):
+    METINGEN.append((naam, round((time.perf_counter() - start) * 1000), gelukt))
+
+
+def _deadline(naam, deadline_ms):
+    return deadline_ms or DEADLINES.get(naam, 10000)
+
+
+async def na_klik(page, klik, naam="actie", deadline_ms=None):
+    """Voert klik() uit en wacht op het eerste concrete signaal: een navigatie
+    van het hoofdframe (dan ook tot domcontentloaded) of een AJAX-POST-response.
+    Retourneert 'navigatie', 'response' of None (geen signaal binnen de deadline;
+    net als vroeger geen fout, de aanroeper controleert zelf het resultaat)."""
+    deadline = _deadline(naam, deadline_ms) / 1000
+    signaal = asyncio.get_running_loop().create_future()
+
+    def op_navigatie(frame):
+        if frame == page.main_frame and not signaal.done():
+            signaal.set_result("navigatie")
+
+    def op_response(resp):
+        req = resp.request
+        if req.method == "POST" and not req.is_navigation_request() and not signaal.done():
+            signaal.set_result("response")
+
+    page.on("framenavigated", op_navigatie)
+    page.on("response", op_response)
+    start = time.perf_counter()
+    soort = None
+    try:
+        await klik()
+        soort = await asyncio.wait_for(asyncio.shield(signaal), deadline)
+        if soort == "navigatie":
+            rest = max(deadline - (time.perf_counter() - start), 1)
+            await page.wait_for_load_state("domcontentloaded", timeout=rest * 1000)
+    except asyncio.TimeoutError:
+        soort = None
+    finally:
+        page.remove_listener("framenavigated", op_navigatie)
+        page.remove_listener("response", op_response)
+        _registreer(naam, start, soort is not None)
+    return soort
+
+
+async def modal_open(page, deadline_ms=None):
+    """Wacht tot de les-modal open is ÉN zijn inhoud (kolommen/knoppen) heeft."""
+    deadline = _deadline("modal_open", deadline_ms)
+    start = time.perf_counter()
+    gelukt = False
+    try:
+        await page.wait_for_selector(".remodal-is-opened", state="visible", timeout=deadline)
+        rest = max(deadline - (time.perf_counter() - start) * 1000, 100)
+        await page.wait_for_selector(MODAL_INHOUD, state="attached", timeout=rest)
+        gelukt = True
+    finally:
+        _registreer("modal_open", start, gelukt)
+
+
+async def sluit_modal(page, deadline_ms=None):
+    """Escape + wachten tot er geen modal meer open/opent/sluit (faalt stil)."""
+    start = time.perf_counter()
+    gelukt = False
+    try:
+        await page.keyboard.press("Escape")
+        await page.wait_for_function(MODAL_DICHT_JS, timeout=_deadline("modal_dicht", deadline_ms))
+        gelukt = True
+    except Exception:
+        pass
+    finally:
+        _registreer("modal_dicht", start, gelukt)
+    return gelukt
+
+
+async def wacht_op_class(page, target, delen, aanwezig=True, deadline_ms=None):
+    """Wacht tot de class van het les-blokje met dit data-remodal-target (een
+    van) de delen wel/niet bevat, bv. ('signedup', 'booked'). True bij succes,
+    False na de deadline."""
+    start = time.perf_counter()
+    gelukt = False
+    try:
+        await page.wait_for_function(CLASS_JS, arg=[target, list(delen), aanwezig],
+                                     timeout=_deadline("class", deadline_ms))
+        gelukt = True
+    except Exception:
+        pass
+    finally:
+        _registreer("class", start, gelukt)
+    return gelukt
+
+
+async def wacht_tot_weg(locator, naam="cookies", deadline_ms=None):
+    """Wacht tot een element (bv. de cookiebanner) verborgen is (faalt stil)."""
+    start = time.perf_counter()
+    gelukt = False
+    try:
+        await locator.wait_for(state="hidden", timeout=_deadline(naam, deadline_ms))
+        gelukt = True
+    except Exception:
+        pass
+    finally:
+        _registreer(naam, start, gelukt)
+    return gelukt
+
+
+def rapport():
+    """Korte samenvatting van de wachttijden van deze run."""
+    if not METINGEN:
+        return "⏱️ Geen wachttijden gemeten."
+    per_naam = {}
+    for naam, ms, gelukt in METINGEN:
+        per_naam.setdefault(naam, []).append((ms, gelukt))
+    delen = []
+    for naam, waarden in per_naam.items():
+        tijden = [ms for ms, _ in waarden]
+        mislukt = sum(1 for _, g in waarden if not g)
+        deel = f"{naam} {len(tijden)}x gem {sum(tijden) // len(tijden)}ms max {max(tijden)}ms"
+        if mislukt:
+            deel += f" ({mislukt} timeout)"
+        delen.append(deel)
+    totaal = sum(ms for _, ms, _ in METINGEN)
+    return f"⏱️ Wachttijden ({totaal}ms totaal): " + " | ".join(delen)
@@ -0,0 +1,238 @@
+"""Lezen/schrijven van workout.json, plus gerichte updates van 1 les.
+
+Na een in-/uitschrijving via de widget hoeft niet de hele scrape opnieuw:
+bink_enroll heeft de roosterpagina al open en patcht met patch_les() alleen de
+status/deelnemers van die ene les in alle views waar hij in staat
+(rooster_vandaag, rooster_morgen, rooster_deze_week, rooster_week) en, als het
+vandaag of morgen is, het bijbehorende status_*-blok.
+
+Bij elke schrijfactie komt er ook AANKOMEND_FILE naast: de lessen waar je in
+of op de wachtlijst staat, op starttijd gesorteerd en met een absolute
+timestamp, zodat bink_herinnering niet zelf het hele rooster hoeft te lezen.
+
+En in VIEWS_MAP per view (VIEWS) een klein, geminificeerd bestand plus
+manifest.json met per view een content-hash: een client haalt eerst het
+manifest op en daarna alleen de views waarvan de hash veranderd is.
+workout.json zelf blijft bestaan voor oudere clients."""
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+
+from bink_model import LesStatus, rooster_uit_workout
+from bink_rooster import DAGEN_EN
+
+WORKOUT_FILE = "workout.json"
+AANKOMEND_FILE = "aankomend.json"
+VIEWS_MAP = "views"
+MANIFEST_FILE = "manifest.json"
+# view -> velden uit workout.json; META_VELDEN staan in het manifest. Wat
+# nergens genoemd wordt komt in geen enkele view (alleen in workout.json): zo
+# verandert de hash van een view alleen als zijn eigen velden veranderen.
+VIEWS = {
+    "vandaag": ["datum", "dag", "workout", "status_vandaag", "rooster_vandaag"],
+    "morgen": ["dag_morgen", "status_morgen", "rooster_morgen"],
+    "week": ["rooster_deze_week"],
+    "volgende_week": ["rooster_week"],
+    "deja_vu": ["deja_vu"],
+    "post_workout": ["post_workout"],
+}
+META_VELDEN = ["last_success", "last_alert"]
+
+
+def lees_workout(pad=WORKOUT_FILE):
+    try:
+        if os.path.exists(pad):
+            with open(pad, "r", encoding="utf-8") as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return {}
+
+
+def _schrijf_json(data, pad):
+    # Via een tijdelijk bestand: de widget leest nooit een half geschreven file.
+    tmp = pad + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=4)
+    os.replace(tmp, pad)
+
+
+def splits_views(data):
+    """{view: dict met de velden van die view} + meta-velden apart."""
+    views = {naam: {veld: data[veld] for veld in velden if veld in data} for naam, velden in VIEWS.items()}
+    meta = {veld: data[veld] for veld in META_VELDEN if veld in data}
+    return views, meta
+
+
+def schrijf_views(data, map_=VIEWS_MAP):
+    """Schrijft de views die veranderd zijn + het manifest. Retourneert de
+    namen van de herschreven views."""
+    os.makedirs(map_, exist_ok=True)
+    oud = lees_manifest(map_).get("views", {})
+    views, meta = splits_views(data)
+    manifest = {"versie": 1, **meta, "views": {}}
+    herschreven = []
+    for naam, inhoud in views.items():
+        bestand = f"{naam}.json"
+        ruw = json.dumps(inhoud, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode("utf-8")
+        digest = hashlib.sha256(ruw).hexdigest()[:16]
+        manifest["views"][naam] = {"bestand": bestand, "hash": digest, "bytes": len(ruw)}
+        pad = os.path.join(map_, bestand)
+        if oud.get(naam, {}).get("hash") == digest and os.path.exists(pad):
+            continue
+        tmp = pad + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(ruw)
+        os.replace(tmp, pad)
+        herschreven.append(naam)
+    tmp = os.path.join(map_, MANIFEST_FILE) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, os.path.join(map_, MANIFEST_FILE))
+    return herschreven
+
+
+def lees_manifest(map_=VIEWS_MAP):
+    try:
+        with open(os.path.join(map_, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def lees_view(naam, map_=VIEWS_MAP):
+    """Eén view als dict, of None als hij (nog) niet bestaat."""
+    try:
+        with open(os.path.join(map_, f"{naam}.json"), encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def schrijf_workout(data, pad=WORKOUT_FILE, aankomend_pad=AANKOMEND_FILE, views_map=VIEWS_MAP):
+    """Schrijft workout.json, (tenzij aankomend_pad=None) de index van
+    aankomende lessen die daaruit volgt en (tenzij views_map=None) de views."""
+    _schrijf_json(data, pad)
+    if aankomend_pad:
+        _schrijf_json(aankomende_lessen(data), aankomend_pad)
+    if views_map:
+        schrijf_views(data, views_map)
+
+
+def aankomende_lessen(data):
+    """Alle lessen in data waar je in/op de wachtlijst staat, 1 per tijdslot,
+    gesorteerd op start: [{'start': epoch, 'start_iso', 'datum', 'tijd',
+    'type', 'zaal', 'wachtlijst', 'key'}]. 'key' = 'datum tijd', dezelfde
+    sleutel als in reminders.json."""
+    rooster = rooster_uit_workout(data)
+    kandidaten = [les for les in rooster.lessen() if les.status.ingeschreven and les.start is not None]
+    # Fallback: status_vandaag/morgen die (nog) niet in het rooster stond.
+    kandidaten += [status.als_les() for _, status in sorted(rooster.statussen.items()) if status.als_les()]
+
+    lessen, gezien = [], set()
+    for les in kandidaten:
+        # Per tijdslot (niet per zaal): je zit maar in 1 les per slot.
+        if les.key in gezien:
+            continue
+        gezien.add(les.key)
+        lessen.append({
+            "start": int(les.start.timestamp()),
+            "start_iso": les.start.isoformat(timespec="minutes"),
+            "datum": f"{les.start:%d-%m-%Y}",
+            "tijd": les.tijd,
+            "type": les.type or "les",
+            "zaal": les.zaal,
+            "wachtlijst": les.status is LesStatus.WACHTLIJST,
+            "key": les.key,
+        })
+    lessen.sort(key=lambda les: les["start"])
+    return lessen
+
+
+def lees_aankomend(pad=AANKOMEND_FILE):
+    try:
+        with open(pad, encoding="utf-8") as f:
+            lessen = json.load(f)
+        return lessen if isinstance(lessen, list) else None
+    except Exception:
+        return None
+
+
+def _dagen_met_status(data):
+    """{(dag_en, week): 'status_vandaag'/'status_morgen'} voor de datum in data."""
+    try:
+        vandaag = datetime.strptime(data.get("datum", ""), "%d-%m-%Y")
+    except ValueError:
+        return {}
+    morgen = vandaag + timedelta(days=1)
+    week_morgen = "next" if vandaag.weekday() == 6 else "current"
+    return {
+        (DAGEN_EN[vandaag.weekday()], "current"): "status_vandaag",
+        (DAGEN_EN[morgen.weekday()], week_morgen): "status_morgen",
+    }
+
+
+def _views(data, dag_en, week):
+    """Alle les-lijsten in data die bij (dag_en, week) horen."""
+    for (d, w), status_key in _dagen_met_status(data).items():
+        if (d, w) == (dag_en, week):
+            view = "rooster_vandaag" if status_key == "status_vandaag" else "rooster_morgen"
+            if isinstance(data.get(view), list):
+                yield data[view]
+    for view in ("rooster_deze_week", "rooster_week"):
+        for dag in data.get(view) or []:
+            if dag.get("dag_en") == dag_en and dag.get("week") == week:
+                yield dag.get("lessen") or []
+
+
+def alle_views(data):
+    """(dag_en, lessen) voor elke les-lijst in data, over beide weken."""
+    for week in ("current", "next"):
+        for dag_en in DAGEN_EN:
+            for lessen in _views(data, dag_en, week):
+                yield dag_en, lessen
+
+
+def patch_les(data, dag_en, week, les, status=None):
+    """Werkt in data de les met dezelfde zaal + tijd bij (status, deelnemers).
+    status = nieuwe persoonlijke status van die dag in die zaal (zoals
+    lees_persoonlijke_status); die gaat alleen naar status_vandaag/_morgen als
+    je nu ingeschreven bent, of als het blok nog naar deze les wees. Het
+    blok heeft geen zaal; die komt uit de views (de zaal waar je op die tijd
+    in stond), zodat een actie in de andere zaal op dezelfde tijd hem laat staan.
+    Retourneert het aantal aangepaste les-dicts + status-blokken."""
+    # Vóór het patchen: in welke zaal(en) stond je op deze tijd?
+    jouw_zalen = {item.get("zaal") for lessen in _views(data, dag_en, week) for item in lessen
+                  if item.get("tijd") == les.get("tijd") and LesStatus.van(item.get("status")).ingeschreven}
+    aangepast = 0
+    for lessen in _views(data, dag_en, week):
+        for item in lessen:
+            if item.get("zaal") == les.get("zaal") and item.get("tijd") == les.get("tijd"):
+                for veld in ("status", "deelnemers"):
+                    if les.get(veld) is not None:
+                        item[veld] = les[veld]
+                aangepast += 1
+
+    status_key = _dagen_met_status(data).get((dag_en, week))
+    if status is not None and status_key:
+        oud = data.get(status_key) or {}
+        wees_hierheen = (oud.get("ingeschreven") and oud.get("tijd") == les.get("tijd")
+                         and les.get("zaal") in jouw_zalen)
+        if status.get("ingeschreven") or wees_hierheen:
+            data[status_key] = status
+            aangepast += 1
+    return aangepast
+
+
+def patch_workout_json(dag_en, week, les, status=None, pad=WORKOUT_FILE, aankomend_pad=AANKOMEND_FILE,
+                       views_map=VIEWS_MAP):
+    """patch_les op het bestand (+ de index van aankomende lessen); schrijft
+    alleen als er iets aangepast is."""
+    data = lees_workout(pad)
+    if not data:
+        return 0
+    aangepast = patch_les(data, dag_en, week, les, status)
+    if aangepast:
+        schrijf_workout(data, pad, aankomend_pad, views_map)
+    return aangepast
@@ -0,0 +1,174 @@
+"""Wachtrij-logica en formulier-route van bink_enroll (zonder browser)."""
+import asyncio
+import os
+from datetime import datetime
+
+import bink_enroll
+from bink_enroll import (actie_uit_payload, groepeer_per_pagina, klap_samen, lees_wachtrij,
+                         voeg_toe_wachtrij, werk_wachtrij_bij, MAX_POGINGEN_WACHTRIJ)
+
+NU = datetime(2026, 10, 14, 9, 0)  # woensdag
+
+
+def actie(soort, tijd="18:30", dag_en="tuesday", week="next", zaal="Zaal 2"):
+    return actie_uit_payload({"actie": soort, "tijd": tijd, "dag_en": dag_en, "week": week, "zaal": zaal}, NU)
+
+
+def test_klap_samen_dubbel_telt_een_keer():
+    a, b = actie("inschrijven"), actie("inschrijven")
+    acties, weg = klap_samen([a, b])
+    assert acties == [a]
+    assert weg == []
+
+
+def test_klap_samen_tegenovergesteld_heft_op():
+    a, b = actie("inschrijven"), actie("uitschrijven")
+    acties, weg = klap_samen([a, b])
+    assert acties == []
+    assert weg == [(a, b)]
+
+
+def test_klap_samen_in_uit_in_blijft_in():
+    a, b, c = actie("inschrijven"), actie("uitschrijven"), actie("inschrijven")
+    acties, weg = klap_samen([a, b, c])
+    assert acties == [c]
+    assert weg == [(a, b)]
+
+
+def test_klap_samen_per_les_en_volgorde():
+    a = actie("inschrijven", tijd="18:30")
+    b = actie("uitschrijven", tijd="11:15", dag_en="saturday")
+    c = actie("inschrijven", tijd="18:30", week="current")
+    d = actie("inschrijven", tijd="18:30", zaal="Zaal 1")
+    acties, weg = klap_samen([a, b, c, d])
+    assert acties == [a, b, c, d]
+    assert weg == []
+    assert list(groepeer_per_pagina(acties)) == [("Zaal 2", "next"), ("Zaal 2", "current"), ("Zaal 1", "next")]
+
+
+def test_payload_krijgt_vaste_datum():
+    a = actie_uit_payload({"actie": "inschrijven", "tijd": "07:00", "dag": "Morgen", "zaal": "Buiten"}, NU)
+    assert a["payload"]["datum"] == "15-10-2026"
+    # Een dag later wijst dezelfde wachtrij-regel nog steeds naar donderdag 15-10.
+    later = actie_uit_payload(a["payload"], datetime(2026, 10, 15, 6, 0))
+    assert (later["dag_en"], later["week"]) == ("thursday", "current")
+    # Zondag: dezelfde weekdag van volgende week hoort bij week=next.
+    volgende = actie_uit_payload({**a["payload"], "datum": "22-10-2026"}, datetime(2026, 10, 18, 12, 0))
+    assert (volgende["dag_en"], volgende["week"]) == ("thursday", "next")
+    # Verlopen: weg.
+    assert actie_uit_payload(a["payload"], datetime(2026, 10, 16, 6, 0)) is None
+
+
+def test_mislukte_acties_terug_in_wachtrij(tmp_path):
+    pad = str(tmp_path / "queue.jsonl")
+    gelezen = [actie("inschrijven")["payload"], actie("uitschrijven", tijd="11:15", dag_en="saturday")["payload"]]
+    voeg_toe_wachtrij(gelezen, pad)
+    acties = [actie_uit_payload(p, NU) for p in lees_wachtrij(pad)]
+    # Tijdens de run komt er een nieuwe regel bij.
+    voeg_toe_wachtrij([{"actie": "inschrijven", "tijd": "09:15", "dag_en": "friday", "zaal": "Zaal 1"}], pad)
+
+    opnieuw, opgegeven = werk_wachtrij_bij(gelezen, [acties[1]], pad)
+    assert opgegeven == []
+    rest = lees_wachtrij(pad)
+    assert [p["tijd"] for p in rest] == ["11:15", "09:15"]
+    assert rest[0]["pogingen"] == 1
+
+    # Na MAX_POGINGEN_WACHTRIJ keer mislukken wordt de actie opgegeven.
+    payload = dict(rest[0], pogingen=MAX_POGINGEN_WACHTRIJ - 1)
+    opnieuw, opgegeven = werk_wachtrij_bij(rest, [actie_uit_payload(payload, NU)], pad)
+    assert opnieuw == [] and len(opgegeven) == 1
+    assert lees_wachtrij(pad) == []
+
+
+def test_geslaagde_run_leegt_wachtrij(tmp_path):
+    pad = str(tmp_path / "queue.jsonl")
+    gelezen = [actie("inschrijven")["payload"]]
+    voeg_toe_wachtrij(gelezen, pad)
+    assert werk_wachtrij_bij(gelezen, [], pad) == ([], [])
+    assert lees_wachtrij(pad) == []
+
+
+# --- direct_actie: na een mislukte POST nooit blind opnieuw klikken --------------
+
+ROOSTER = os.path.join(os.path.dirname(__file__), "fixtures", "rooster-Zaal 2-current.html")
+URL = "https://www.crossfitbink36.nl/rooster?hall=Zaal%202&week=current"
+MOBILITY = '<li class="workout" data-remodal-target="monday-Mobility &amp; Core-19:30">'
+
+
+class Antwoord:
+    def __init__(self, html, status=200):
+        self.html, self.status, self.ok = html, status, status < 400
+
+    async def text(self):
+        return self.html
+
+
+class Request:
+    def __init__(self, post, get):
+        self._post, self._get = post, get
+
+    async def post(self, *a, **k):
+        return self._post()
+
+    async def get(self, *a, **k):
+        return self._get()
+
+
+class Context:
+    def __init__(self, post, get):
+        self.request = Request(post, get)
+
+
+class GeenKlik:
+    """Pagina die faalt zodra de klik-route hem aanraakt."""
+    def __getattr__(self, naam):
+        raise AssertionError(f"klik-route gebruikt (page.{naam})")
+
+
+def rooster_html(ingeschreven=False):
+    with open(ROOSTER, encoding="utf-8") as f:
+        html = f.read()
+    assert MOBILITY in html
+    return html.replace(MOBILITY, MOBILITY.replace('"workout"', '"workout workout-signedup"')) if ingeschreven else html
+
+
+def time_out():
+    raise TimeoutError("Timeout 20000ms exceeded")
+
+
+def mobility():
+    return actie_uit_payload({"actie": "inschrijven", "tijd": "19:30", "dag_en": "monday",
+                              "week": "current", "zaal": "Zaal 2"}, NU)
+
+
+def direct(post, get, monkeypatch, page=None):
+    monkeypatch.setattr(bink_enroll, "patch_workout_json", lambda *a: 0)
+    context = Context(post, get)
+    return asyncio.run(bink_enroll.voer_actie_uit(page or GeenKlik(), URL, mobility(), context,
+                                                  {"html": rooster_html()}))
+
+
+def test_timeout_maar_doorgekomen_klikt_niet(monkeypatch):
+    regel = direct(time_out, lambda: Antwoord(rooster_html(ingeschreven=True)), monkeypatch)
+    assert regel.startswith("✅ *Ingeschreven*")
+
+
+def test_foutstatus_zonder_leesbare_stand_klikt_niet(monkeypatch):
+    regel = direct(lambda: Antwoord("", 502), time_out, monkeypatch)
+    assert regel.startswith("❌") and "niet opnieuw geprobeerd" in regel
+
+
+def test_niet_doorgekomen_mag_klikken(monkeypatch):
+    class Pagina:
+        url = "elders"
+
+    async def open_rooster(page, url):
+        raise RuntimeError("klik-route")
+
+    monkeypatch.setattr(bink_enroll, "open_rooster", open_rooster)
+    try:
+        direct(time_out, lambda: Antwoord(rooster_html()), monkeypatch, Pagina())
+    except RuntimeError as e:
+        assert str(e) == "klik-route"
+    else:
+        raise AssertionError("klik-route niet gekozen")
@@ -0,0 +1,141 @@
+"""Het HTTP-pad (bink_http) tegen opgeslagen pagina's in tests/fixtures.
+
+verwacht.json is wat het Playwright-pad (LES_RECORDS_JS, MODAL_JS, inner_text)
+uit dezelfde pagina's leest. Met Playwright + Chromium geïnstalleerd draait
+test_zelfde_als_playwright die vergelijking ook echt in de browser; anders
+wordt hij overgeslagen."""
+import asyncio
+import json
+import os
+
+import pytest
+
+from bink_http import (ParseFout, _laad_snapshot, actie_formulier, formulier_velden, heeft_class,
+                       is_ingelogd, les_class, les_records, login_formulier, modal_van, parse_html,
+                       status_uit_dom, wod_ruwe_tekst)
+from bink_rooster import lessen_per_dag, modal_gegevens
+
+MAP = os.path.join(os.path.dirname(__file__), "fixtures")
+ROOSTER = "rooster-Zaal 2-current.html"
+BASIS_URL = "https://www.crossfitbink36.nl/rooster?hall=Zaal%202"
+
+
+def lees(naam):
+    with open(os.path.join(MAP, naam), encoding="utf-8") as f:
+        return f.read()
+
+
+VERWACHT = json.loads(lees("verwacht.json"))
+
+
+@pytest.fixture(scope="module")
+def rooster():
+    return parse_html(lees(ROOSTER))
+
+
+def modal_cols(dom, target):
+    modal = modal_van(dom, target)
+    grid = modal.zoek(heeft_class("grid")) or modal
+    return [c.tekst() for c in grid.zoek_alle(heeft_class("col"))]
+
+
+def test_les_records(rooster):
+    assert les_records(rooster) == VERWACHT["records"]
+
+
+def test_lessen_per_dag_slaat_les_zonder_type_over(rooster):
+    lessen = lessen_per_dag(les_records(rooster), "Zaal 2")
+    assert lessen["thursday"] == []
+    assert lessen["tuesday"] == [{"tijd": "18:30 - 19:30", "type": "Oly Lifting", "zaal": "Zaal 2",
+                                  "deelnemers": "11/12", "status": "Jij bent Ingeschreven"}]
+    assert lessen["saturday"][0]["status"] == "Jij staat op Wachtlijst"
+    assert lessen["monday"][0]["status"] == "Vol (Wachtlijst)"
+
+
+@pytest.mark.parametrize("dag_en", sorted(VERWACHT["status"]))
+def test_status_uit_dom(rooster, dag_en):
+    assert status_uit_dom(rooster, les_records(rooster), dag_en) == VERWACHT["status"][dag_en]
+
+
+@pytest.mark.parametrize("target", sorted(VERWACHT["modals"]))
+def test_modal_gegevens(rooster, target):
+    assert modal_gegevens(modal_cols(rooster, target)) == VERWACHT["modals"][target]
+
+
+@pytest.mark.parametrize("geval", VERWACHT["formulieren"], ids=lambda g: f"{g['target']}:{g['actie']}")
+def test_actie_formulier(rooster, geval):
+    uit = actie_formulier(rooster, geval["target"], geval["actie"], BASIS_URL)
+    assert (list(uit) if uit else None) == geval["uit"]
+
+
+def test_les_class(rooster):
+    assert les_class(rooster, "tuesday-Oly Lifting-18:30") == "workout workout-signedup"
+    # Een bedankpagina na het posten heeft geen rooster: dan None (-> 1 GET van het rooster).
+    assert les_class(parse_html(lees("bedankt.html")), "tuesday-Oly Lifting-18:30") is None
+
+
+def test_wod_tekst():
+    assert wod_ruwe_tekst(parse_html(lees("wod.html"))) == VERWACHT["wod"]
+
+
+def test_login():
+    html = lees("login.html")
+    assert not is_ingelogd(html)
+    assert is_ingelogd(lees("bedankt.html"))
+    assert formulier_velden(login_formulier(parse_html(html))) == VERWACHT["login_velden"]
+
+
+# --- Live: zelfde pagina's door het Playwright-pad ------------------------------
+
+async def _playwright_uitkomst():
+    from playwright.async_api import async_playwright
+    from bink_auto import LES_RECORDS_JS, MODAL_JS
+
+    async with async_playwright() as p:
+        try:
+            browser = await p.chromium.launch()
+        except Exception as e:
+            pytest.skip(f"Geen Chromium: {e}")
+        try:
+            page = await browser.new_page()
+            await page.set_content(lees(ROOSTER))
+            records = await page.evaluate(LES_RECORDS_JS)
+            modals = {}
+            for target in VERWACHT["modals"]:
+                await page.evaluate("""t => {
+                    document.querySelectorAll('.remodal-is-opened').forEach(el => el.classList.remove('remodal-is-opened'));
+                    document.querySelector(`[data-remodal-id="${t}"]`).classList.add('remodal-is-opened');
+                }""", target)
+                modals[target] = await page.evaluate(MODAL_JS)
+            await page.set_content(lees("wod.html"))
+            wod = await page.locator(".wod-card").first.inner_text()
+        finally:
+            await browser.close()
+    return records, modals, wod
+
+
+def test_zelfde_als_playwright(rooster):
+    pytest.importorskip("playwright")
+    records, modals, wod = asyncio.run(_playwright_uitkomst())
+    velden = ("target", "tijd", "type", "deelnemers", "class")
+    assert [{k: r[k] for k in velden} for r in records] == les_records(rooster)
+    assert modals == {t: modal_gegevens(modal_cols(rooster, t)) for t in modals}
+    assert wod == wod_ruwe_tekst(parse_html(lees("wod.html")))
+
+
+class Sessie:
+    def __init__(self, html):
+        self.html = html
+
+    def get(self, url):
+        return url, self.html
+
+
+def test_uitgelogd_rooster_is_parsefout():
+    # Zelfde lessen, maar zonder uitlog-link: een verlopen sessie, geen eigen status.
+    html = lees(ROOSTER)
+    uitgelogd = html.replace('<a href="/uitloggen">Uitloggen</a>', "")
+    assert uitgelogd != html and les_records(parse_html(uitgelogd))
+    with pytest.raises(ParseFout):
+        _laad_snapshot(Sessie(uitgelogd), "Zaal 2", "current", ["monday"])
+    assert _laad_snapshot(Sessie(html), "Zaal 2", "current", ["monday"])["aantal"] == len(VERWACHT["records"])
@@ -0,0 +1,60 @@
+"""bink_metrics: records, percentielen en de Playwright-telling (zonder browser)."""
+import asyncio
+
+import bink_metrics as metrics
+from bink_browser import Teller
+
+
+class NepPagina:
+    url = "https://example.invalid/rooster"
+
+    async def goto(self, url):
+        return None
+
+    async def evaluate(self, js):
+        return [1, 2]
+
+    def set_default_timeout(self, ms):
+        self.timeout = ms
+
+
+def test_teller_telt_alleen_awaitbare_aanroepen():
+    metrics.reset()
+    page = Teller(NepPagina())
+
+    async def gebruik():
+        page.set_default_timeout(1000)
+        await page.goto(page.url)
+        return await page.evaluate("() => [1, 2]")
+
+    assert asyncio.run(gebruik()) == [1, 2]
+    assert metrics.TELLERS == {"playwright": 2}
+    eigen = [0]
+    asyncio.run(Teller(NepPagina(), eigen).goto("x"))
+    assert eigen == [1] and metrics.TELLERS == {"playwright": 2}
+
+
+def test_run_record_en_rapport(tmp_path):
+    pad = str(tmp_path / "metrics.jsonl")
+    for ms in (10, 20, 30, 400):
+        metrics.reset()
+        metrics.registreer("login", ms)
+        metrics.registreer("rooster:Zaal 1/current", 5, gelukt=ms < 400)
+        metrics.tel("navigaties", 2)
+        metrics.schrijf_run("bink_auto", ms < 400, pad=pad, prometheus_pad=str(tmp_path / "bink.prom"))
+
+    runs = metrics.lees_runs(pad)
+    assert len(runs) == 4
+    assert runs[-1]["fases"]["login"] == [1, 400, 400, 0]
+    assert runs[-1]["fases"]["rooster:Zaal 1/current"] == [1, 5, 5, 1]
+    assert runs[-1]["tellers"] == {"navigaties": 2}
+    regels = metrics.rapport(runs)
+    assert regels[0].startswith("📊 bink_auto: 4 runs (1 mislukt)")
+    assert any("login" in r and "p50     20ms" in r and "p95    400ms" in r for r in regels)
+    assert 'bink_fase_ms{script="bink_auto",fase="login"} 400' in (tmp_path / "bink.prom").read_text()
+
+
+def test_percentiel():
+    assert metrics.percentiel([5], 95) == 5
+    assert metrics.percentiel([1, 2, 3, 4], 50) == 2
+    assert metrics.percentiel(list(range(1, 101)), 95) == 95
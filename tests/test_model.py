@@ -0,0 +1,36 @@
+from datetime import datetime
+
+from bink_model import Dag, Les, LesStatus, rooster_uit_workout
+
+DATUM = datetime(2026, 3, 2)
+
+
+def test_onleesbare_tijd_blijft_staan():
+    d = {"tijd": "hele dag", "type": "Open Gym", "zaal": "Zaal 1", "deelnemers": "", "status": "Open"}
+    les = Les.uit_dict(d, DATUM)
+    assert les.start is None
+    assert les.naar_dict() == d
+
+
+def test_ruwe_tekst_gaat_ongewijzigd_terug():
+    d = {"tijd": "07:00 - 08:00", "type": "WOD", "zaal": "Zaal 2",
+         "deelnemers": "14/14 (+3)", "status": "Vol (Wachtlijst)"}
+    les = Les.uit_dict(d, DATUM)
+    assert (les.aangemeld, les.capaciteit) == (14, 14)
+    assert les.status is LesStatus.VOL and les.status.vol
+    assert les.naar_dict() == d
+
+
+def test_workout_rondreis():
+    dag = {"dag": "Maandag", "dag_en": "monday", "datum": "02-03-2026", "week": "current", "lessen": [
+        {"tijd": "hele dag", "type": "Open Gym", "zaal": "Zaal 1", "deelnemers": "", "status": "Open"},
+        {"tijd": "18:00 - 19:00", "type": "WOD", "zaal": "Zaal 2", "deelnemers": "3/14", "status": "Open"},
+    ]}
+    assert Dag.uit_dict(dag).naar_dict() == dag
+    rooster = rooster_uit_workout({"datum": "02-03-2026", "rooster_vandaag": dag["lessen"]})
+    assert [les.naar_dict() for les in rooster.dag(DATUM).lessen] == dag["lessen"]
+
+
+def test_key_zonder_start_is_none():
+    assert Les.uit_dict({"tijd": "hele dag"}, DATUM).key is None
+    assert Les.uit_dict({"tijd": "18:00 - 19:00"}, DATUM).key == "02-03-2026 18:00 - 19:00"
@@ -0,0 +1,60 @@
+"""Wanneer bink_telegram zonder parse_mode opnieuw probeert (lokale nep-API)."""
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import bink_telegram
+from bink_telegram import TelegramMelder
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """(url, verzoeken, antwoorden): elk verzoek krijgt het volgende antwoord
+    (status, description); daarna 200."""
+    verzoeken, antwoorden = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            lengte = int(self.headers["Content-Length"])
+            verzoeken.append(dict(urllib.parse.parse_qsl(self.rfile.read(lengte).decode())))
+            status, beschrijving = antwoorden.pop(0) if antwoorden else (200, "")
+            body = json.dumps({"ok": status == 200, "description": beschrijving,
+                               "result": {"message_id": 1}}).encode()
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *a):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(bink_telegram, "MIN_INTERVAL", 0)
+    yield f"http://127.0.0.1:{server.server_port}", verzoeken, antwoorden
+    server.shutdown()
+
+
+def test_kapotte_markdown_wordt_platte_tekst(api, tmp_path):
+    url, verzoeken, antwoorden = api
+    antwoorden.append((400, "Bad Request: can't parse entities: Can't find end of the entity"))
+    melder = TelegramMelder("t", "1", api_url=url, spool_file=str(tmp_path / "spool"))
+    assert melder.verstuur_direct("*kapot", parse_mode="Markdown") == 1
+    assert [v.get("parse_mode") for v in verzoeken] == ["Markdown", None]
+
+
+@pytest.mark.parametrize("status, beschrijving", [
+    (401, "Unauthorized"),
+    (403, "Forbidden: bot was blocked by the user"),
+    (400, "Bad Request: chat not found"),
+    (400, "Bad Request: message is not modified"),
+])
+def test_andere_4xx_niet_opnieuw(api, tmp_path, status, beschrijving):
+    url, verzoeken, antwoorden = api
+    antwoorden.append((status, beschrijving))
+    melder = TelegramMelder("t", "1", api_url=url, spool_file=str(tmp_path / "spool"))
+    assert melder.verstuur_direct("*ok*", parse_mode="Markdown") is None
+    assert len(verzoeken) == 1
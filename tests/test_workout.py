@@ -0,0 +1,37 @@
+"""patch_les: gerichte update van 1 les na een in-/uitschrijving."""
+from bink_workout import patch_les
+
+IN = "Jij bent Ingeschreven"
+UIT = {"ingeschreven": False, "tijd": "", "type": "", "deelnemers": "", "wachtlijst": False,
+       "wachtlijst_plek": "?", "wachtlijst_totaal": "?"}
+
+
+def workout():
+    # 02-03-2026 is een maandag.
+    return {
+        "datum": "02-03-2026",
+        "status_vandaag": {**UIT, "ingeschreven": True, "tijd": "18:30 - 19:30", "type": "WOD",
+                           "deelnemers": "12/14"},
+        "rooster_vandaag": [
+            {"tijd": "18:30 - 19:30", "type": "WOD", "zaal": "Zaal 1", "deelnemers": "12/14", "status": IN},
+            {"tijd": "18:30 - 19:30", "type": "Oly", "zaal": "Zaal 2", "deelnemers": "5/12", "status": IN},
+        ],
+    }
+
+
+def test_actie_in_andere_zaal_laat_status_staan():
+    data = workout()
+    data["rooster_vandaag"][1]["status"] = "Open"
+    les = {"tijd": "18:30 - 19:30", "zaal": "Zaal 2", "deelnemers": "5/12", "status": "Open"}
+    patch_les(data, "monday", "current", les, UIT)
+    assert data["status_vandaag"]["ingeschreven"] is True
+    assert data["rooster_vandaag"][0]["status"] == IN
+
+
+def test_uitschrijven_in_eigen_zaal_wist_status():
+    data = workout()
+    data["rooster_vandaag"][1]["status"] = "Open"
+    les = {"tijd": "18:30 - 19:30", "zaal": "Zaal 1", "deelnemers": "11/14", "status": "Open"}
+    assert patch_les(data, "monday", "current", les, UIT) == 2
+    assert data["status_vandaag"] == UIT
+    assert data["rooster_vandaag"][0]["status"] == "Open"